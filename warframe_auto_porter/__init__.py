@@ -91,13 +91,23 @@ from bpy.types import AddonPreferences, Macro, Operator, PropertyGroup
 
 from .constants import COLOR_SPACE_MAP, EMISSION_FLAGS_FOR_BAKING
 from .materials import (
+    MaterialIndex,
+    MaterialParseCache,
+    clear_texture_proxies,
+    close_content_hash_indexes,
+    close_material_caches,
+    close_material_indexes,
+    close_texture_analyses,
     connect_geometry_node_parameters,
     connect_textures_and_parameters,
     find_shader_material,
     get_best_material_from_blend,
+    get_material_cache,
+    get_material_index,
     get_rig_items,
     get_shader_items,
     parse_material_file,
+    restore_file_images,
     set_material_properties,
 )
 from .operators import (
@@ -105,10 +115,16 @@ from .operators import (
     AppendRigOperator,
     BakeState,
     BakeTexturesOperator,
+    BuildMaterialIndexOperator,
+    BuildShaderManifestOperator,
     CreateBakedMaterialOperator,
+    DeduplicateImagesOperator,
     DeformOperator,
+    DumpLogOperator,
     ExperimentalModeOperator,
+    FindMaterialsOperator,
     ImportModelOperator,
+    LoadFullResolutionTexturesOperator,
     NormalToHeightOperator,
     RunAllOperationsOperator,
     RunSetupOperator,
@@ -123,6 +139,7 @@ from .properties import BakeSourceItem, WarframeAddonProperties
 from .ui import SetupPanelOperator
 from .utils import (
     cleanup_textures,
+    configure_logging,
     contains,
     containstexture,
     extract_material_with_cli,
@@ -133,6 +150,7 @@ from .utils import (
     process_object,
     reset_default,
     set_default,
+    shutdown_logging,
     strtobool,
 )
 
@@ -153,6 +171,12 @@ classes = (
     WarframeAddonProperties,
     BakeTexturesOperator,
     CreateBakedMaterialOperator,
+    BuildMaterialIndexOperator,
+    BuildShaderManifestOperator,
+    FindMaterialsOperator,
+    DeduplicateImagesOperator,
+    LoadFullResolutionTexturesOperator,
+    DumpLogOperator,
 )
 
 
@@ -161,9 +185,22 @@ def register():
         bpy.utils.register_class(cls)
     bpy.types.Scene.warframe_tools_props = PointerProperty(type=WarframeAddonProperties)
     bpy.context.preferences.use_preferences_save = True
+    bpy.app.handlers.save_pre.append(restore_file_images)
+    bpy.app.handlers.load_post.append(restore_file_images)
+    configure_logging(bpy.context.preferences.addons[__package__].preferences.log_level_preference)
 
 
 def unregister():
+    restore_file_images()
+    for handlers in (bpy.app.handlers.save_pre, bpy.app.handlers.load_post):
+        if restore_file_images in handlers:
+            handlers.remove(restore_file_images)
+    clear_texture_proxies()
+    close_texture_analyses()
+    close_content_hash_indexes()
+    close_material_indexes()
+    close_material_caches()
+    shutdown_logging()
     for cls in reversed(classes):
         bpy.utils.unregister_class(cls)
 
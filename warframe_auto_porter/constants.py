@@ -14,8 +14,26 @@ shader_exceptions_parameters = ["Swizzle Vertex Channels"]
 texture_extension_list = [
     ("*.png", "PNG", "Use PNG textures"),
     ("*.tga", "TGA", "Use TGA textures"),
+    ("*.dds", "DDS", "Use DDS textures as extracted, converting only those Blender can't read"),
 ]
 
+texture_proxy_list = [
+    ("FULL", "Full Resolution", "Load the textures as they are"),
+    ("HALF", "1/2", "Load textures at half their width and height"),
+    ("QUARTER", "1/4", "Load textures at a quarter of their width and height"),
+    ("CAP", "Max Size", "Halve textures until they fit within the maximum size"),
+]
+
+log_level_list = [
+    ("DEBUG", "Debug", "Log every socket, texture and parameter that gets set"),
+    ("INFO", "Info", "Log progress and each material that gets set up"),
+    ("WARNING", "Warning", "Only log problems"),
+    ("ERROR", "Error", "Only log failures"),
+]
+
+# Log records kept in memory for Dump Log
+log_buffer_size = 20000
+
 special_reset_rules = {
     "EffectsIntensityStrength": 1,
     "EffectsIntensity X": 1,
@@ -114,6 +132,18 @@ special_skips_mat = {
 
 texture_ignores = ["BaseMaterialMetal"]
 
+# Keys whose value is the path of the material this one inherits from
+material_parent_keys = ["BaseMaterial", "ParentMaterial", "Parent"]
+
+material_cache_filename = ".warframe_auto_porter_cache.sqlite"
+
+# Downscaled texture proxies, named after the contents of their source file
+texture_proxy_dirname = ".warframe_auto_porter_proxies"
+
+# Written into the shader library folder by scripts/build_shader_manifest.py
+shader_manifest_filename = "shader_manifest.json"
+shader_manifest_version = 1
+
 extractor_commands = {
     "Texture": '{0} --extract-textures --texture-format {2} --cache-dir "{1}" --internal-path "{3}" --output-path "{4}"',
     "Material": '{0} --extract-materials --cache-dir "{1}" --internal-path "{2}" --output-path "{3}"',
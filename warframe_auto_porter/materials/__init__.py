@@ -1,12 +1,66 @@
+from .analysis import (
+    TextureAnalysis,
+    TextureStats,
+    close_texture_analyses,
+    get_texture_analysis,
+)
+from .bindings import clear_binding_plans, geometry_socket_plan, material_socket_plan
+from .cache import (
+    MaterialParseCache,
+    close_material_caches,
+    get_material_cache,
+    parse_in_processes,
+)
+from .dedup import (
+    ContentHashIndex,
+    close_content_hash_indexes,
+    deduplicate_images,
+    get_content_hash_index,
+)
+from .hierarchy import MaterialHierarchy
+from .images import (
+    clear_image_cache,
+    load_full_resolution,
+    load_image,
+    load_proxy_image,
+    preload_images,
+    restore_file_images,
+    source_filepath,
+)
+from .index import MaterialIndex, close_material_indexes, get_material_index
+from .library import (
+    AppendedData,
+    BlendContents,
+    append_from_blend,
+    clear_blend_contents,
+    get_blend_contents,
+)
 from .matcher import (
+    BlendVariantIndex,
+    ShaderLibraryIndex,
     find_shader_material,
     get_best_material_from_blend,
+    get_blend_variant_index,
     get_rig_items,
     get_shader_items,
+    get_shader_library_index,
 )
 from .parser import parse_material_file
+from .proxies import TextureProxies, clear_texture_proxies, get_texture_proxies
+from .record import MaterialRecord
+from .templates import MaterialTemplates, is_template
 from .processor import (
     connect_geometry_node_parameters,
     connect_textures_and_parameters,
     set_material_properties,
 )
+from .pipeline import (
+    MaterialJob,
+    PhaseTimer,
+    append_blend_materials,
+    bind_material,
+    collect_material_jobs,
+    group_jobs_by_blend,
+    parse_material_files,
+    resolve_material_files,
+)
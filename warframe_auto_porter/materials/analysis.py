@@ -0,0 +1,189 @@
+import json
+import os
+import sqlite3
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import bpy
+import numpy as np
+
+from ..utils.log import logger
+from ..utils.texture_decode import read_texture_stats
+from .cache import get_material_cache
+from .dedup import get_content_hash_index
+
+ANALYSIS_VERSION = 2
+
+# Differences below this are 8 bit rounding, not content
+CONSTANT_TOLERANCE = 2.0 / 255.0
+
+_MISSING = object()
+
+_analyses = {}
+
+
+class TextureStats(
+    namedtuple("TextureStats", ["width", "height", "minimum", "maximum", "mean"])
+):
+    """Per channel minimum, maximum and mean of an RGBA texture, as 0-1 floats"""
+
+    __slots__ = ()
+
+    @property
+    def is_constant(self):
+        return all(
+            high - low <= CONSTANT_TOLERANCE for low, high in zip(self.minimum, self.maximum)
+        )
+
+    @property
+    def uses_alpha(self):
+        return self.minimum[3] < 1.0 - CONSTANT_TOLERANCE
+
+    @property
+    def used_channels(self):
+        """Whether each of R, G, B and A holds anything but zeros"""
+        return tuple(high > CONSTANT_TOLERANCE for high in self.maximum)
+
+
+def analyze_pixels(width, height, pixels):
+    rgba = pixels.reshape(-1, 4)
+    return TextureStats(
+        width,
+        height,
+        tuple(float(v) for v in rgba.min(axis=0)),
+        tuple(float(v) for v in rgba.max(axis=0)),
+        tuple(float(v) for v in rgba.mean(axis=0, dtype=np.float64)),
+    )
+
+
+def _analyze_file(filepath):
+    # Runs on worker threads, so errors come back as values instead of breaking the pool
+    try:
+        stats = read_texture_stats(filepath)
+        return (TextureStats(*stats) if stats is not None else None), None
+    except Exception as e:
+        return None, str(e)
+
+
+def _analyze_with_blender(filepath):
+    # For files the decoder can't read: let Blender load them and read back its pixels
+    img = bpy.data.images.load(filepath, check_existing=False)
+    try:
+        width, height = img.size
+        if not width or not height:
+            return None
+        pixels = np.empty(width * height * 4, dtype=np.float32)
+        img.pixels.foreach_get(pixels)
+        return analyze_pixels(width, height, pixels)
+    finally:
+        bpy.data.images.remove(img)
+
+
+def srgb_to_linear(value):
+    if value <= 0.04045:
+        return value / 12.92
+    return ((value + 0.055) / 1.055) ** 2.4
+
+
+class TextureAnalysis:
+    """TextureStats of texture files, stored by the hash of their contents"""
+
+    def __init__(self, material_cache, hash_index):
+        self._connection = material_cache.connection
+        self._lock = material_cache.lock
+        self._hash_index = hash_index
+        self._memory = {}
+        with self._lock:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS texture_stats ("
+                "digest TEXT PRIMARY KEY, version INTEGER, payload TEXT)"
+            )
+            self._connection.commit()
+
+    def _lookup(self, digest):
+        stats = self._memory.get(digest, _MISSING)
+        if stats is not _MISSING:
+            return stats
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT version, payload FROM texture_stats WHERE digest = ?", (digest,)
+            ).fetchone()
+        if row is None or row[0] != ANALYSIS_VERSION:
+            return _MISSING
+        payload = json.loads(row[1])
+        stats = TextureStats(*payload) if payload is not None else None
+        self._memory[digest] = stats
+        return stats
+
+    def stats_for(self, filepaths, max_workers=None):
+        """Map each file in filepaths to its TextureStats, None where it can't be decoded.
+
+        Files without stored results are analysed on worker threads. Those the decoder can't
+        read are then loaded by Blender on the calling thread, which has to be the main one.
+        Either way the results are stored, so each file's contents are analysed once.
+        """
+        digests = self._hash_index.digests(filepaths)
+        result = {}
+        missing = {}
+        for filepath, digest in digests.items():
+            stats = self._lookup(digest)
+            if stats is _MISSING:
+                missing.setdefault(digest, filepath)
+            else:
+                result[filepath] = stats
+        if missing:
+            if max_workers is None:
+                max_workers = min(len(missing), os.cpu_count() or 1)
+            rows = []
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                analyzed = list(zip(missing, executor.map(_analyze_file, missing.values())))
+            for digest, (stats, error) in analyzed:
+                if error is None and stats is None:
+                    try:
+                        stats = _analyze_with_blender(missing[digest])
+                    except Exception as e:
+                        error = str(e)
+                if error is not None:
+                    logger.warning("Could not analyse %s: %s", missing[digest], error)
+                    continue
+                self._memory[digest] = stats
+                rows.append((digest, ANALYSIS_VERSION, json.dumps(stats)))
+            with self._lock:
+                try:
+                    self._connection.executemany(
+                        "INSERT OR REPLACE INTO texture_stats VALUES (?, ?, ?)", rows
+                    )
+                    self._connection.commit()
+                except sqlite3.Error as e:
+                    logger.warning("Could not store texture stats: %s", e)
+            for filepath, digest in digests.items():
+                if filepath not in result and digest in self._memory:
+                    result[filepath] = self._memory[digest]
+        return result
+
+    def stats(self, filepath):
+        return self.stats_for([filepath]).get(filepath)
+
+
+def get_texture_analysis(root):
+    """Return the shared texture analysis for root, or None if root is not usable"""
+    if not root or not os.path.isdir(root):
+        return None
+    key = os.path.normcase(os.path.abspath(root))
+    analysis = _analyses.get(key)
+    if analysis is None:
+        hash_index = get_content_hash_index(root)
+        if hash_index is None:
+            return None
+        try:
+            analysis = TextureAnalysis(get_material_cache(root), hash_index)
+        except sqlite3.Error as e:
+            logger.warning("Could not open texture analysis in %s: %s", root, e)
+            return None
+        _analyses[key] = analysis
+    return analysis
+
+
+def close_texture_analyses():
+    # Connections belong to the material caches, which close them
+    _analyses.clear()
@@ -0,0 +1,166 @@
+from collections import namedtuple
+
+from ..constants import special_skips, special_skips_mat
+
+# Socket name suffixes that pick one component of a vector parameter, checked in order
+_COMPONENT_SUFFIXES = (("XYZ", None), ("X", 0), ("Y", 1), ("Z", 2), ("W", 3), ("Alpha", 3))
+
+_MISSING = object()
+
+MaterialSocketPlan = namedtuple("MaterialSocketPlan", ["valid", "candidates"])
+GeometrySocketPlan = namedtuple(
+    "GeometrySocketPlan", ["identifier", "name", "socket_type", "candidates", "convert"]
+)
+
+VALID_SOCKET_TYPES = {"BOOLEAN", "INT", "COLOR", "VECTOR", "VALUE", "RGBA"}
+
+# Socket name fragments never bound to a parameter, per kind of tree
+_SKIPS = {"SHADER": special_skips_mat, "GEOMETRY": special_skips}
+
+_socket_bindings = {"SHADER": {}, "GEOMETRY": {}}
+_tree_plans = {}
+
+
+def _compile_socket_binding(socket_name, skips):
+    """Ordered (parameter key, component) candidates for a socket, None if it is skipped"""
+    socket_name_lower = socket_name.lower()
+    if any(value in socket_name_lower for value in skips):
+        return None
+
+    candidates = []
+    if "/" in socket_name:
+        base_name, second_part = socket_name.split("/", 1)
+        candidates.append((base_name.lower(), None))
+        candidates.append((second_part.lower(), None))
+
+    first_word = socket_name.split(" ")[0].lower()
+    for suffix, component in _COMPONENT_SUFFIXES:
+        if socket_name.endswith(suffix):
+            candidates.append((first_word, component))
+            break
+
+    candidates.append((socket_name_lower, None))
+    if not (socket_name_lower.endswith("= none") or "=" in socket_name_lower):
+        candidates.append((first_word, None))
+
+    # A key that missed once misses again, only its first position matters
+    seen = set()
+    binding = []
+    for key, component in candidates:
+        if key not in seen:
+            seen.add(key)
+            binding.append((key, component))
+    return tuple(binding)
+
+
+def socket_binding(socket_name, kind):
+    bindings = _socket_bindings[kind]
+    binding = bindings.get(socket_name, _MISSING)
+    if binding is _MISSING:
+        binding = _compile_socket_binding(socket_name, _SKIPS[kind])
+        bindings[socket_name] = binding
+    return binding
+
+
+def resolve_binding(candidates, parameters, scalar_types):
+    """Return (found, value) for the first candidate key present in parameters.
+
+    Components are taken from vector values, values of scalar_types are used as they are.
+    """
+    for key, component in candidates:
+        value = parameters.get(key, _MISSING)
+        if value is _MISSING:
+            continue
+        if component is not None and not isinstance(value, scalar_types):
+            value = value[component]
+        return True, value
+    return False, None
+
+
+def material_socket_plan(group_tree, inputs):
+    """Per-socket plan for the inputs of a shader group node, shared by every user of the tree"""
+    key = ("SHADER", group_tree.name, len(inputs))
+    plan = _tree_plans.get(key)
+    if plan is None:
+        plan = tuple(
+            MaterialSocketPlan(
+                input_socket.type in VALID_SOCKET_TYPES,
+                socket_binding(input_socket.name, "SHADER"),
+            )
+            for input_socket in inputs
+        )
+        _tree_plans[key] = plan
+    return plan
+
+
+def _to_bool(value):
+    return bool(value)
+
+
+def _to_int(value):
+    return int(value) if isinstance(value, (int, float)) else value
+
+
+def _to_float(value):
+    return float(value) if isinstance(value, (int, float)) else value
+
+
+def _to_vector(value):
+    if isinstance(value, (list, tuple)) and len(value) >= 3:
+        return tuple(float(v) for v in value[:3])
+    return (float(value), float(value), float(value))
+
+
+def _to_color(value):
+    if isinstance(value, (list, tuple)) and len(value) >= 4:
+        return tuple(float(v) for v in value[:4])
+    if isinstance(value, (int, float)):
+        return (float(value), float(value), float(value), 1.0)
+    return (0.5, 0.5, 0.5, 1.0)
+
+
+def _unchanged(value):
+    return value
+
+
+_GEOMETRY_CONVERTERS = {
+    "NodeSocketBool": _to_bool,
+    "NodeSocketInt": _to_int,
+    "NodeSocketFloat": _to_float,
+    "NodeSocketVector": _to_vector,
+    "NodeSocketColor": _to_color,
+}
+
+GEOMETRY_RESET_VALUES = {
+    "NodeSocketBool": False,
+    "NodeSocketInt": 0,
+    "NodeSocketFloat": 0,
+    "NodeSocketVector": (0.5, 0.5, 0.5),
+    "NodeSocketColor": (0.5, 0.5, 0.5, 1.0),
+}
+
+
+def geometry_socket_plan(node_group):
+    """Input sockets of a geometry nodes group with their bindings and value converters"""
+    items = node_group.interface.items_tree
+    key = ("GEOMETRY", node_group.name, len(items))
+    plan = _tree_plans.get(key)
+    if plan is None:
+        plan = tuple(
+            GeometrySocketPlan(
+                item.identifier,
+                item.name,
+                item.bl_socket_idname,
+                socket_binding(item.name, "GEOMETRY"),
+                _GEOMETRY_CONVERTERS.get(item.bl_socket_idname, _unchanged),
+            )
+            for item in items
+            if item.item_type == "SOCKET" and item.in_out == "INPUT"
+        )
+        _tree_plans[key] = plan
+    return plan
+
+
+def clear_binding_plans():
+    """Forget tree plans, node groups may have been edited or replaced since the last run"""
+    _tree_plans.clear()
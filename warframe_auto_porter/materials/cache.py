@@ -0,0 +1,329 @@
+import ast
+import hashlib
+import importlib.util
+import json
+import os
+import site
+import sqlite3
+import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+from ..constants import (
+    material_cache_filename,
+    material_parent_keys,
+    special_aliases,
+    texture_ignores,
+)
+from ..utils.log import logger
+from .parser import PARSER_VERSION, build_material_data, read_material_lines
+
+# Rows are JSON, so a cache file shared with others can't run code when it is read
+_PAYLOAD_FORMAT = "json"
+
+# Anything that changes parser output has to change this, so stale rows are never served
+CACHE_VERSION = hashlib.sha1(
+    repr(
+        (PARSER_VERSION, _PAYLOAD_FORMAT, texture_ignores, special_aliases, material_parent_keys)
+    ).encode()
+).hexdigest()[:16]
+
+_MEMORY_LIMIT = 4096
+_COMMIT_EVERY = 64
+# Below this many files, starting worker processes costs more than parsing in place
+_PARALLEL_PARSE_MIN = 16
+
+# Loaded by file under this top level name, see porter_parse_worker.py. Its private copy of
+# the parser lives under "_" + this name.
+_WORKER_MODULE = "porter_parse_worker"
+
+_caches = {}
+
+
+def _normalize_path(path):
+    return os.path.normcase(os.path.abspath(path))
+
+
+_JSON_SCALARS = (str, int, float, bool, type(None))
+
+
+def _encode_value(value):
+    # JSON has no tuples, and literal_eval in the parser can give values JSON has no type for
+    kind = type(value)
+    if kind is list:
+        return [_encode_value(v) for v in value]
+    if kind in _JSON_SCALARS:
+        return value
+    if kind is tuple:
+        return {"tuple": [_encode_value(v) for v in value]}
+    if kind is dict:
+        return {"dict": [[_encode_value(k), _encode_value(v)] for k, v in value.items()]}
+    # Sets, bytes and complex numbers, all of which repr writes as a literal
+    return {"literal": repr(value)}
+
+
+def _decode_object(obj):
+    # Every JSON object in a payload is one of the tags written by _encode_value
+    if "tuple" in obj:
+        return tuple(obj["tuple"])
+    if "dict" in obj:
+        return dict(obj["dict"])
+    return ast.literal_eval(obj["literal"])
+
+
+def _encode_lines(lines):
+    return json.dumps(_encode_value(lines))
+
+
+def _decode_lines(payload):
+    return json.loads(payload, object_hook=_decode_object)
+
+
+def _encode_result(result):
+    # Keys are always strings, so each dict is a list of [key, value] pairs with no tags
+    return json.dumps([[[key, _encode_value(v)] for key, v in data.items()] for data in result])
+
+
+def _decode_result(payload):
+    material_items, shader_items, hierarchy_items = json.loads(
+        payload, object_hook=_decode_object
+    )
+    return OrderedDict(material_items), dict(shader_items), dict(hierarchy_items)
+
+
+# Payload (encode, decode) of each table
+_CODECS = {
+    "parsed_materials": (_encode_result, _decode_result),
+    "material_lines": (_encode_lines, _decode_lines),
+}
+
+
+def _load_worker():
+    """The worker module, loaded under its top level name so worker processes can import it"""
+    module = sys.modules.get(_WORKER_MODULE)
+    if module is None:
+        path = os.path.join(os.path.dirname(os.path.abspath(__file__)), f"{_WORKER_MODULE}.py")
+        spec = importlib.util.spec_from_file_location(_WORKER_MODULE, path)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[spec.name] = module
+        spec.loader.exec_module(module)
+    return module
+
+
+def parse_in_processes(filepaths, max_workers=None, chunksize=1):
+    """Yield (filepath, stat, result, error) for each of filepaths, parsed in worker processes.
+
+    Falls back to parsing the remaining files in this process if the pool can't be used.
+    """
+    if max_workers is None:
+        max_workers = max(1, (os.cpu_count() or 2) - 1)
+    worker = _load_worker()
+    done = set()
+    try:
+        # Workers find porter_parse_worker on their path and never import the addon package
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=site.addsitedir,
+            initargs=(os.path.dirname(worker.__file__),),
+        ) as executor:
+            for entry in executor.map(worker.parse_with_stat, filepaths, chunksize=chunksize):
+                done.add(entry[0])
+                yield entry
+    except Exception as e:
+        logger.warning("Parsing falling back to a single process: %s", e)
+        for filepath in filepaths:
+            if filepath not in done:
+                yield worker.parse_with_stat(filepath)
+
+
+class MaterialParseCache:
+    """Parse results of material .txt files, keyed by (path, size, mtime_ns).
+
+    Besides parse results it keeps the compiled lines of materials with parents, which
+    MaterialHierarchy merges line by line.
+    """
+
+    def __init__(self, db_path=None):
+        # The connection and its lock are shared with the material index living in the same file
+        self.db_path = db_path
+        self.connection = None
+        self._memory = {}
+        self._line_memory = {}
+        self._pending = 0
+        self.lock = threading.Lock()
+        if db_path:
+            self._open()
+
+    def _open(self):
+        try:
+            connection = sqlite3.connect(self.db_path, check_same_thread=False)
+            connection.execute("PRAGMA synchronous=NORMAL")
+            for table in ("parsed_materials", "material_lines"):
+                connection.execute(
+                    f"CREATE TABLE IF NOT EXISTS {table} ("
+                    "path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, version TEXT, "
+                    "payload BLOB)"
+                )
+            connection.commit()
+            self.connection = connection
+        except sqlite3.Error as e:
+            logger.warning("Material cache disabled, could not open %s: %s", self.db_path, e)
+            self.connection = None
+
+    def _fetch(self, table, memory, filepath, stat):
+        key = _normalize_path(filepath)
+        decode = _CODECS[table][1]
+        entry = memory.get(key)
+        if entry is not None and entry[0] == stat.st_size and entry[1] == stat.st_mtime_ns:
+            return decode(entry[2])
+        if self.connection is None:
+            return None
+
+        with self.lock:
+            row = self.connection.execute(
+                f"SELECT size, mtime_ns, version, payload FROM {table} WHERE path = ?",
+                (key,),
+            ).fetchone()
+        if row is None or row[0] != stat.st_size or row[1] != stat.st_mtime_ns:
+            return None
+        if row[2] != CACHE_VERSION:
+            return None
+        try:
+            value = decode(row[3])
+        except (ValueError, SyntaxError, TypeError, KeyError) as e:
+            logger.warning("Ignoring unreadable material cache row for %s: %s", filepath, e)
+            return None
+        self._remember(memory, key, stat, row[3])
+        return value
+
+    def _has(self, table, memory, filepath, stat):
+        # Like _fetch, without loading and decoding the payload
+        key = _normalize_path(filepath)
+        entry = memory.get(key)
+        if entry is not None and entry[0] == stat.st_size and entry[1] == stat.st_mtime_ns:
+            return True
+        if self.connection is None:
+            return False
+        with self.lock:
+            row = self.connection.execute(
+                f"SELECT size, mtime_ns, version FROM {table} WHERE path = ?", (key,)
+            ).fetchone()
+        return row == (stat.st_size, stat.st_mtime_ns, CACHE_VERSION)
+
+    def _put(self, table, memory, filepath, value, stat):
+        key = _normalize_path(filepath)
+        payload = _CODECS[table][0](value)
+        self._remember(memory, key, stat, payload)
+        if self.connection is None:
+            return
+        with self.lock:
+            try:
+                self.connection.execute(
+                    f"INSERT OR REPLACE INTO {table} VALUES (?, ?, ?, ?, ?)",
+                    (key, stat.st_size, stat.st_mtime_ns, CACHE_VERSION, payload),
+                )
+                self._pending += 1
+                if self._pending >= _COMMIT_EVERY:
+                    self.connection.commit()
+                    self._pending = 0
+            except sqlite3.Error as e:
+                logger.warning("Could not store %s in material cache: %s", filepath, e)
+
+    def lookup(self, filepath, stat=None):
+        """Return the cached parse result for filepath, or None if it is missing or stale"""
+        if stat is None:
+            stat = os.stat(filepath)
+        return self._fetch("parsed_materials", self._memory, filepath, stat)
+
+    def store(self, filepath, result, stat=None):
+        if stat is None:
+            stat = os.stat(filepath)
+        self._put("parsed_materials", self._memory, filepath, result, stat)
+
+    def parse(self, filepath):
+        """Drop-in replacement for parse_material_file that skips parsing on a cache hit"""
+        stat = os.stat(filepath)
+        result = self.lookup(filepath, stat)
+        if result is None:
+            lines = read_material_lines(filepath)
+            result = build_material_data(lines)
+            self.store(filepath, result, stat)
+            if result[2].get("parents"):
+                # Resolving the parents needs the lines, keep them instead of reading again
+                self._put("material_lines", self._line_memory, filepath, lines, stat)
+        return result
+
+    def lines(self, filepath):
+        """read_material_lines for filepath, skipping the file on a cache hit"""
+        stat = os.stat(filepath)
+        lines = self._fetch("material_lines", self._line_memory, filepath, stat)
+        if lines is None:
+            lines = read_material_lines(filepath)
+            self._put("material_lines", self._line_memory, filepath, lines, stat)
+        return lines
+
+    def warm(self, filepaths, max_workers=None):
+        """Parse the files in filepaths that aren't cached yet, in parallel when there are many.
+
+        Files that fail to parse are left out, parse() raises their error when it is called.
+        Returns the number of files parsed.
+        """
+        stale = []
+        for filepath in dict.fromkeys(filepaths):
+            try:
+                if not self._has("parsed_materials", self._memory, filepath, os.stat(filepath)):
+                    stale.append(filepath)
+            except OSError:
+                continue
+        if len(stale) < _PARALLEL_PARSE_MIN:
+            entries = map(_load_worker().parse_with_stat, stale)
+        else:
+            entries = parse_in_processes(stale, max_workers)
+        parsed = 0
+        for filepath, stat, result, error in entries:
+            if error is None:
+                self.store(filepath, result, stat)
+                parsed += 1
+        return parsed
+
+    def flush(self):
+        if self.connection is None:
+            return
+        with self.lock:
+            if self._pending:
+                self.connection.commit()
+                self._pending = 0
+
+    def close(self):
+        self.flush()
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    def _remember(self, memory, key, stat, payload):
+        if len(memory) >= _MEMORY_LIMIT:
+            memory.clear()
+        memory[key] = (stat.st_size, stat.st_mtime_ns, payload)
+
+
+def get_material_cache(root):
+    """Return the shared cache stored in the extracted root, memory-only if root is unusable"""
+    db_path = None
+    if root and os.path.isdir(root):
+        db_path = os.path.join(root, material_cache_filename)
+    key = _normalize_path(db_path) if db_path else None
+    cache = _caches.get(key)
+    if cache is None:
+        cache = MaterialParseCache(db_path)
+        _caches[key] = cache
+    return cache
+
+
+def close_material_caches():
+    for cache in _caches.values():
+        cache.close()
+    _caches.clear()
+    # Outside the package, so reloading the addon wouldn't replace the worker's parser
+    for name in [name for name in sys.modules if name.lstrip("_").startswith(_WORKER_MODULE)]:
+        del sys.modules[name]
@@ -0,0 +1,177 @@
+import hashlib
+import os
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+
+import bpy
+
+from ..utils.log import logger
+from .cache import get_material_cache
+from .images import source_filepath
+
+_HASH_CHUNK_SIZE = 1 << 20
+
+_indexes = {}
+
+
+def _normalize_path(path):
+    return os.path.normcase(os.path.abspath(path))
+
+
+def _hash_file(filepath):
+    # Runs on worker threads, hashlib releases the GIL while it digests each chunk
+    try:
+        stat = os.stat(filepath)
+        digest = hashlib.blake2b(digest_size=20)
+        with open(filepath, "rb") as f:
+            while chunk := f.read(_HASH_CHUNK_SIZE):
+                digest.update(chunk)
+        return filepath, stat, digest.hexdigest(), None
+    except OSError as e:
+        return filepath, None, None, str(e)
+
+
+class ContentHashIndex:
+    """Content hashes of texture files, keyed by (path, size, mtime_ns).
+
+    Stored next to the material cache, so files are only read again once they change.
+    """
+
+    def __init__(self, material_cache):
+        self._connection = material_cache.connection
+        self._lock = material_cache.lock
+        self._memory = {}
+        with self._lock:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS file_hashes ("
+                "path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, digest TEXT)"
+            )
+            self._connection.commit()
+
+    def _lookup(self, key, stat):
+        entry = self._memory.get(key)
+        if entry is None:
+            with self._lock:
+                entry = self._connection.execute(
+                    "SELECT size, mtime_ns, digest FROM file_hashes WHERE path = ?", (key,)
+                ).fetchone()
+            if entry is None:
+                return None
+            self._memory[key] = entry
+        if entry[0] != stat.st_size or entry[1] != stat.st_mtime_ns:
+            return None
+        return entry[2]
+
+    def digests(self, filepaths, max_workers=None, sizes=None):
+        """Map each readable file in filepaths to the hash of its contents.
+
+        A sizes dict, if given, gets the size of each hashed file from the same stat.
+        """
+        result = {}
+        missing = []
+        for filepath in dict.fromkeys(filepaths):
+            try:
+                stat = os.stat(filepath)
+            except OSError:
+                continue
+            digest = self._lookup(_normalize_path(filepath), stat)
+            if digest is None:
+                missing.append(filepath)
+            else:
+                result[filepath] = digest
+                if sizes is not None:
+                    sizes[filepath] = stat.st_size
+        if not missing:
+            return result
+
+        if max_workers is None:
+            max_workers = min(len(missing), os.cpu_count() or 1)
+        rows = []
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for filepath, stat, digest, error in executor.map(_hash_file, missing):
+                if error is not None:
+                    logger.warning("Could not hash %s: %s", filepath, error)
+                    continue
+                key = _normalize_path(filepath)
+                self._memory[key] = (stat.st_size, stat.st_mtime_ns, digest)
+                rows.append((key, stat.st_size, stat.st_mtime_ns, digest))
+                result[filepath] = digest
+                if sizes is not None:
+                    sizes[filepath] = stat.st_size
+        with self._lock:
+            try:
+                self._connection.executemany(
+                    "INSERT OR REPLACE INTO file_hashes VALUES (?, ?, ?, ?)", rows
+                )
+                self._connection.commit()
+            except sqlite3.Error as e:
+                logger.warning("Could not store texture hashes: %s", e)
+        return result
+
+
+def get_content_hash_index(root):
+    """Return the shared hash index for root, or None if root is not a usable directory"""
+    if not root or not os.path.isdir(root):
+        return None
+    key = os.path.normcase(os.path.abspath(root))
+    index = _indexes.get(key)
+    if index is None:
+        material_cache = get_material_cache(root)
+        if material_cache.connection is None:
+            return None
+        try:
+            index = ContentHashIndex(material_cache)
+        except sqlite3.Error as e:
+            logger.warning("Could not open texture hash index in %s: %s", root, e)
+            return None
+        _indexes[key] = index
+    return index
+
+
+def close_content_hash_indexes():
+    # Connections belong to the material caches, which close them
+    _indexes.clear()
+
+
+def deduplicate_images(hash_index, images=None):
+    """Remap the users of images with identical files and settings to one of them.
+
+    Images only count as duplicates when their files have the same contents and they use
+    the same colorspace and alpha mode. In each group the image with the most users is
+    kept and the others are removed. Returns (removed image count, their file bytes).
+    """
+    if images is None:
+        images = bpy.data.images
+    sources = {}
+    for img in images:
+        if img.packed_file is not None or img.library is not None:
+            continue
+        filepath = source_filepath(img)
+        if filepath:
+            sources[img.name] = filepath
+    sizes = {}
+    digests = hash_index.digests(sources.values(), sizes=sizes)
+
+    groups = {}
+    for name, filepath in sources.items():
+        digest = digests.get(filepath)
+        if digest is None:
+            continue
+        img = bpy.data.images[name]
+        key = (digest, img.colorspace_settings.name, img.alpha_mode)
+        groups.setdefault(key, []).append(img)
+
+    removed = 0
+    removed_bytes = 0
+    for group in groups.values():
+        if len(group) < 2:
+            continue
+        group.sort(key=lambda img: (-img.users, img.name))
+        keep = group[0]
+        for duplicate in group[1:]:
+            # The size hashed, the file may have gone since
+            removed_bytes += sizes[sources[duplicate.name]]
+            duplicate.user_remap(keep)
+            bpy.data.images.remove(duplicate)
+            removed += 1
+    return removed, removed_bytes
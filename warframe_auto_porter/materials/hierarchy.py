@@ -0,0 +1,115 @@
+import os
+
+from ..utils.log import logger
+from ..utils.path_utils import find_internal_path
+from .cache import get_material_cache
+from .parser import MATERIAL_LINE, PARENT_LINE, SHADER_LINE, build_material_data
+
+
+def _line_keys(lines):
+    return {(target, key) for target, key, _, _ in lines}
+
+
+def _overlay(base_lines, top_lines):
+    """Lines of top replace lines of base that set the same key"""
+    replaced = _line_keys(top_lines)
+    if any(target == SHADER_LINE for target, _, _, _ in top_lines):
+        # A material has one pixel shader, the most derived one wins
+        return [
+            line
+            for line in base_lines
+            if line[0] != SHADER_LINE and (line[0], line[1]) not in replaced
+        ] + top_lines
+    return [line for line in base_lines if (line[0], line[1]) not in replaced] + top_lines
+
+
+def _inherited(line):
+    # A parent's own parent reference is only an ordinary value to its children
+    target, key, payload, cacheable = line
+    if target == PARENT_LINE:
+        return (MATERIAL_LINE, key, payload[1], cacheable)
+    return line
+
+
+class MaterialHierarchy:
+    """Resolves material inheritance for one run.
+
+    Every resolved file is kept in a graph shared by all materials of the run, so skins
+    that share a base material read that base once instead of once per child. Files are
+    read through the material cache, so unchanged parents are not read again across runs.
+    Files on an inheritance loop are resolved again by every run that reaches them.
+
+    The keys naming a parent (constants.material_parent_keys) haven't been checked against
+    real material dumps yet, so parents are only merged with resolve_parents set. Otherwise
+    resolve is the cached parse of the file alone.
+    """
+
+    def __init__(self, root, material_cache=None, extract=None, resolve_parents=False):
+        self.root = root
+        self.material_cache = material_cache or get_material_cache(root)
+        self.extract = extract
+        self.resolve_parents = resolve_parents
+        self._resolved = {}
+
+    def parent_path(self, parent_ref):
+        internal_path = find_internal_path(parent_ref)
+        if not internal_path or not self.root:
+            return None
+        parent_path = os.path.join(self.root, internal_path) + ".txt"
+        if not os.path.exists(parent_path):
+            if self.extract is None or not self.extract(internal_path):
+                return None
+            if not os.path.exists(parent_path):
+                return None
+        return parent_path
+
+    def resolve(self, filepath):
+        """parse_material_file with parent materials merged underneath the file's own values"""
+        result = self.material_cache.parse(filepath)
+        if not self.resolve_parents or not result[2].get("parents"):
+            return result
+
+        lines, resolved_parents, _ = self._lines(filepath, ())
+        material_data, shader_data, hierarchy_data = build_material_data(lines)
+        hierarchy_data["resolved"] = list(resolved_parents)
+        return material_data, shader_data, hierarchy_data
+
+    def _key(self, filepath):
+        return os.path.normcase(os.path.abspath(filepath))
+
+    def _lines(self, filepath, chain):
+        """Return (merged lines, resolved parent paths, whether no inheritance loop cut them)"""
+        key = self._key(filepath)
+        resolved = self._resolved.get(key)
+        if resolved is not None:
+            return resolved + (True,)
+
+        own_lines = self.material_cache.lines(filepath)
+        merged = []
+        resolved_parents = []
+        complete = True
+        chain = chain + (key,)
+        for target, _, payload, _ in own_lines:
+            if target != PARENT_LINE:
+                continue
+            parent_path = self.parent_path(payload[0])
+            if parent_path is None:
+                logger.warning("Parent material not found: %s", payload[0])
+                continue
+            if self._key(parent_path) in chain:
+                logger.warning(
+                    "Material inheritance loop at %s, ignoring %s", filepath, parent_path
+                )
+                complete = False
+                continue
+            parent_lines, parent_parents, parent_complete = self._lines(parent_path, chain)
+            complete = complete and parent_complete
+            merged = _overlay(merged, [_inherited(line) for line in parent_lines])
+            resolved_parents.extend(parent_parents)
+            resolved_parents.append(parent_path)
+
+        lines = _overlay(merged, own_lines)
+        if complete:
+            # A file on a loop misses the parents cut off below it, so it is never kept
+            self._resolved[key] = (lines, resolved_parents)
+        return lines, resolved_parents, complete
@@ -0,0 +1,230 @@
+import os
+import time
+
+import bpy
+from bpy.app.handlers import persistent
+
+from ..utils.log import logger
+from ..utils.texture_decode import decode_textures
+
+# Set on images filled from decoded pixels, holds the file they were decoded from
+_SOURCE_PROPERTY = "porter_source_file"
+# Set on images showing a texture proxy, holds the full resolution file
+_FULL_RESOLUTION_PROPERTY = "porter_full_resolution"
+
+# (path, colorspace, alpha mode) -> image name
+_image_names = {}
+_claimed = set()
+# Paths that already have an image, gathered on the first preload of a run
+_known_paths = None
+
+
+def _path_key(filepath):
+    return os.path.normcase(os.path.normpath(bpy.path.abspath(filepath)))
+
+
+def _is_configured(img, colorspace, alpha_mode):
+    return img.colorspace_settings.name == colorspace and img.alpha_mode == alpha_mode
+
+
+def _configure(img, colorspace, alpha_mode):
+    # Each assignment frees the image buffer and GPU texture, even when the value is the same
+    if img.colorspace_settings.name != colorspace:
+        img.colorspace_settings.name = colorspace
+    if img.alpha_mode != alpha_mode:
+        img.alpha_mode = alpha_mode
+
+
+def _find_configured(path_key, colorspace, alpha_mode):
+    for img in bpy.data.images:
+        if (
+            img.source == "FILE"
+            and img.filepath
+            and _path_key(img.filepath) == path_key
+            and _is_configured(img, colorspace, alpha_mode)
+        ):
+            return img
+    return None
+
+
+def load_image(filepath, colorspace, alpha_mode):
+    """Image datablock for filepath with the given colorspace and alpha mode.
+
+    An image already set up that way is reused. An image that has no users yet is set up in
+    place; one that is in use with other settings is left alone and a separate datablock is
+    loaded, so a file read as both sRGB and Non-Color keeps one image per colorspace.
+    """
+    path_key = _path_key(filepath)
+    key = (path_key, colorspace, alpha_mode)
+    name = _image_names.get(key)
+    if name is not None:
+        img = bpy.data.images.get(name)
+        if (
+            img is not None
+            and _path_key(img.filepath) == path_key
+            and _is_configured(img, colorspace, alpha_mode)
+        ):
+            return img
+        del _image_names[key]
+        _claimed.discard(name)
+
+    img = bpy.data.images.load(filepath, check_existing=True)
+    if not _is_configured(img, colorspace, alpha_mode):
+        if img.users == 0 and img.name not in _claimed:
+            _configure(img, colorspace, alpha_mode)
+        else:
+            img = _find_configured(path_key, colorspace, alpha_mode)
+            if img is None:
+                img = bpy.data.images.load(filepath, check_existing=False)
+                _configure(img, colorspace, alpha_mode)
+                logger.debug(
+                    "Loaded %s as a separate %s image: %s", filepath, colorspace, img.name
+                )
+    _image_names[key] = img.name
+    _claimed.add(img.name)
+    if _known_paths is not None:
+        _known_paths.add(path_key)
+    return img
+
+
+def load_proxy_image(proxy_path, full_path, colorspace, alpha_mode):
+    """load_image for a downscaled proxy, remembering the full resolution file on the image"""
+    if proxy_path == full_path:
+        return load_image(full_path, colorspace, alpha_mode)
+    img = load_image(proxy_path, colorspace, alpha_mode)
+    if img.get(_FULL_RESOLUTION_PROPERTY) != full_path:
+        if img.users == 0:
+            # Named after the texture rather than the hash the proxy file is named after
+            _claimed.discard(img.name)
+            img.name = os.path.basename(full_path)
+            _claimed.add(img.name)
+            _image_names[(_path_key(proxy_path), colorspace, alpha_mode)] = img.name
+        img[_FULL_RESOLUTION_PROPERTY] = full_path
+    return img
+
+
+def load_full_resolution(images=None):
+    """Point images showing a proxy back at their full resolution file, returns how many"""
+    if images is None:
+        images = bpy.data.images
+    count = 0
+    for img in images:
+        full_path = img.get(_FULL_RESOLUTION_PROPERTY)
+        if full_path is None:
+            continue
+        del img[_FULL_RESOLUTION_PROPERTY]
+        if img.get(_SOURCE_PROPERTY) is not None:
+            del img[_SOURCE_PROPERTY]
+        if img.source != "FILE":
+            img.source = "FILE"
+        img.filepath = full_path
+        count += 1
+    return count
+
+
+def _image_from_pixels(filepath, decoded, colorspace, alpha_mode):
+    # Blender loads 16 bit files into float buffers too, a byte buffer would cut them to 8 bits
+    img = bpy.data.images.new(
+        os.path.basename(filepath),
+        decoded.width,
+        decoded.height,
+        alpha=True,
+        float_buffer=decoded.high_bit_depth,
+    )
+    # Colour settings first, changing them afterwards would clear the generated buffer
+    _configure(img, colorspace, alpha_mode)
+    img.pixels.foreach_set(decoded.pixels)
+    img.filepath_raw = filepath
+    img[_SOURCE_PROPERTY] = filepath
+    return img
+
+
+def preload_images(requests):
+    """Decode the files of (path, colorspace, alpha mode) requests on worker threads.
+
+    The images are created on the calling thread as the pixels come in, and load_image
+    returns them for the same settings. Files that already have an image, or that the
+    decoder does not support, are left to load_image. Returns how many images were made.
+    """
+    global _known_paths
+    if _known_paths is None:
+        _known_paths = {_path_key(img.filepath) for img in bpy.data.images if img.filepath}
+    pending = {}
+    for filepath, colorspace, alpha_mode in requests:
+        path_key = _path_key(filepath)
+        if path_key not in _known_paths and path_key not in pending:
+            pending[path_key] = (filepath, colorspace, alpha_mode)
+    if not pending:
+        return 0
+
+    start_time = time.time()
+    created = 0
+    window_manager = bpy.context.window_manager
+    window_manager.progress_begin(0, len(pending))
+    try:
+        decoded_files = decode_textures(filepath for filepath, _, _ in pending.values())
+        for step, ((path_key, request), (filepath, decoded, error)) in enumerate(
+            zip(pending.items(), decoded_files), 1
+        ):
+            window_manager.progress_update(step)
+            if decoded is None:
+                if error is not None:
+                    logger.warning("Could not decode %s: %s", filepath, error)
+                continue
+            _, colorspace, alpha_mode = request
+            img = _image_from_pixels(filepath, decoded, colorspace, alpha_mode)
+            _image_names[(path_key, colorspace, alpha_mode)] = img.name
+            _claimed.add(img.name)
+            _known_paths.add(path_key)
+            created += 1
+    finally:
+        window_manager.progress_end()
+    logger.info(
+        "Decoded %d of %d textures in %.2fs", created, len(pending), time.time() - start_time
+    )
+    return created
+
+
+def source_filepath(img):
+    """Absolute path of the file an image shows, also for images filled by preload_images"""
+    filepath = img.get(_SOURCE_PROPERTY)
+    if filepath is None:
+        if img.source != "FILE" or not img.filepath:
+            return None
+        filepath = img.filepath
+    return bpy.path.abspath(filepath, library=img.library)
+
+
+@persistent
+def restore_file_images(_=None):
+    """Turn images filled from decoded pixels back into file images.
+
+    preload_images fills generated images, because a file image would read its file again
+    the first time its pixels are touched. A blend saved with those would reopen them as
+    blank generated images, so this runs on save_pre. Autosave and crash recovery files
+    skip save_pre, so it runs on load_post as well and fixes any such file as it is opened,
+    and unregister runs it so disabling the addon leaves no generated images behind.
+    Returns how many images were turned back.
+    """
+    count = 0
+    for img in bpy.data.images:
+        filepath = img.get(_SOURCE_PROPERTY)
+        if filepath is None:
+            continue
+        del img[_SOURCE_PROPERTY]
+        if img.source != "FILE":
+            # Frees the decoded pixels, Blender reads the file again when it needs them
+            img.source = "FILE"
+        img.filepath = filepath
+        count += 1
+    if count:
+        logger.debug("Turned %d decoded images back into file images", count)
+    return count
+
+
+def clear_image_cache():
+    """Forget the images of the last run, they may have been renamed or removed since"""
+    global _known_paths
+    _image_names.clear()
+    _claimed.clear()
+    _known_paths = None
@@ -0,0 +1,244 @@
+import os
+import sqlite3
+
+from ..utils.log import logger
+from .cache import get_material_cache, parse_in_processes
+
+_INDEX_CHUNK_SIZE = 64
+
+_indexes = {}
+
+
+def _normalize_ref(ref):
+    return ref.replace("\\", "/").strip("/").lower()
+
+
+def _shader_name(shader_path):
+    return shader_path.split("_p.hlsl")[0].split("/")[-2]
+
+
+def _is_material(result):
+    # Other .txt files under the root have neither a pixel shader nor textures
+    material_data, shader_data, _ = result
+    return bool(shader_data) or any(key.startswith("TX:") for key in material_data)
+
+
+def _material_refs(material_data, shader_data):
+    refs = set()
+    for shader_path in shader_data:
+        refs.add(("shader", shader_path))
+        if "_p.hlsl" in shader_path and shader_path.count("/") >= 1:
+            refs.add(("shader_name", _shader_name(shader_path)))
+    for key, value in material_data.items():
+        if key.startswith("TX:"):
+            if isinstance(value, str):
+                refs.add(("texture", _normalize_ref(value)))
+            continue
+        if ":" in key:
+            key = key.split(":", 1)[1]
+        refs.add(("parameter", key.lower()))
+    return refs
+
+
+class MaterialIndex:
+    """Inverted index of every material .txt under the extracted root.
+
+    Other .txt files are remembered in ignored_files, so they are only parsed again once
+    they change. Rows of files that were deleted are dropped on the next build.
+    """
+
+    def __init__(self, root, material_cache):
+        self.root = root
+        self._material_cache = material_cache
+        self._connection = material_cache.connection
+        self._lock = material_cache.lock
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS indexed_materials ("
+            "path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, shader_name TEXT)"
+        )
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS material_refs (kind TEXT, ref TEXT, path TEXT)"
+        )
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS ignored_files ("
+            "path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER)"
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS material_refs_lookup ON material_refs (kind, ref)"
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS material_refs_path ON material_refs (path)"
+        )
+        self._connection.commit()
+
+    def _material_files(self):
+        for dirpath, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                if filename.lower().endswith(".txt"):
+                    yield os.path.join(dirpath, filename)
+
+    def _stale_files(self):
+        """Return (files to parse, relative paths of indexed files that no longer exist)"""
+        with self._lock:
+            known = {
+                path: (size, mtime_ns)
+                for table in ("indexed_materials", "ignored_files")
+                for path, size, mtime_ns in self._connection.execute(
+                    f"SELECT path, size, mtime_ns FROM {table}"
+                )
+            }
+        stale = []
+        present = set()
+        for filepath in self._material_files():
+            rel = os.path.relpath(filepath, self.root)
+            try:
+                stat = os.stat(filepath)
+            except OSError:
+                continue
+            present.add(rel)
+            if known.get(rel) != (stat.st_size, stat.st_mtime_ns):
+                stale.append(filepath)
+        return stale, [rel for rel in known if rel not in present]
+
+    def _remove(self, rels):
+        rows = [(rel,) for rel in rels]
+        with self._lock:
+            self._connection.executemany("DELETE FROM material_refs WHERE path = ?", rows)
+            self._connection.executemany("DELETE FROM indexed_materials WHERE path = ?", rows)
+            self._connection.executemany("DELETE FROM ignored_files WHERE path = ?", rows)
+
+    def build(self, max_workers=None, progress=None):
+        """Parse every changed material file under root and refresh its lookups.
+
+        Returns (indexed, failed) counts. Parse results also warm the material cache.
+        """
+        if max_workers is None:
+            max_workers = max(1, (os.cpu_count() or 2) - 1)
+        filepaths, removed = self._stale_files()
+        if removed:
+            self._remove(removed)
+            logger.info("Dropped %d deleted files from the material index", len(removed))
+        material_cache = self._material_cache
+        indexed = 0
+        failed = 0
+        for count, (filepath, stat, result, error) in enumerate(
+            parse_in_processes(filepaths, max_workers, _INDEX_CHUNK_SIZE), 1
+        ):
+            if error is not None:
+                failed += 1
+                logger.warning("Could not index %s: %s", filepath, error)
+            elif not _is_material(result):
+                self._ignore(filepath, stat)
+            else:
+                material_cache.store(filepath, result, stat)
+                self._store(filepath, stat, result)
+                indexed += 1
+            if progress is not None:
+                progress(count, len(filepaths))
+        with self._lock:
+            self._connection.commit()
+        return indexed, failed
+
+    def _store(self, filepath, stat, result):
+        material_data, shader_data, _ = result
+        rel = os.path.relpath(filepath, self.root)
+        refs = _material_refs(material_data, shader_data)
+        shader_name = next((ref for kind, ref in refs if kind == "shader_name"), None)
+        with self._lock:
+            self._connection.execute("DELETE FROM ignored_files WHERE path = ?", (rel,))
+            self._connection.execute("DELETE FROM material_refs WHERE path = ?", (rel,))
+            self._connection.executemany(
+                "INSERT INTO material_refs VALUES (?, ?, ?)",
+                [(kind, ref, rel) for kind, ref in refs],
+            )
+            self._connection.execute(
+                "INSERT OR REPLACE INTO indexed_materials VALUES (?, ?, ?, ?)",
+                (rel, stat.st_size, stat.st_mtime_ns, shader_name),
+            )
+
+    def _ignore(self, filepath, stat):
+        rel = os.path.relpath(filepath, self.root)
+        self._remove([rel])
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO ignored_files VALUES (?, ?, ?)",
+                (rel, stat.st_size, stat.st_mtime_ns),
+            )
+
+    def _lookup(self, kind, ref):
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT path FROM material_refs WHERE kind = ? AND ref = ?", (kind, ref)
+            ).fetchall()
+        return [os.path.join(self.root, row[0]) for row in rows]
+
+    def materials_for_shader(self, shader):
+        """Materials using a shader, given either its *_p.hlsl path or its shader name"""
+        shader = shader.lower()
+        if "_p.hlsl" in shader:
+            return self._lookup("shader", shader)
+        return self._lookup("shader_name", shader)
+
+    def materials_for_texture(self, texture_path):
+        return self._lookup("texture", _normalize_ref(texture_path))
+
+    def materials_for_parameter(self, key):
+        return self._lookup("parameter", key.lower())
+
+    def find(self, kind, query):
+        """Materials referencing query, kind being "shader", "texture" or "parameter".
+
+        Exact references are tried first. Without any, references containing query match.
+        """
+        if kind == "shader":
+            materials = self.materials_for_shader(query)
+            kinds = ("shader", "shader_name")
+        elif kind == "texture":
+            materials = self.materials_for_texture(query)
+            kinds = ("texture",)
+        else:
+            materials = self.materials_for_parameter(query)
+            kinds = ("parameter",)
+        if materials:
+            return materials
+        fragment = _normalize_ref(query) if kind == "texture" else query.lower()
+        placeholders = ", ".join("?" * len(kinds))
+        with self._lock:
+            rows = self._connection.execute(
+                f"SELECT DISTINCT path FROM material_refs WHERE kind IN ({placeholders}) "
+                "AND instr(ref, ?) > 0 ORDER BY path",
+                (*kinds, fragment),
+            ).fetchall()
+        return [os.path.join(self.root, row[0]) for row in rows]
+
+    def shader_for_material(self, filepath):
+        rel = os.path.relpath(filepath, self.root)
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT shader_name FROM indexed_materials WHERE path = ?", (rel,)
+            ).fetchone()
+        return row[0] if row else None
+
+
+def get_material_index(root):
+    """Return the shared index for root, or None if root is not a usable directory"""
+    if not root or not os.path.isdir(root):
+        return None
+    key = os.path.normcase(os.path.abspath(root))
+    index = _indexes.get(key)
+    if index is None:
+        material_cache = get_material_cache(root)
+        if material_cache.connection is None:
+            return None
+        try:
+            index = MaterialIndex(root, material_cache)
+        except sqlite3.Error as e:
+            logger.warning("Could not open material index in %s: %s", root, e)
+            return None
+        _indexes[key] = index
+    return index
+
+
+def close_material_indexes():
+    # Connections belong to the material caches, which close them
+    _indexes.clear()
@@ -0,0 +1,152 @@
+import json
+import os
+from collections import namedtuple
+
+import bpy
+
+from ..constants import shader_manifest_filename, shader_manifest_version
+from ..utils.log import logger
+
+BlendContents = namedtuple("BlendContents", ["materials", "node_groups", "collections"])
+AppendedData = namedtuple("AppendedData", ["materials", "node_groups", "images"])
+
+_blend_contents = {}
+_manifests = {}
+
+
+def _load_manifest(library_path):
+    """Blend entries of the shader manifest in library_path, or None if there is none"""
+    manifest_path = os.path.join(library_path, shader_manifest_filename)
+    try:
+        mtime_ns = os.stat(manifest_path).st_mtime_ns
+    except OSError:
+        return None
+    key = os.path.normcase(os.path.abspath(library_path))
+    cached = _manifests.get(key)
+    if cached is not None and cached[0] == mtime_ns:
+        return cached[1]
+
+    blends = None
+    try:
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("version") == shader_manifest_version:
+            blends = manifest.get("blends")
+        else:
+            logger.warning("Ignoring outdated shader manifest %s", manifest_path)
+    except (OSError, ValueError) as e:
+        logger.warning("Could not read shader manifest %s: %s", manifest_path, e)
+    _manifests[key] = (mtime_ns, blends)
+    return blends
+
+
+def _manifest_entry(blend_path, stat):
+    # Entries only count while the blend is the exact file that was scanned
+    blends = _load_manifest(os.path.dirname(blend_path))
+    if not blends:
+        return None
+    entry = blends.get(os.path.basename(blend_path))
+    if entry is None:
+        return None
+    if entry.get("size") != stat.st_size or entry.get("mtime_ns") != stat.st_mtime_ns:
+        return None
+    return entry
+
+
+def get_blend_contents(blend_path):
+    """Names of the materials, node groups and collections in a .blend file.
+
+    Read from the shader manifest when it is up to date, otherwise from the file itself.
+    Either way the result is reused until the file's mtime changes.
+    """
+    stat = os.stat(blend_path)
+    key = os.path.normcase(os.path.abspath(blend_path))
+    cached = _blend_contents.get(key)
+    if cached is not None and cached[0] == stat.st_mtime_ns:
+        return cached[1]
+
+    entry = _manifest_entry(blend_path, stat)
+    if entry is not None:
+        contents = BlendContents(
+            tuple(entry.get("materials", ())),
+            tuple(entry.get("node_groups", ())),
+            tuple(entry.get("collections", ())),
+        )
+    else:
+        with bpy.data.libraries.load(blend_path, link=False) as (data_from, data_to):
+            contents = BlendContents(
+                tuple(data_from.materials),
+                tuple(data_from.node_groups),
+                tuple(data_from.collections),
+            )
+    _blend_contents[key] = (stat.st_mtime_ns, contents)
+    return contents
+
+
+def _material_rounds(names):
+    # libraries.load takes each name once, so the nth request of a name goes in round n
+    rounds = []
+    requested = {}
+    for position, name in enumerate(names):
+        round_index = requested.get(name, 0)
+        requested[name] = round_index + 1
+        if round_index == len(rounds):
+            rounds.append([])
+        rounds[round_index].append(position)
+    return rounds
+
+
+def _node_tree_images(node_tree, images, seen):
+    if node_tree is None or node_tree in seen:
+        return
+    seen.add(node_tree)
+    for node in node_tree.nodes:
+        if node.type == "TEX_IMAGE" and node.image is not None:
+            images.add(node.image.name)
+        elif node.type == "GROUP":
+            _node_tree_images(node.node_tree, images, seen)
+
+
+def append_from_blend(blend_path, materials=(), node_groups=()):
+    """Append materials and node groups from blend_path through the data API.
+
+    Every distinct name is loaded in one read of the file. A material name given n times
+    gets n independent copies, read again once per repeat. Node groups that are already in
+    the file, by name, are reused instead of appended.
+
+    Returns AppendedData: the new material for each name in materials (None where the blend
+    has no such material), the new node groups, and the names of the images the new
+    materials brought along.
+    """
+    materials = list(materials)
+    node_groups = [name for name in dict.fromkeys(node_groups) if name not in bpy.data.node_groups]
+    rounds = _material_rounds(materials)
+    if not rounds and node_groups:
+        rounds = [[]]
+
+    appended = [None] * len(materials)
+    new_node_groups = []
+    for round_index, positions in enumerate(rounds):
+        with bpy.data.libraries.load(blend_path, link=False) as (data_from, data_to):
+            available = set(data_from.materials)
+            found = [position for position in positions if materials[position] in available]
+            data_to.materials = [materials[position] for position in found]
+            if round_index == 0:
+                available_groups = set(data_from.node_groups)
+                data_to.node_groups = [name for name in node_groups if name in available_groups]
+        for position, material in zip(found, data_to.materials):
+            appended[position] = material
+        if round_index == 0:
+            new_node_groups = [group for group in data_to.node_groups if group is not None]
+
+    images = set()
+    seen = set()
+    for material in appended:
+        if material is not None:
+            _node_tree_images(material.node_tree, images, seen)
+    return AppendedData(appended, new_node_groups, images)
+
+
+def clear_blend_contents():
+    _blend_contents.clear()
+    _manifests.clear()
@@ -1,150 +1,284 @@
+import functools
 import os
 import re
+from collections import namedtuple
 
 import bpy
 
+from ..utils.log import logger
+from .library import get_blend_contents
+
+_TRIGRAM_SIZE = 3
+
+_shader_libraries = {}
+
+
+def _trigrams(text):
+    return {text[i : i + _TRIGRAM_SIZE] for i in range(len(text) - _TRIGRAM_SIZE + 1)}
+
+
+class ShaderLibraryIndex:
+    """Listing of the .blend files in a shader library folder.
+
+    The folder is listed again only when its mtime changes. Besides exact (case-insensitive)
+    names it keeps a trigram index for substring lookups and remembers resolved shader names.
+    """
+
+    def __init__(self, library_path):
+        self.library_path = library_path
+        self._mtime_ns = None
+        self._filenames = []
+        self._exact = {}
+        self._trigrams = {}
+        self._resolved = {}
+
+    def refresh(self):
+        mtime_ns = os.stat(self.library_path).st_mtime_ns
+        if mtime_ns == self._mtime_ns:
+            return
+        # Listing order decides between several substring matches, as it always has
+        self._filenames = [f for f in os.listdir(self.library_path) if f.endswith(".blend")]
+        self._exact = {}
+        self._trigrams = {}
+        for position, filename in enumerate(self._filenames):
+            filename_lower = filename.lower()
+            self._exact.setdefault(filename_lower, filename)
+            for trigram in _trigrams(filename_lower):
+                self._trigrams.setdefault(trigram, []).append(position)
+        self._resolved = {}
+        self._mtime_ns = mtime_ns
+
+    def _substring_match(self, name_lower):
+        if len(name_lower) < _TRIGRAM_SIZE:
+            candidates = range(len(self._filenames))
+        else:
+            candidates = None
+            for trigram in _trigrams(name_lower):
+                positions = self._trigrams.get(trigram)
+                if not positions:
+                    return None
+                candidates = (
+                    set(positions) if candidates is None else candidates.intersection(positions)
+                )
+                if not candidates:
+                    return None
+            candidates = sorted(candidates)
+        for position in candidates:
+            filename = self._filenames[position]
+            if name_lower in filename.lower():
+                return filename
+        return None
+
+    def find(self, shader_name):
+        """Return the .blend filename for shader_name, or None"""
+        self.refresh()
+        name_lower = shader_name.lower()
+        if name_lower in self._resolved:
+            return self._resolved[name_lower]
+        filename = self._exact.get(f"{name_lower}.blend")
+        if filename is None:
+            filename = self._substring_match(name_lower)
+        self._resolved[name_lower] = filename
+        return filename
+
+
+def get_shader_library_index(shader_library_path):
+    key = os.path.normcase(os.path.abspath(shader_library_path))
+    library_index = _shader_libraries.get(key)
+    if library_index is None:
+        library_index = ShaderLibraryIndex(shader_library_path)
+        _shader_libraries[key] = library_index
+    return library_index
+
 
 def find_shader_material(shader_name, shader_library_path):
-    shader_files = {}
-    for f in os.listdir(shader_library_path):
-        if f.endswith(".blend"):
-            shader_files[f.lower()] = f
-
-    target_file = f"{shader_name}.blend"
-    if target_file in shader_files:
-        original_filename = shader_files[target_file.lower()]
+    original_filename = get_shader_library_index(shader_library_path).find(shader_name)
+    if original_filename is not None:
         return os.path.join(shader_library_path, original_filename), None
 
-    for original_filename in shader_files.values():
-        if shader_name.lower() in original_filename.lower():
-            return os.path.join(shader_library_path, original_filename), None
-
     return None, f"No shader file found for {shader_name}"
 
 
-def _should_exclude_material(mat_name):
-    mat_lower = mat_name.lower()
-    if re.search(r"\bstroke\b", mat_lower):
-        return True
-    if re.search(r"\bdev\b", mat_lower):
-        return True
-    return False
+_EXCLUDE_PATTERN = re.compile(r"\b(?:stroke|dev)\b")
+_BRACKET_PATTERN = re.compile(r"\[(.+?)\]")
 
+# Fallback tiers for names that match no parameter, best first
+_BASIC_TIER = 0
+_TINT_MASK_TIER = 1
+_DEFAULT_TIER = 2
+_NO_PAREN_TIER = 3
 
-def _filter_by_shader_bracket(materials, shader_name):
-    bracket_pattern = re.compile(r"\[(.+?)\]")
-    has_any_brackets = False
-    matched = []
-    unbracketed = []
+MaterialVariant = namedtuple("MaterialVariant", ["name", "bracket", "content", "combo", "tier"])
 
-    for mat in materials:
-        m = bracket_pattern.search(mat)
-        if m:
-            has_any_brackets = True
-            if m.group(1).lower() == shader_name.lower():
-                matched.append(mat)
-        else:
-            unbracketed.append(mat)
+_variant_indexes = {}
 
-    if not has_any_brackets:
-        return materials
+_enum_items = {}
+_pending_enum_refreshes = set()
 
-    if matched:
-        return matched
 
-    return unbracketed
+def _parse_variant(mat_name):
+    """Split a material name like "Name [Shader] (A + B)" into its ranking parts"""
+    m = _BRACKET_PATTERN.search(mat_name)
+    bracket = m.group(1).lower() if m else None
 
+    content = None
+    combo = None
+    if "(" in mat_name and ")" in mat_name:
+        content = mat_name.split("(")[1].split(")")[0]
+        if "+" in content:
+            combo = frozenset(p.strip() for p in content.split("+"))
+            content = None
 
-def get_best_material_from_blend(blend_path, params, shader_name=None):
-    materials = []
-    with bpy.data.libraries.load(blend_path, link=False) as (data_from, data_to):
-        for mat_name in data_from.materials:
-            if not _should_exclude_material(mat_name):
-                materials.append(mat_name)
+    upper_mat = mat_name.upper()
+    if "(BASIC)" in upper_mat:
+        tier = _BASIC_TIER
+    elif "(TINT_MASK)" in upper_mat:
+        tier = _TINT_MASK_TIER
+    elif "(DEFAULT)" in upper_mat:
+        tier = _DEFAULT_TIER
+    elif "(" not in mat_name or ")" not in mat_name:
+        tier = _NO_PAREN_TIER
+    else:
+        tier = None
+    return MaterialVariant(mat_name, bracket, content, combo, tier)
+
+
+class BlendVariantIndex:
+    """Material variants of one shader .blend, parsed once per file version"""
+
+    def __init__(self, material_names):
+        self.variants = [
+            _parse_variant(mat_name)
+            for mat_name in material_names
+            if not _EXCLUDE_PATTERN.search(mat_name.lower())
+        ]
+        self._has_brackets = any(variant.bracket is not None for variant in self.variants)
+        self._by_shader = {}
+
+    def variants_for_shader(self, shader_name):
+        """Variants tagged [shader_name], else the untagged ones, else all if none are tagged"""
+        if shader_name is None or not self._has_brackets:
+            return self.variants
+        shader_name = shader_name.lower()
+        variants = self._by_shader.get(shader_name)
+        if variants is None:
+            variants = [variant for variant in self.variants if variant.bracket == shader_name]
+            if not variants:
+                variants = [variant for variant in self.variants if variant.bracket is None]
+            self._by_shader[shader_name] = variants
+        return variants
 
-    if shader_name is not None:
-        materials = _filter_by_shader_bracket(materials, shader_name)
 
+def get_blend_variant_index(blend_path):
+    contents = get_blend_contents(blend_path)
+    key = os.path.normcase(os.path.abspath(blend_path))
+    cached = _variant_indexes.get(key)
+    if cached is not None and cached[0] is contents:
+        return cached[1]
+    variant_index = BlendVariantIndex(contents.materials)
+    _variant_indexes[key] = (contents, variant_index)
+    return variant_index
+
+
+def _valid_params(params):
     valid_params = set()
     for key, value in params.items():
         if value == 0 or (isinstance(value, str) and value.upper() == "NONE"):
             continue
         valid_params.add(str(key))
         valid_params.add(str(value))
+    return valid_params
+
 
-    theoretical_best = []
-    parameter_combinations = []
-    basic_mats = []
-    tint_mask_mats = []
-    default_mats = []
-    no_paren_mats = []
-
-    for mat in materials:
-        upper_mat = mat.upper()
-
-        if "(" in mat and ")" in mat:
-            content = mat.split("(")[1].split(")")[0]
-
-            if "+" in content:
-                params_in_name = [p.strip() for p in content.split("+")]
-                if all(param in valid_params for param in params_in_name):
-                    parameter_combinations.append(mat)
-                    continue
-
-            elif content in valid_params:
-                theoretical_best.append(mat)
-                continue
-
-        if "(BASIC)" in upper_mat:
-            basic_mats.append(mat)
-        elif "(TINT_MASK)" in upper_mat:
-            tint_mask_mats.append(mat)
-        elif "(DEFAULT)" in upper_mat:
-            default_mats.append(mat)
-        elif "(" not in mat or ")" not in mat:
-            no_paren_mats.append(mat)
-
-    if parameter_combinations:
-        return parameter_combinations[0]
-    elif theoretical_best:
-        return theoretical_best[0]
-    elif basic_mats:
-        return basic_mats[0]
-    elif tint_mask_mats:
-        return tint_mask_mats[0]
-    elif default_mats:
-        return default_mats[0]
-    elif no_paren_mats:
-        return no_paren_mats[0]
-    elif materials:
-        return materials[0]
+def get_best_material_from_blend(blend_path, params, shader_name=None):
+    variants = get_blend_variant_index(blend_path).variants_for_shader(shader_name)
+    valid_params = _valid_params(params)
+
+    theoretical_best = None
+    fallbacks = [None] * (_NO_PAREN_TIER + 1)
+    for variant in variants:
+        if variant.combo is not None:
+            if variant.combo <= valid_params:
+                return variant.name
+        elif variant.content is not None and variant.content in valid_params:
+            if theoretical_best is None:
+                theoretical_best = variant.name
+            continue
+        if variant.tier is not None and fallbacks[variant.tier] is None:
+            fallbacks[variant.tier] = variant.name
+
+    if theoretical_best is not None:
+        return theoretical_best
+    for mat_name in fallbacks:
+        if mat_name is not None:
+            return mat_name
+    if variants:
+        return variants[0].name
 
     return None
 
 
-def get_shader_items(self, context):
-    items = []
-    if not os.path.exists(bpy.context.scene.warframe_tools_props.pathToShader):
+def _shader_items(contents):
+    return [
+        (mat_name, mat_name, "")
+        for mat_name in contents.materials
+        if "dots stroke" not in mat_name.lower()
+    ]
+
+
+def _rig_items(contents):
+    return [
+        (rig_name, rig_name, "")
+        for rig_name in contents.collections
+        if "meta" not in rig_name.lower() and "wgts" not in rig_name.lower()
+    ]
+
+
+def _tag_redraw():
+    for window in bpy.context.window_manager.windows:
+        for area in window.screen.areas:
+            area.tag_redraw()
+
+
+def _refresh_enum_items(key, blend_path, build_items):
+    try:
+        mtime_ns = os.stat(blend_path).st_mtime_ns
+        _enum_items[key] = (mtime_ns, build_items(get_blend_contents(blend_path)))
+        _tag_redraw()
+    except Exception as e:
+        logger.warning("Could not refresh items from %s: %s", blend_path, e)
+    finally:
+        _pending_enum_refreshes.discard(key)
+    return None
+
+
+def _cached_enum_items(blend_path, build_items):
+    """EnumProperty items read from blend_path, cached until the file changes.
+
+    Blender needs the returned tuples to stay referenced, so the list lives in the cache.
+    After a change the previous list keeps being returned while a timer reloads the file.
+    """
+    if not os.path.exists(blend_path):
+        return []
+    key = (build_items.__name__, os.path.normcase(os.path.abspath(blend_path)))
+    mtime_ns = os.stat(blend_path).st_mtime_ns
+    cached = _enum_items.get(key)
+    if cached is None:
+        items = build_items(get_blend_contents(blend_path))
+        _enum_items[key] = (mtime_ns, items)
         return items
-    with bpy.data.libraries.load(
-        bpy.context.scene.warframe_tools_props.pathToShader, link=False
-    ) as (data_from, data_to):
-        for mat_name in data_from.materials:
-            if "dots stroke" not in mat_name.lower():
-                items.append((mat_name, mat_name, ""))
-    return items
+    if cached[0] != mtime_ns and key not in _pending_enum_refreshes:
+        _pending_enum_refreshes.add(key)
+        bpy.app.timers.register(
+            functools.partial(_refresh_enum_items, key, blend_path, build_items),
+            first_interval=0.0,
+        )
+    return cached[1]
+
+
+def get_shader_items(self, context):
+    return _cached_enum_items(bpy.context.scene.warframe_tools_props.pathToShader, _shader_items)
 
 
 def get_rig_items(self, context):
-    items = []
-    if not os.path.exists(bpy.context.scene.warframe_tools_props.rig_path):
-        return items
-    with bpy.data.libraries.load(bpy.context.scene.warframe_tools_props.rig_path, link=False) as (
-        data_from,
-        data_to,
-    ):
-        for rig_name in data_from.collections:
-            print(rig_name)
-            if "meta" not in rig_name.lower() and "wgts" not in rig_name.lower():
-                items.append((rig_name, rig_name, ""))
-    return items
+    return _cached_enum_items(bpy.context.scene.warframe_tools_props.rig_path, _rig_items)
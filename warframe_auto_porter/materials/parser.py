@@ -1,72 +1,194 @@
 import ast
+import re
 from collections import OrderedDict
 
-from ..constants import special_aliases, texture_ignores
+from ..constants import material_parent_keys, special_aliases, texture_ignores
 
+# Bump whenever the parse output changes so persisted parse caches are invalidated
+PARSER_VERSION = 3
 
-def parse_material_file(filepath):
+# Yields every stripped, non-empty, non-comment line of a file in one pass
+_LINE_SCANNER = re.compile(r"^[^\S\n]*([^#\s](?:[^\n]*\S)?)", re.MULTILINE)
+_IGNORE_PATTERN = (
+    re.compile("|".join(re.escape(ignore) for ignore in texture_ignores))
+    if texture_ignores
+    else None
+)
+_NUMBER_CHARS = "0123456789.+-eE"
+_VECTOR_PADDING = " \t\f"
+
+# Material files repeat the same lines a lot, so every distinct line is compiled once
+# into the assignments it produces. An entry takes about 450 bytes, so a full memo holds
+# about 21 MiB. It is emptied when full, so huge roots never grow it past that.
+_LINE_CACHE_LIMIT = 50000
+_line_cache = {}
+# A miss costs a lookup and an insert on top of compiling the line. When most lines of a
+# file miss, the next files skip the memo: 1, then 3, 7 and at most 15 files while files
+# keep missing. A cold memo that is filling up is back in use after a few files, input that
+# never repeats pays the memo on one file in 16. scripts/benchmark_parser.py measures both.
+_MEMO_MIN_HIT_RATE = 0.25
+_MEMO_MAX_SKIPS = 15
+_memo_skips = 0
+_memo_backoff = 0
+
+
+def _convert_vector(value):
+    """Return (converted value, whether the result is safe to share between files)"""
+    # Fast path for plain number lists. Anything int()/float() would read differently
+    # from a Python literal (leading zeros, underscores, inf/nan, ...) is left to ast.
+    vector = []
+    for token in value[1:-1].split(","):
+        token = token.strip(_VECTOR_PADDING)
+        if not token or token.strip(_NUMBER_CHARS):
+            break
+        try:
+            if "." in token or "e" in token or "E" in token:
+                vector.append(float(token))
+            else:
+                digits = token.lstrip("+-")
+                if len(token) - len(digits) > 1 or (len(digits) > 1 and digits[0] == "0"):
+                    break
+                vector.append(int(token))
+        except ValueError:
+            break
+    else:
+        return vector, True
+
+    # Anything the fast path does not understand goes through the original literal_eval route.
+    # That can produce nested containers, so those lines are never memoized.
+    try:
+        value = ast.literal_eval(value)
+        if isinstance(value, list):
+            value = [float(v) if isinstance(v, str) else v for v in value]
+    except Exception:
+        pass
+    return value, isinstance(value, str)
+
+
+def _convert_scalar(value):
+    first = value[0]
+    if not (first.isdigit() or first in "+-."):
+        return value
+    try:
+        return float(value) if "." in value else int(value)
+    except ValueError:
+        return value
+
+
+# Compiled line targets
+MATERIAL_LINE = 0
+SHADER_LINE = 1
+PARENT_LINE = 2
+
+_SKIP_LINE = (MATERIAL_LINE, None, (), True)
+_PARENT_KEYS = frozenset(key.lower() for key in material_parent_keys)
+
+
+def _compile_line(line):
+    """Return (target, line key, payload, cacheable) for a stripped line"""
+    if _IGNORE_PATTERN is not None and _IGNORE_PATTERN.search(line):
+        return _SKIP_LINE
+    if "=" in line:
+        key, _, value = line.partition("=")
+    elif ":" in line:
+        key, _, value = line.partition(":")
+    else:
+        return _SKIP_LINE
+    key = key.strip()
+    value = value.strip()
+    key_lower = key.lower()
+    if "shader" in key_lower:
+        return _SKIP_LINE
+    if value == "":
+        return _SKIP_LINE
+    value_lower = value.lower()
+    if "_p.hlsl" in value_lower:
+        return (SHADER_LINE, key, value_lower, True)
+    # Parent references are also ordinary assignments, so parse results keep the line
+    parent_ref = value if key_lower in _PARENT_KEYS and "/" in value else None
+
+    cacheable = True
+    if value[0] == "[" and value[-1] == "]":
+        value, cacheable = _convert_vector(value)
+    else:
+        value = _convert_scalar(value)
+
+    assignments = [(key, value)]
+    if isinstance(value, str) and not line.startswith("TX:") and "shader" not in line.lower():
+        assignments.append((line, 1))
+        if not line.lower().endswith("= none"):
+            if value_lower.startswith("x") and len(value) == 2:
+                assignments.append(("x", int(value[-1])))
+            assignments.append((key, 1))
+            assignments.append((value, 1))
+    if parent_ref is not None:
+        return (PARENT_LINE, key, (parent_ref, tuple(assignments)), cacheable)
+    return (MATERIAL_LINE, key, tuple(assignments), cacheable)
+
+
+def _compile_text(text):
+    global _memo_skips, _memo_backoff
+    lines = _LINE_SCANNER.findall(text)
+    if _memo_skips:
+        _memo_skips -= 1
+        for line in lines:
+            compiled = _compile_line(line)
+            if compiled is not _SKIP_LINE:
+                yield compiled
+        return
+
+    line_cache = _line_cache
+    misses = 0
+    for line in lines:
+        compiled = line_cache.get(line)
+        if compiled is None:
+            misses += 1
+            compiled = _compile_line(line)
+            if compiled[3]:
+                if len(line_cache) >= _LINE_CACHE_LIMIT:
+                    line_cache.clear()
+                line_cache[line] = compiled
+        if compiled is not _SKIP_LINE:
+            yield compiled
+    if misses > len(lines) * (1 - _MEMO_MIN_HIT_RATE):
+        _memo_backoff = min(_memo_backoff * 2 + 1, _MEMO_MAX_SKIPS)
+        _memo_skips = _memo_backoff
+    else:
+        _memo_backoff = 0
+
+
+def read_material_lines(filepath):
+    """Return the compiled lines of a material file, for merging files line by line"""
+    with open(filepath) as f:
+        return list(_compile_text(f.read()))
+
+
+def build_material_data(compiled_lines):
+    """Turn compiled lines into the (material_data, shader_data, hierarchy_data) triple"""
     material_data = {}
     shader_data = {}
     hierarchy_data = {}
-    with open(filepath) as f:
-        for line in f:
-            line = line.strip()
-
-            if not line or line.startswith("#"):
-                continue
-            if any(ignore in line for ignore in texture_ignores):
-                continue
-            if "=" not in line and ":" not in line:
-                continue
-            if ":" in line:
-                key, value = line.split(":", 1)
-            if "=" in line:
-                key, value = line.split("=", 1)
-            key = key.strip()
-            value = value.strip()
-            if "shader" in key.lower():
-                continue
-            if value == "":
-                continue
-            if "_p.hlsl" in value.lower():
-                key = value.lower()
-                value = 1
-                shader_data[key] = value
-                continue
-
-            try:
-                if value.startswith("[") and value.endswith("]"):
-                    value = ast.literal_eval(value)
-                    if isinstance(value, list):
-                        value = [
-                            float(v) if isinstance(v, str) else v
-                            for v in value
-                        ]
-                else:
-                    try:
-                        value = float(value) if "." in value else int(value)
-                    except:
-                        pass
-            except Exception:
-                pass
-
-            material_data[key] = value
-            if (
-                isinstance(value, str)
-                and not line.startswith("TX:")
-                and "shader" not in line.lower()
-            ):
-                material_data[line.strip()] = 1
-                if line.strip().lower().endswith("= none"):
-                    continue
-                if value.strip().lower().startswith("x") and len(value.strip()) == 2:
-                    material_data["x"] = int(value.strip()[-1])
-                material_data[key] = 1
-                material_data[value.strip()] = 1
+    for target, _, payload, _ in compiled_lines:
+        if target == SHADER_LINE:
+            shader_data[payload] = 1
+            continue
+        if target == PARENT_LINE:
+            parent_ref, payload = payload
+            hierarchy_data.setdefault("parents", []).append(parent_ref)
+        for key, value in payload:
+            # Vectors are mutable, every result gets its own copy
+            material_data[key] = value.copy() if type(value) is list else value
 
     for key in special_aliases:
         if key in material_data and special_aliases[key] not in material_data:
             material_data[special_aliases[key]] = 1
 
-    sorted_material = OrderedDict(sorted(material_data.items(), key=lambda t: t[0]))
+    # Keys are unique, so plain tuple ordering sorts by key without a key function
+    sorted_material = OrderedDict(sorted(material_data.items()))
     return (sorted_material, shader_data, hierarchy_data)
+
+
+def parse_material_file(filepath):
+    with open(filepath) as f:
+        text = f.read()
+    return build_material_data(_compile_text(text))
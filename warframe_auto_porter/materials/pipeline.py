@@ -0,0 +1,230 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+import bpy
+
+from ..utils.extraction import extract_material_with_cli
+from ..utils.log import logger
+from ..utils.path_utils import find_internal_path
+from ..utils.texture_cleanup import cleanup_textures
+from .library import get_blend_contents
+from .matcher import find_shader_material, get_best_material_from_blend
+from .processor import set_material_properties
+
+# The extractor reads one shared game cache, so only a few copies run at once
+_MAX_EXTRACT_WORKERS = 4
+
+
+@dataclass(slots=True)
+class MaterialJob:
+    """One unique material of an Auto Setup run, filled in phase by phase"""
+
+    base_name: str
+    objects: list = field(default_factory=list)
+    material_path: str = None
+    internal_path: str = None
+    material_file_path: str = None
+    material_data: dict = None
+    shader_data: dict = None
+    hierarchy_data: dict = None
+    shader_name: str = None
+    blend_path: str = None
+    variant: str = None
+    material: object = None
+    gn_node_groups: list = field(default_factory=list)
+
+
+class PhaseTimer:
+    """Wall time of each named phase of a run, in the order they ran"""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.timings = []
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.timings.append((name, elapsed))
+            logger.info("%s phase took %.2fs", name, elapsed)
+
+    def summary(self):
+        minutes, seconds = divmod(time.perf_counter() - self.start, 60)
+        phases = ", ".join(f"{name} {elapsed:.2f}s" for name, elapsed in self.timings)
+        return f"Setup completed in {int(minutes)}m {seconds:.2f}s ({phases})"
+
+
+def _base_name(material):
+    return material.name.split(".")[0]
+
+
+def collect_material_jobs(operator, objects):
+    """One job per unique material base name among the first material slots of objects"""
+    jobs = {}
+    for obj in objects:
+        if obj.type != "MESH" or not obj.data.materials or obj.data.materials[0] is None:
+            continue
+        material = obj.data.materials[0]
+        base_name = _base_name(material)
+        job = jobs.get(base_name)
+        if job is None:
+            job = MaterialJob(base_name, material_path=material.get("FullPath"))
+            jobs[base_name] = job
+            if not job.material_path:
+                operator.report({"WARNING"}, f"Object {obj.name} has no FullPath custom property")
+        job.objects.append(obj)
+    return [job for job in jobs.values() if job.material_path]
+
+
+def resolve_material_files(operator, jobs, settings, max_workers=None):
+    """Find each job's material .txt, extracting the missing ones on worker threads"""
+    missing = {}
+    for job in jobs:
+        job.internal_path = find_internal_path(job.material_path)
+        job.material_file_path = os.path.join(settings.root, job.internal_path) + ".txt"
+        if not os.path.exists(job.material_file_path):
+            missing.setdefault(job.internal_path, job.material_file_path)
+
+    failed = set()
+    if missing and settings.use_extractor:
+        if max_workers is None:
+            max_workers = min(len(missing), _MAX_EXTRACT_WORKERS)
+
+        def extract(internal_path):
+            return extract_material_with_cli(
+                settings.extractor_path, settings.cache_path, internal_path, settings.root
+            )
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for internal_path, success in zip(missing, executor.map(extract, missing)):
+                if not success:
+                    operator.report({"ERROR"}, f"Failed to extract material: {internal_path}")
+                    failed.add(internal_path)
+    elif missing:
+        for material_file_path in missing.values():
+            operator.report({"WARNING"}, f"Material file not found: {material_file_path}")
+        failed.update(missing)
+    return [job for job in jobs if job.internal_path not in failed]
+
+
+def parse_material_files(operator, jobs, material_hierarchy, max_workers=None):
+    """Parse every job's material file, uncached ones in parallel, then merge its parents.
+
+    The parallel parse runs in worker processes that load only the parser, see
+    porter_parse_worker.py, so it works with spawned workers on Windows and macOS too.
+    Parents are read as they are reached, through the same cache.
+    """
+    warmed = material_hierarchy.material_cache.warm(
+        [job.material_file_path for job in jobs], max_workers
+    )
+    logger.debug("Parsed %d of %d material files ahead of resolving them", warmed, len(jobs))
+    parsed = []
+    for job in jobs:
+        try:
+            job.material_data, job.shader_data, job.hierarchy_data = material_hierarchy.resolve(
+                job.material_file_path
+            )
+        except Exception as e:
+            operator.report({"ERROR"}, f"Failed to parse material file: {e!s}")
+            continue
+        parsed.append(job)
+    return parsed
+
+
+def group_jobs_by_blend(operator, jobs, shader_library_path):
+    """Pick each job's shader .blend and material variant, returns {blend_path: [jobs]}"""
+    groups = {}
+    for job in jobs:
+        for key in job.shader_data:
+            if isinstance(key, str) and "_p.hlsl" in key:
+                job.shader_name = key.split("_p.hlsl")[0].split("/")[-2]
+                break
+        if not job.shader_name:
+            operator.report(
+                {"WARNING"}, f"No shader found in material file: {job.material_file_path}"
+            )
+            continue
+        logger.debug("Found shader name: %s", job.shader_name)
+        job.blend_path, error = find_shader_material(job.shader_name, shader_library_path)
+        if error:
+            operator.report({"WARNING"}, error)
+            continue
+
+        job.variant = get_best_material_from_blend(
+            job.blend_path, job.material_data, job.shader_name
+        )
+        if not job.variant:
+            operator.report({"ERROR"}, f"No suitable material found in {job.blend_path}")
+            continue
+        logger.info("Chosen material: %s from %s", job.variant, job.blend_path)
+        groups.setdefault(job.blend_path, []).append(job)
+    return groups
+
+
+def append_blend_materials(operator, blend_path, jobs, templates):
+    """Give every job a copy of its chosen variant from one .blend, and append its "Gn" groups.
+
+    Variants without a template are appended in one read of the file, each job then gets a
+    clone of its variant's template.
+    """
+    gn_node_groups = []
+    try:
+        gn_node_groups = [
+            name for name in get_blend_contents(blend_path).node_groups if name.startswith("Gn")
+        ]
+    except Exception as e:
+        operator.report({"WARNING"}, f"Could not read node groups: {e!s}")
+
+    appended = templates.append(blend_path, [job.variant for job in jobs], gn_node_groups)
+    for job, material in zip(jobs, appended.materials):
+        if material is None:
+            operator.report({"ERROR"}, f"Failed to append material {job.variant}")
+            continue
+        job.material = material
+        # Binding runs after every blend is appended, this keeps each job to its own groups
+        job.gn_node_groups = gn_node_groups
+        operator.report({"INFO"}, f"Cloned material: {job.variant}")
+    for node_group in appended.node_groups:
+        operator.report({"INFO"}, f"Appended node group: {node_group.name}")
+
+    materials = [material for material in appended.materials if material is not None]
+    if materials and appended.images:
+        cleanup_textures(operator, materials[0], appended.images)
+
+
+def bind_material(operator, job, props, settings):
+    """Put the appended material in place of the imported one and connect its inputs"""
+    new_material = job.material
+    old_materials = [
+        mat
+        for mat in bpy.data.materials
+        if mat.name.startswith(job.base_name + ".") or mat.name == job.base_name
+    ]
+    for old_mat in old_materials:
+        old_mat.user_remap(new_material)
+    for old_mat in old_materials:
+        if old_mat.users == 0 and old_mat != new_material:
+            bpy.data.materials.remove(old_mat)
+    new_material.name = job.base_name
+
+    # Geometry nodes modifiers go on the first object, as they always have
+    obj = job.objects[0]
+    set_material_properties(
+        obj,
+        new_material,
+        job.material_data,
+        props.pathToTextures,
+        find_internal_path(job.material_file_path),
+        {},
+        job.shader_data,
+        job.hierarchy_data,
+        settings,
+        job.gn_node_groups,
+    )
+    operator.report({"INFO"}, f"Set up material for {obj.name}")
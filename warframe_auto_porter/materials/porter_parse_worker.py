@@ -0,0 +1,42 @@
+"""Material file parsing for worker processes, loadable without the addon package.
+
+Spawned worker processes (the default on Windows and macOS) import the function they run
+by its module name. Under warframe_auto_porter that would run the addon's __init__, which
+imports bpy, so this file only uses the standard library and is loaded as the top level
+module porter_parse_worker. The parser and constants modules are imported from their files
+under a private package name, as scripts/benchmark_parser.py does.
+"""
+
+import importlib
+import os
+import sys
+import types
+
+_PACKAGE = "_porter_parse_worker"
+_MATERIALS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def _load_parser():
+    # Packages with a __path__ are enough for the import system to find parser.py and
+    # resolve its relative import of constants.py, without running either __init__
+    if _PACKAGE not in sys.modules:
+        package = types.ModuleType(_PACKAGE)
+        package.__path__ = [os.path.dirname(_MATERIALS_DIR)]
+        materials = types.ModuleType(f"{_PACKAGE}.materials")
+        materials.__path__ = [_MATERIALS_DIR]
+        sys.modules[_PACKAGE] = package
+        sys.modules[materials.__name__] = materials
+    return importlib.import_module(f"{_PACKAGE}.materials.parser")
+
+
+_parser = _load_parser()
+
+
+def parse_with_stat(filepath):
+    """(filepath, stat, parse result, error) of a material file"""
+    # Runs in worker processes, so errors come back as values instead of breaking the pool
+    try:
+        stat = os.stat(filepath)
+        return filepath, stat, _parser.parse_material_file(filepath), None
+    except Exception as e:
+        return filepath, None, None, str(e)
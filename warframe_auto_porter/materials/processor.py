@@ -4,16 +4,37 @@ from pathlib import Path
 
 import bpy
 
-from ..constants import special_ignores, special_skips, special_skips_mat
+from ..constants import special_ignores
+from ..properties.settings import SetupSettings
+from ..utils.dds import blender_can_read_dds, read_dds_format
 from ..utils.extraction import extract_texture_with_cli
-from ..utils.helpers import containstexture
+from ..utils.fs_index import get_fs_index
+from ..utils.helpers import TextureMatcher
+from ..utils.log import logger
 from ..utils.path_utils import find_internal_texture_path
-from ..utils.socket_utils import reset_default, set_default
-
-
-def connect_geometry_node_parameters(obj, node_group_map, parameters, shader_data_filtered):
+from ..utils.socket_utils import reset_default, set_default, set_modifier_input
+from .analysis import get_texture_analysis, srgb_to_linear
+from .bindings import (
+    GEOMETRY_RESET_VALUES,
+    geometry_socket_plan,
+    material_socket_plan,
+    resolve_binding,
+)
+from .images import load_image, load_proxy_image, preload_images
+from .proxies import get_texture_proxies
+from .record import MaterialRecord
+
+# Set on group nodes, the identifiers of inputs whose link was muted to fold a constant texture
+_FOLDED_PROPERTY = "porter_folded_inputs"
+
+
+def connect_geometry_node_parameters(
+    obj, node_group_map, parameters, shader_data_filtered, settings=None
+):
+    if settings is None:
+        settings = SetupSettings.from_context(bpy.context)
     for param_name, param_value in (parameters | shader_data_filtered).items():
-        print(param_name)
+        logger.debug("Geometry node parameter: %s", param_name)
         if param_name.lower() in node_group_map:
             ng = node_group_map[param_name.lower()]
 
@@ -28,121 +49,201 @@ def connect_geometry_node_parameters(obj, node_group_map, parameters, shader_dat
                 mod.node_group = ng
             else:
                 mod = existing_mod
-                print(f"Using existing geometry node modifier: {ng.name}")
+                logger.debug("Using existing geometry node modifier: %s", ng.name)
+
+            should_reset = settings.reset_parameters
+            for socket_plan in geometry_socket_plan(ng):
+                if socket_plan.candidates is None:
+                    continue
+                try:
+                    found_match, value = resolve_binding(
+                        socket_plan.candidates, parameters, (int, float)
+                    )
+                    if found_match:
+                        value = socket_plan.convert(value)
+                        if value is None:
+                            continue
+                        set_modifier_input(mod, socket_plan.identifier, value)
+                        logger.debug(
+                            "Setting geometry node parameter: %s = %s", socket_plan.name, value
+                        )
+                    elif should_reset:
+                        reset_value = GEOMETRY_RESET_VALUES.get(socket_plan.socket_type)
+                        if reset_value is not None:
+                            set_modifier_input(mod, socket_plan.identifier, reset_value)
+
+                except Exception as e:
+                    logger.warning(
+                        "Exception processing geometry node %s: %s", socket_plan.name, e
+                    )
 
-            should_reset = bpy.context.scene.warframe_tools_props.RESET_PARAMETERS
-            for item in ng.interface.items_tree:
-                if item.item_type == "SOCKET" and item.in_out == "INPUT":
-                    socket_name = item.name
-                    socket_name_lower = socket_name.lower()
-                    socket_type = item.bl_socket_idname
 
-                    try:
-                        value = None
-                        found_match = False
+def _resolve_texture(fs_index, filename, extensions):
+    if fs_index is not None:
+        return fs_index.resolve_file(filename, extensions)
+    return filename if os.path.exists(filename) else None
 
-                        lookup_name = socket_name_lower
-                        print(lookup_name)
-                        print(special_skips)
-                        if any(value in lookup_name for value in special_skips):
-                            continue
 
-                        if "/" in socket_name:
-                            base_name, second_part = socket_name.split("/", 1)
-                            base_name_lower = base_name.lower()
-                            second_part_lower = second_part.lower()
+def _blender_reads(texture_path):
+    return not texture_path.lower().endswith(".dds") or blender_can_read_dds(texture_path)
 
-                            for part in [base_name_lower, second_part_lower]:
-                                if part in parameters:
-                                    value = parameters[part]
-                                    found_match = True
-                                    break
 
-                        if not found_match and any(
-                            socket_name.endswith(x) for x in ("XYZ", "X", "Y", "Z", "W", "Alpha")
-                        ):
-                            base_name = socket_name.split(" ")[0].lower()
-                            if base_name in parameters:
-                                param_val = parameters[base_name]
-
-                                if socket_name.endswith("XYZ"):
-                                    value = param_val
-                                elif socket_name.endswith("X"):
-                                    value = (
-                                        param_val
-                                        if isinstance(param_val, (int, float))
-                                        else param_val[0]
-                                    )
-                                elif socket_name.endswith("Y"):
-                                    value = (
-                                        param_val
-                                        if isinstance(param_val, (int, float))
-                                        else param_val[1]
-                                    )
-                                elif socket_name.endswith("Z"):
-                                    value = (
-                                        param_val
-                                        if isinstance(param_val, (int, float))
-                                        else param_val[2]
-                                    )
-                                elif socket_name.endswith(("W", "Alpha")):
-                                    value = (
-                                        param_val
-                                        if isinstance(param_val, (int, float))
-                                        else param_val[3]
-                                    )
-                                found_match = True
-
-                        if not found_match:
-                            if lookup_name in parameters:
-                                value = parameters[lookup_name]
-                                found_match = True
-
-                        if not found_match:
-                            if socket_name_lower.endswith("= none") or "=" in socket_name_lower:
-                                lookup_name = socket_name_lower
-                            else:
-                                lookup_name = socket_name.split(" ")[0].lower()
-
-                            if lookup_name in parameters:
-                                value = parameters[lookup_name]
-                                found_match = True
-
-                        if found_match:
-                            if socket_type == "NodeSocketBool":
-                                value = bool(value)
-                            elif socket_type == "NodeSocketInt":
-                                value = int(value) if isinstance(value, (int, float)) else value
-                            elif socket_type == "NodeSocketFloat":
-                                value = float(value) if isinstance(value, (int, float)) else value
-                            elif socket_type == "NodeSocketVector":
-                                if isinstance(value, (list, tuple)) and len(value) >= 3:
-                                    value = tuple(float(v) for v in value[:3])
-                                else:
-                                    value = (float(value), float(value), float(value))
-                            elif socket_type == "NodeSocketColor":
-                                if isinstance(value, (list, tuple)) and len(value) >= 4:
-                                    value = tuple(float(v) for v in value[:4])
-                                elif isinstance(value, (int, float)):
-                                    value = (float(value), float(value), float(value), 1.0)
-                                else:
-                                    value = (0.5, 0.5, 0.5, 1.0)
-                            if value is None:
-                                continue
-                            mod[item.identifier] = value
-                            print(f"Setting geometry node parameter: {socket_name} = {value}")
-                        elif should_reset:
-                            if socket_type == "NodeSocketBool":
-                                mod[item.identifier] = False
-                            elif socket_type in ("NodeSocketInt", "NodeSocketFloat"):
-                                mod[item.identifier] = 0
-                            elif socket_type == "NodeSocketVector":
-                                mod[item.identifier] = (0.5, 0.5, 0.5)
-                            elif socket_type == "NodeSocketColor":
-                                mod[item.identifier] = (0.5, 0.5, 0.5, 1.0)
+def _extract_texture(fs_index, filename, preextfilename, texture_format, settings):
+    success = extract_texture_with_cli(
+        settings.extractor_path,
+        settings.cache_path,
+        texture_format,
+        find_internal_texture_path(preextfilename),
+        settings.root,
+    )
+    if success and fs_index is not None:
+        fs_index.invalidate(os.path.dirname(filename))
+    return success
+
+
+def _converted_texture(fs_index, texture_path, filename, preextfilename, settings):
+    """A PNG/TGA copy of a DDS file Blender can't read, extracted if there is none yet"""
+    converted = _resolve_texture(fs_index, filename, settings.fallback_suffixes)
+    if converted is None and settings.use_extractor:
+        if _extract_texture(fs_index, filename, preextfilename, settings.fallback_format, settings):
+            converted = filename.split(".")[0] + settings.fallback_suffixes[0]
+    if converted is None:
+        logger.warning(
+            "Blender can't read %s (%s) and there is no converted copy",
+            texture_path,
+            read_dds_format(texture_path),
+        )
+        return texture_path
+    logger.debug("Using %s instead of %s", converted, texture_path)
+    return converted
+
+
+def _socket_colorspace(socket_name):
+    return "sRGB" if "(sRGB)" in socket_name else "Non-Color"
+
+
+def _load_texture(filepath, colorspace, alpha_mode, proxies):
+    if proxies is None:
+        return load_image(filepath, colorspace, alpha_mode)
+    return load_proxy_image(proxies.proxy_path(filepath), filepath, colorspace, alpha_mode)
+
+
+def _alpha_mode(stats):
+    # Without alpha in the file there is nothing to keep apart from the colour channels
+    if stats is not None and not stats.uses_alpha:
+        return "NONE"
+    return "CHANNEL_PACKED"
+
+
+def _constant_value(stats, output_name, colorspace, socket_type):
+    """Socket value that gives what a constant texture would, or None"""
+    if output_name == "Alpha":
+        rgb = (stats.mean[3],) * 3
+    elif colorspace == "sRGB":
+        rgb = tuple(srgb_to_linear(value) for value in stats.mean[:3])
+    else:
+        rgb = tuple(stats.mean[:3])
+    if socket_type in ("RGBA", "COLOR"):
+        return rgb + (1.0,)
+    if socket_type == "VECTOR":
+        return rgb
+    if socket_type == "VALUE":
+        if output_name == "Alpha":
+            return rgb[0]
+        return 0.2126 * rgb[0] + 0.7152 * rgb[1] + 0.0722 * rgb[2]
+    return None
+
+
+def _folded_inputs(node):
+    return list(node.get(_FOLDED_PROPERTY, ()))
+
+
+def _unfold(input_socket):
+    """Unmute the link of input_socket if _fold_constant_texture muted it"""
+    node = input_socket.node
+    folded = _folded_inputs(node)
+    if input_socket.identifier not in folded:
+        return
+    folded.remove(input_socket.identifier)
+    if folded:
+        node[_FOLDED_PROPERTY] = folded
+    else:
+        del node[_FOLDED_PROPERTY]
+    input_socket.links[0].is_muted = False
+
+
+def _fold_constant_texture(input_socket, stats, colorspace):
+    """Give input_socket the value of a constant texture and mute the link bringing it.
+
+    Links this mutes are listed on their node, so a later run unmutes only those and leaves
+    links muted by hand alone.
+    """
+    link = input_socket.links[0]
+    image_link = link
+    while image_link.from_node.type == "REROUTE" and image_link.from_node.inputs[0].links:
+        image_link = image_link.from_node.inputs[0].links[0]
+    value = _constant_value(stats, image_link.from_socket.name, colorspace, input_socket.type)
+    if value is None:
+        return False
+    set_default(input_socket, value)
+    if not link.is_muted:
+        link.is_muted = True
+        node = input_socket.node
+        node[_FOLDED_PROPERTY] = _folded_inputs(node) + [input_socket.identifier]
+    return True
+
+
+def material_texture_requests(node_groups, texture_locations, texture_matcher, settings):
+    """(path, colorspace, alpha mode) of the texture files the node groups are going to load.
+
+    With texture analysis on, the textures are analysed here, all at once, and the ones
+    that will be folded into socket values are left out.
+    """
+    fs_index = get_fs_index(settings.root)
+    extension = settings.texture_suffix
+    extensions = settings.texture_suffixes
+    proxies = get_texture_proxies(settings)
+    analysis = get_texture_analysis(settings.root) if settings.analyze_textures else None
+    sources = []
+    for node_group in node_groups:
+        group_name_lower = node_group.node_tree.name.lower()
+        if "final tweaks" in group_name_lower or "vertex shader" in group_name_lower:
+            continue
+        for input_socket in node_group.inputs:
+            if not input_socket.links:
+                continue
+            for tex_name in texture_matcher.matches(input_socket.name):
+                filename = texture_locations[tex_name]
+                if not filename.endswith(extension):
+                    filename = filename.split(".")[0] + extension
+                texture_path = _resolve_texture(fs_index, filename, extensions)
+                if texture_path is not None and not _blender_reads(texture_path):
+                    texture_path = _resolve_texture(fs_index, filename, settings.fallback_suffixes)
+                if texture_path is not None:
+                    sources.append((texture_path, _socket_colorspace(input_socket.name)))
+                    break
 
-                    except Exception as e:
-                        print(f"Exception processing geometry node {socket_name}: {e!s}")
+    stats = {}
+    if analysis is not None:
+        stats = analysis.stats_for(texture_path for texture_path, _ in sources)
+    requests = []
+    for texture_path, colorspace in sources:
+        texture_stats = stats.get(texture_path)
+        if texture_stats is not None and texture_stats.is_constant:
+            continue
+        if proxies is not None:
+            texture_path = proxies.proxy_path(texture_path)
+        requests.append((texture_path, colorspace, _alpha_mode(texture_stats)))
+    return requests
+
+
+def material_texture_matcher(texture_locations):
+    """Matcher over the texture keys of a material that have a file to load"""
+    return TextureMatcher(
+        tex_name
+        for tex_name, filename in texture_locations.items()
+        if not isinstance(filename, int)
+    )
 
 
 def connect_textures_and_parameters(
@@ -155,7 +256,13 @@ def connect_textures_and_parameters(
     labeled_reroutes,
     shader_data,
     hierarchy_data,
+    texture_matcher=None,
+    settings=None,
 ):
+    if settings is None:
+        settings = SetupSettings.from_context(bpy.context)
+    if texture_matcher is None:
+        texture_matcher = material_texture_matcher(texture_locations)
     group_tree = node_group.node_tree
     group_name_lower = group_tree.name.lower()
     if "final tweaks" in group_name_lower:
@@ -166,7 +273,7 @@ def connect_textures_and_parameters(
         for key in parameters.keys():
             if f"{node_group.label.lower()} =" in key:
                 full_key = key
-                print(full_key)
+                logger.debug("Node group label parameter: %s", full_key)
                 break
 
         if full_key:
@@ -179,15 +286,24 @@ def connect_textures_and_parameters(
     if "vertex shader" in group_name_lower:
         for input_socket in node_group.inputs:
             if input_socket.name.lower() in shader_data:
-                print(f"Setting Vertex Shader Value: {input_socket} to True")
+                logger.debug("Setting Vertex Shader Value: %s to True", input_socket.name)
                 set_default(input_socket, True)
             else:
-                print(f"Setting Vertex Shader Value: {input_socket} to False")
+                logger.debug("Setting Vertex Shader Value: %s to False", input_socket.name)
                 set_default(input_socket, False)
 
         return
 
-    for input_socket in node_group.inputs:
+    should_reset = settings.reset_parameters
+    fs_index = get_fs_index(settings.root)
+    extension = settings.texture_suffix
+    # The chosen format first, then any other format already on disk
+    extensions = settings.texture_suffixes
+    proxies = get_texture_proxies(settings)
+    analysis = get_texture_analysis(settings.root) if settings.analyze_textures else None
+    inputs = node_group.inputs
+    socket_plans = material_socket_plan(node_group.node_tree, inputs)
+    for input_socket, socket_plan in zip(inputs, socket_plans):
         if input_socket.links:
             current = input_socket.links[0].from_node
             while True:
@@ -202,138 +318,81 @@ def connect_textures_and_parameters(
                 else:
                     break
             if hasattr(current, "image"):
-                if bpy.context.scene.warframe_tools_props.EMPTY_IMAGES_BEFORE_SETUP:
+                if settings.empty_images_before_setup:
                     current.image = None
-                selected_list = texture_locations
-                for tex_name, filename in selected_list.items():
-                    if isinstance(filename, int):
-                        continue
+                _unfold(input_socket)
+                for tex_name in texture_matcher.matches(input_socket.name):
+                    filename = texture_locations[tex_name]
                     preextfilename = filename
-                    if not filename.endswith(
-                        bpy.context.scene.warframe_tools_props.texture_extension.split("*")[1]
-                    ):
-                        filename = (
-                            filename.split(".")[0]
-                            + bpy.context.scene.warframe_tools_props.texture_extension.split("*")[1]
-                        )
+                    if not filename.endswith(extension):
+                        filename = filename.split(".")[0] + extension
 
-                    name = filename.split("/")[-1]
-                    if any(
-                        containstexture(tex_name, input_socket.name) for link in input_socket.links
-                    ):
-                        try:
-                            img = None
-                            if (
-                                not os.path.exists(filename)
-                                and bpy.context.scene.warframe_tools_props.USE_EXTRACTOR
+                    colorspace = _socket_colorspace(input_socket.name)
+                    try:
+                        img = None
+                        texture_path = _resolve_texture(fs_index, filename, extensions)
+                        if texture_path is None and settings.use_extractor:
+                            if _extract_texture(
+                                fs_index,
+                                filename,
+                                preextfilename,
+                                settings.texture_format,
+                                settings,
                             ):
-                                props = bpy.context.scene.warframe_tools_props
-
-                                internal_path = find_internal_texture_path(preextfilename)
-                                texture_format = props.texture_extension.replace("*.", "").upper()
-
-                                success = extract_texture_with_cli(
-                                    props.extractor_path,
-                                    props.cache_path,
-                                    texture_format,
-                                    internal_path,
-                                    props.root,
-                                )
-                                if success:
-                                    img = bpy.data.images.load(filename, check_existing=True)
-                                else:
-                                    print(f"Could not extract texture: {filename}")
-                            else:
-                                img = bpy.data.images.load(filename, check_existing=True)
-                            if "(sRGB)" in input_socket.name:
-                                img.colorspace_settings.name = "sRGB"
+                                texture_path = filename
                             else:
-                                img.colorspace_settings.name = "Non-Color"
-                            print(current.image)
-                            if (current.image is None) or (
-                                bpy.context.scene.warframe_tools_props.REPLACE_IMAGES
-                                and current.image.name not in img.name
-                            ):
-                                current.image = img
-                                img.alpha_mode = "CHANNEL_PACKED"
-                                print(
-                                    f"Connected texture: {filename} to {input_socket.name} in {node_group.name}"
-                                )
+                                logger.warning("Could not extract texture: %s", filename)
+                                continue
+                        if texture_path is not None and not _blender_reads(texture_path):
+                            texture_path = _converted_texture(
+                                fs_index, texture_path, filename, preextfilename, settings
+                            )
+                        source = texture_path or filename
+                        stats = analysis.stats(source) if analysis is not None else None
+                        if (
+                            stats is not None
+                            and stats.is_constant
+                            and _fold_constant_texture(input_socket, stats, colorspace)
+                        ):
+                            logger.debug(
+                                "Folded constant texture %s into %s", source, input_socket.name
+                            )
                             break
-                        except Exception as e:
-                            print(f"Texture error: {e!s}")
+                        img = _load_texture(source, colorspace, _alpha_mode(stats), proxies)
+                        logger.debug("Current image: %s", current.image)
+                        if (current.image is None) or (
+                            settings.replace_images
+                            and current.image.name not in img.name
+                        ):
+                            current.image = img
+                            logger.debug(
+                                "Connected texture: %s to %s in %s",
+                                filename,
+                                input_socket.name,
+                                node_group.name,
+                            )
+                        break
+                    except Exception as e:
+                        logger.warning("Texture error: %s", e)
 
                 continue
-        VALID_SOCKET_TYPES = {"BOOLEAN", "INT", "COLOR", "VECTOR", "VALUE", "RGBA"}
-
         input_name = input_socket.name
-        input_lower = input_name.lower()
-        input_type = input_socket.type
-        should_reset = bpy.context.scene.warframe_tools_props.RESET_PARAMETERS
-        if input_type not in VALID_SOCKET_TYPES:
+        if not socket_plan.valid:
             if should_reset:
                 reset_default(input_socket)
             continue
+        if socket_plan.candidates is None:
+            continue
         try:
-            value = None
-            found_match = False
-
-            lookup_name = input_lower
-            if any(value in lookup_name for value in special_skips_mat):
-                continue
-            if "/" in input_name:
-                base_name, second_part = input_name.split("/", 1)
-                base_name_lower = base_name.lower()
-                second_part_lower = second_part.lower()
-
-                for part in [base_name_lower, second_part_lower]:
-                    if part in parameters:
-                        value = parameters[part]
-                        found_match = True
-                        break
-
-            if not found_match and any(
-                input_name.endswith(x) for x in ("XYZ", "X", "Y", "Z", "W", "Alpha")
-            ):
-                base_name = input_name.split(" ")[0].lower()
-                if base_name in parameters:
-                    param_val = parameters[base_name]
-
-                    if input_name.endswith("XYZ"):
-                        value = param_val
-                    elif input_name.endswith("X"):
-                        value = param_val if isinstance(param_val, int) else param_val[0]
-                    elif input_name.endswith("Y"):
-                        value = param_val if isinstance(param_val, int) else param_val[1]
-                    elif input_name.endswith("Z"):
-                        value = param_val if isinstance(param_val, int) else param_val[2]
-                    elif input_name.endswith(("W", "Alpha")):
-                        value = param_val if isinstance(param_val, int) else param_val[3]
-                    found_match = True
-            if not found_match:
-                if lookup_name in parameters:
-                    print(lookup_name)
-                    value = parameters[lookup_name]
-                    found_match = True
-            if not found_match:
-                if input_lower.endswith("= none") or "=" in input_lower:
-                    lookup_name = input_lower
-                else:
-                    lookup_name = input_name.split(" ")[0].lower()
-
-                if lookup_name in parameters:
-                    print(lookup_name)
-                    value = parameters[lookup_name]
-                    found_match = True
-
+            found_match, value = resolve_binding(socket_plan.candidates, parameters, int)
             if found_match:
-                print(f"Setting instance parameter: {input_name} = {value}")
+                logger.debug("Setting instance parameter: %s = %s", input_name, value)
                 set_default(input_socket, value)
             elif should_reset:
                 reset_default(input_socket)
 
         except Exception as e:
-            print(f"Exception processing {input_name}: {e!s}")
+            logger.warning("Exception processing %s: %s", input_name, e)
             if should_reset:
                 reset_default(input_socket)
 
@@ -347,70 +406,61 @@ def set_material_properties(
     texture_locations,
     shader_data,
     hierarchy_data,
+    settings=None,
+    gn_node_groups=None,
 ):
-    parameters = {}
+    """Connect the textures and parameters of material_data to material's node groups.
+
+    gn_node_groups names the geometry nodes groups that may be added to obj as modifiers.
+    Without it, every "Gn. " group in the file is a candidate.
+    """
+    if settings is None:
+        settings = SetupSettings.from_context(bpy.context)
+    use_root_location = settings.use_root_location
+    parameters = MaterialRecord.from_material_data(material_data)
     textures = {}
     labeled_reroutes = []
     texture_locations = texture_locations
-    path = (
-        model_path
-        if bpy.context.scene.warframe_tools_props.USE_ROOT_LOCATION
-        else str(pathToTextures)
-    )
+    path = model_path if use_root_location else str(pathToTextures)
     if not path.endswith("/"):
         path += "/"
-    for key, value in material_data.items():
-        if key.startswith("TX:"):
-            result = value
-            setone = False
-            if "/" not in result and bpy.context.scene.warframe_tools_props.USE_ROOT_LOCATION:
-                result = path + result
-                setone = True
-            if (
-                not result.startswith("/")
-                and "/" in result
-                and bpy.context.scene.warframe_tools_props.USE_ROOT_LOCATION
-                and not setone
-            ):
-                result = path + result
-            if not bpy.context.scene.warframe_tools_props.USE_ROOT_LOCATION:
-                result = path + result
-            textures[key[3:]] = result
-        elif ":" in key:
-            prefix, param_name = key.split(":", 1)
-            parameters[param_name.lower()] = value
-        else:
-            parameters[key.lower()] = value
-    if bpy.context.scene.warframe_tools_props.USE_ROOT_LOCATION:
-        root_loc = str(bpy.context.scene.warframe_tools_props.root)
-        if not str(bpy.context.scene.warframe_tools_props.root).endswith("/"):
+    for key, value in parameters.textures.items():
+        if not isinstance(value, str):
+            logger.warning("Skipping texture %s, its value %r is not a path", key, value)
+            continue
+        result = value
+        setone = False
+        if "/" not in result and use_root_location:
+            result = path + result
+            setone = True
+        if not result.startswith("/") and "/" in result and use_root_location and not setone:
+            result = path + result
+        if not use_root_location:
+            result = path + result
+        textures[key] = result
+    if use_root_location:
+        root_loc = settings.root
+        if not settings.root.endswith("/"):
             root_loc += "/"
+        fs_index = get_fs_index(root_loc)
         for key, value in textures.items():
-            if os.path.isdir(str(Path(root_loc + value))):
-                if not value.endswith("/"):
-                    value += "/"
-                onlyfiles = [
-                    f
-                    for f in os.listdir(str(Path(root_loc + value)))
-                    if os.path.isfile(os.path.join(str(Path(root_loc + value)), f))
-                ]
-                for file in onlyfiles:
+            texture_dir = None
+            if fs_index is not None:
+                texture_dir = fs_index.resolve_dir(str(Path(root_loc + value)))
+            if texture_dir is not None:
+                for file in fs_index.list_files(texture_dir):
                     stem = Path(file).stem
                     match = re.search(r'_(\d+)$', stem)
                     idx = int(match.group(1)) if match else 0
-                    texture_locations[key + " " + str(idx)] = str(Path(root_loc + value + file))
+                    texture_locations[key + " " + str(idx)] = str(Path(texture_dir, file))
                 continue
             texture_locations[key] = str(Path(root_loc + value))
-    elif not bpy.context.scene.warframe_tools_props.USE_ROOT_LOCATION:
+    else:
+        texture_suffix = settings.texture_suffix
         for key, value in textures.items():
-            if not str(Path(str(pathToTextures) + value.split("/")[-1])).endswith(
-                bpy.context.scene.warframe_tools_props.texture_extension.split("*")[1]
-            ):
+            if not str(Path(str(pathToTextures) + value.split("/")[-1])).endswith(texture_suffix):
                 texture_locations[key] = str(
-                    Path(
-                        os.path.join(pathToTextures, value.split("/")[-1])
-                        + bpy.context.scene.warframe_tools_props.texture_extension.split("*")[1]
-                    )
+                    Path(os.path.join(pathToTextures, value.split("/")[-1]) + texture_suffix)
                 )
                 continue
             texture_locations[key] = os.path.join(pathToTextures, value.split("/")[-1])
@@ -420,7 +470,7 @@ def set_material_properties(
             del parameters[key_to_remove.lower()]
 
     if material.node_tree is None:
-        print(f"Warning: Material '{material.name}' has no node tree, skipping")
+        logger.warning("Material '%s' has no node tree, skipping", material.name)
         return
 
     node_groups = []
@@ -433,17 +483,23 @@ def set_material_properties(
                 labeled_reroutes.append(node.label)
         if node.type == "GROUP" and node.node_tree:
             node_groups.append(node)
+    if gn_node_groups is None:
+        candidates = bpy.data.node_groups
+    else:
+        candidates = [bpy.data.node_groups.get(name) for name in gn_node_groups]
     node_groups_for_gn = [
-        ng for ng in bpy.data.node_groups if ng.type == "GEOMETRY" and ng.name.startswith("Gn. ")
+        ng
+        for ng in candidates
+        if ng is not None and ng.type == "GEOMETRY" and ng.name.startswith("Gn. ")
     ]
 
-    print(node_groups_for_gn)
+    logger.debug("Geometry node groups: %s", node_groups_for_gn)
     node_group_map = {}
     for ng in node_groups_for_gn:
         base_name = ng.name[4:].split(maxsplit=1)[0]
         node_group_map[base_name.lower()] = ng
-    print(node_group_map)
-    print(shader_data)
+    logger.debug("Geometry node group map: %s", node_group_map)
+    logger.debug("Shader data: %s", shader_data)
     shader_data_filtered = {}
     for shader_path in shader_data:
         path_parts = shader_path.split("/")
@@ -451,8 +507,17 @@ def set_material_properties(
             main_shader_name = path_parts[-2]
             shader_data_filtered[main_shader_name] = shader_data[shader_path]
 
-    connect_geometry_node_parameters(obj, node_group_map, parameters, shader_data_filtered)
-    print(parameters)
+    connect_geometry_node_parameters(
+        obj, node_group_map, parameters, shader_data_filtered, settings
+    )
+    logger.debug("Parameters: %s", parameters)
+    texture_matcher = material_texture_matcher(texture_locations)
+    if settings.threaded_decode or settings.analyze_textures:
+        requests = material_texture_requests(
+            node_groups, texture_locations, texture_matcher, settings
+        )
+        if settings.threaded_decode:
+            preload_images(requests)
     for node in node_groups:
         if node.type != "GEOMETRY":
             connect_textures_and_parameters(
@@ -465,4 +530,6 @@ def set_material_properties(
                 labeled_reroutes,
                 shader_data,
                 hierarchy_data,
+                texture_matcher,
+                settings,
             )
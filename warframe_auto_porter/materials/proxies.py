@@ -0,0 +1,149 @@
+import hashlib
+import os
+
+import bpy
+import numpy as np
+
+from ..constants import texture_proxy_dirname
+from ..utils.log import logger
+from ..utils.texture_decode import decode_texture, encode_png, read_image_size
+from .dedup import get_content_hash_index
+
+_FIXED_FACTORS = {"HALF": 2, "QUARTER": 4}
+
+_proxy_sets = {}
+
+
+def proxy_factor(width, height, mode, max_size):
+    """How many times smaller a proxy of a width x height texture is along each side"""
+    factor = _FIXED_FACTORS.get(mode, 1)
+    if mode == "CAP":
+        while max(width, height) > max_size * factor:
+            factor *= 2
+    return factor
+
+
+def box_filter(width, height, pixels, factor):
+    """Average factor x factor blocks of flat RGBA pixels, returns (width, height, pixels).
+
+    Sides that don't divide by factor are padded with their edge pixels first.
+    """
+    rgba = pixels.reshape(height, width, 4)
+    pad_y = -height % factor
+    pad_x = -width % factor
+    if pad_y or pad_x:
+        rgba = np.pad(rgba, ((0, pad_y), (0, pad_x), (0, 0)), mode="edge")
+    new_height = rgba.shape[0] // factor
+    new_width = rgba.shape[1] // factor
+    reduced = rgba.reshape(new_height, factor, new_width, factor, 4).mean(
+        axis=(1, 3), dtype=np.float32
+    )
+    return new_width, new_height, reduced.reshape(-1)
+
+
+class TextureProxies:
+    """Downscaled copies of textures, written once to a folder in the extracted root.
+
+    A proxy is named after the hash of its source file's contents and the scale factor,
+    so identical textures under different paths share one proxy file.
+    """
+
+    def __init__(self, root, mode, max_size):
+        self.directory = os.path.join(root, texture_proxy_dirname)
+        self.mode = mode
+        self.max_size = max_size
+        self._hash_index = get_content_hash_index(root)
+        self._paths = {}
+
+    def _content_key(self, filepath, stat):
+        if self._hash_index is not None:
+            digest = self._hash_index.digests([filepath]).get(filepath)
+            if digest is not None:
+                return digest
+        return hashlib.blake2b(
+            repr((os.path.normcase(filepath), stat.st_size, stat.st_mtime_ns)).encode(),
+            digest_size=20,
+        ).hexdigest()
+
+    def proxy_path(self, filepath):
+        """Path of the proxy for filepath, made if needed, or filepath itself if there is none"""
+        try:
+            stat = os.stat(filepath)
+        except OSError:
+            return filepath
+        known = self._paths.get(filepath)
+        if known is not None and known[0] == (stat.st_size, stat.st_mtime_ns):
+            return known[1]
+
+        proxy = filepath
+        try:
+            proxy = self._make_proxy(filepath, stat)
+        except Exception as e:
+            logger.warning("Could not make a proxy of %s: %s", filepath, e)
+        self._paths[filepath] = ((stat.st_size, stat.st_mtime_ns), proxy)
+        return proxy
+
+    def _make_proxy(self, filepath, stat):
+        size = read_image_size(filepath)
+        if size is None:
+            return self._make_proxy_with_blender(filepath, stat)
+        factor = proxy_factor(size[0], size[1], self.mode, self.max_size)
+        if factor == 1:
+            return filepath
+        proxy = os.path.join(self.directory, f"{self._content_key(filepath, stat)}_{factor}.png")
+        if os.path.isfile(proxy):
+            return proxy
+
+        decoded = decode_texture(filepath)
+        if decoded is None:
+            return self._make_proxy_with_blender(filepath, stat)
+        width, height, pixels = box_filter(decoded.width, decoded.height, decoded.pixels, factor)
+        os.makedirs(self.directory, exist_ok=True)
+        temp_path = f"{proxy}.{os.getpid()}.tmp"
+        encode_png(temp_path, width, height, pixels)
+        os.replace(temp_path, proxy)
+        logger.debug("Made %dx%d proxy of %s", width, height, filepath)
+        return proxy
+
+    def _make_proxy_with_blender(self, filepath, stat):
+        # For files the decoder can't read: let Blender load, scale and save them
+        img = bpy.data.images.load(filepath, check_existing=False)
+        try:
+            width, height = img.size
+            factor = proxy_factor(width, height, self.mode, self.max_size)
+            if factor == 1:
+                return filepath
+            proxy = os.path.join(
+                self.directory, f"{self._content_key(filepath, stat)}_{factor}.png"
+            )
+            if os.path.isfile(proxy):
+                return proxy
+            os.makedirs(self.directory, exist_ok=True)
+            img.scale(max(1, -(-width // factor)), max(1, -(-height // factor)))
+            img.filepath_raw = proxy
+            img.file_format = "PNG"
+            img.save()
+            logger.debug("Made proxy of %s with Blender", filepath)
+            return proxy
+        finally:
+            bpy.data.images.remove(img)
+
+
+def get_texture_proxies(settings):
+    """Proxies for the resolution chosen in settings, or None for full resolution"""
+    if settings.texture_proxy == "FULL" or not os.path.isdir(settings.root):
+        return None
+    key = (
+        os.path.normcase(os.path.abspath(settings.root)),
+        settings.texture_proxy,
+        settings.texture_proxy_size,
+    )
+    proxies = _proxy_sets.get(key)
+    if proxies is None:
+        proxies = TextureProxies(settings.root, settings.texture_proxy, settings.texture_proxy_size)
+        _proxy_sets[key] = proxies
+    return proxies
+
+
+def clear_texture_proxies():
+    _proxy_sets.clear()
@@ -0,0 +1,96 @@
+import sys
+from collections.abc import MutableMapping
+
+
+class MaterialRecord(MutableMapping):
+    """Parsed material split into typed tables, readable as the lowercase parameters dict.
+
+    Names are lowercased, stripped of their "Prefix:" and interned. Presence switches
+    (value 1) live in a set and vectors are stored as tuples. Iteration follows insertion
+    order, like the dict it replaces.
+    """
+
+    __slots__ = ("textures", "scalars", "vectors", "strings", "flags", "_order")
+
+    def __init__(self):
+        self.textures = {}
+        self.scalars = {}
+        self.vectors = {}
+        self.strings = {}
+        self.flags = set()
+        self._order = {}
+
+    @classmethod
+    def from_material_data(cls, material_data):
+        record = cls()
+        textures = record.textures
+        for key, value in material_data.items():
+            if key.startswith("TX:"):
+                textures[key[3:]] = value
+                continue
+            if ":" in key:
+                key = key.split(":", 1)[1]
+            record[sys.intern(key.lower())] = value
+        return record
+
+    def _discard(self, name):
+        self.flags.discard(name)
+        self.scalars.pop(name, None)
+        self.vectors.pop(name, None)
+        self.strings.pop(name, None)
+
+    def __setitem__(self, name, value):
+        self._discard(name)
+        self._order.setdefault(name)
+        value_type = type(value)
+        if value_type is int and value == 1:
+            self.flags.add(name)
+        elif value_type is str:
+            self.strings[name] = value
+        elif value_type is list or value_type is tuple:
+            self.vectors[name] = tuple(value)
+        else:
+            self.scalars[name] = value
+
+    def __getitem__(self, name):
+        if name in self.flags:
+            return 1
+        if name in self.scalars:
+            return self.scalars[name]
+        if name in self.vectors:
+            return self.vectors[name]
+        return self.strings[name]
+
+    def __delitem__(self, name):
+        if name not in self._order:
+            raise KeyError(name)
+        self._discard(name)
+        del self._order[name]
+
+    def __contains__(self, name):
+        return name in self._order
+
+    def __iter__(self):
+        return iter(self._order)
+
+    def __len__(self):
+        return len(self._order)
+
+    def get(self, name, default=None):
+        if name in self.flags:
+            return 1
+        value = self.scalars.get(name, default)
+        if value is not default:
+            return value
+        value = self.vectors.get(name, default)
+        if value is not default:
+            return value
+        return self.strings.get(name, default)
+
+    def __or__(self, other):
+        merged = dict(self.items())
+        merged.update(other)
+        return merged
+
+    def __repr__(self):
+        return f"{type(self).__name__}({dict(self.items())!r})"
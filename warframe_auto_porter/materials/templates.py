@@ -0,0 +1,122 @@
+import os
+
+import bpy
+
+from .library import AppendedData, append_from_blend
+
+_TEMPLATE_PREFIX = ".Template "
+_SOURCE_PROPERTY = "porter_template_source"
+_VARIANT_PROPERTY = "porter_template_variant"
+_MTIME_PROPERTY = "porter_template_mtime"
+_TEMPLATE_PROPERTIES = (_SOURCE_PROPERTY, _VARIANT_PROPERTY, _MTIME_PROPERTY)
+
+
+def _blend_key(blend_path):
+    return os.path.normcase(os.path.abspath(blend_path))
+
+
+def _blend_mtime(blend_path):
+    # ID properties hold 32 bit integers, so the nanosecond mtime is kept as a string
+    try:
+        return str(os.stat(blend_path).st_mtime_ns)
+    except OSError:
+        return None
+
+
+def is_template(material):
+    return material.get(_SOURCE_PROPERTY) is not None
+
+
+class MaterialTemplates:
+    """Pristine appended shader materials, cloned for every use of the same variant.
+
+    The first use of a (blend, variant) pair appends it once and keeps it as a hidden template
+    with a fake user, named with a leading dot. Every use gets a material.copy() of the
+    template, which shares its node groups instead of appending them again.
+
+    Templates left in the file by earlier runs are reused while their shader .blend is
+    unchanged. With keep unset, finish() removes all of them at the end of the run.
+    """
+
+    def __init__(self, keep=False):
+        self.keep = keep
+        self._templates = {}
+        self._scanned = False
+
+    def _scan(self):
+        for material in bpy.data.materials:
+            source = material.get(_SOURCE_PROPERTY)
+            variant = material.get(_VARIANT_PROPERTY)
+            if source and variant:
+                self._templates.setdefault((source, variant), material.name)
+        self._scanned = True
+
+    def _template(self, blend_path, variant):
+        if not self._scanned:
+            self._scan()
+        key = (_blend_key(blend_path), variant)
+        name = self._templates.get(key)
+        if name is None:
+            return None
+        material = bpy.data.materials.get(name)
+        if material is not None and material.get(_MTIME_PROPERTY) == _blend_mtime(blend_path):
+            return material
+        # Gone, or appended from an older version of the shader file
+        del self._templates[key]
+        if material is not None:
+            bpy.data.materials.remove(material)
+        return None
+
+    def _add_template(self, blend_path, variant, material):
+        material.name = _TEMPLATE_PREFIX + variant
+        material.use_fake_user = True
+        material[_SOURCE_PROPERTY] = _blend_key(blend_path)
+        material[_VARIANT_PROPERTY] = variant
+        material[_MTIME_PROPERTY] = _blend_mtime(blend_path)
+        self._templates[(_blend_key(blend_path), variant)] = material.name
+
+    def _clone(self, template, variant):
+        clone = template.copy()
+        clone.use_fake_user = False
+        for prop in _TEMPLATE_PROPERTIES:
+            if prop in clone:
+                del clone[prop]
+        clone.name = variant
+        return clone
+
+    def append(self, blend_path, variants, node_groups=()):
+        """append_from_blend for materials, reading only variants that have no template yet.
+
+        Returns AppendedData with a new clone for each name in variants.
+        """
+        variants = list(variants)
+        templates = {}
+        missing = []
+        for variant in dict.fromkeys(variants):
+            template = self._template(blend_path, variant)
+            if template is None:
+                missing.append(variant)
+            else:
+                templates[variant] = template
+
+        appended = append_from_blend(blend_path, missing, node_groups)
+        for variant, material in zip(missing, appended.materials):
+            if material is not None:
+                self._add_template(blend_path, variant, material)
+                templates[variant] = material
+
+        materials = [
+            self._clone(templates[variant], variant) if variant in templates else None
+            for variant in variants
+        ]
+        return AppendedData(materials, appended.node_groups, appended.images)
+
+    def finish(self):
+        """End a run, removing the templates unless they are kept in the file"""
+        if not self.keep:
+            for name in self._templates.values():
+                material = bpy.data.materials.get(name)
+                if material is not None:
+                    bpy.data.materials.remove(material)
+        self._templates.clear()
+        self._scanned = False
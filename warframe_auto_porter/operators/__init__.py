@@ -5,6 +5,13 @@ from .bake import (
     cleanup_bake,
     setup_bake,
 )
+from .images import DeduplicateImagesOperator, LoadFullResolutionTexturesOperator
+from .index import (
+    BuildMaterialIndexOperator,
+    BuildShaderManifestOperator,
+    FindMaterialsOperator,
+)
+from .log import DumpLogOperator
 from .model import ExperimentalModeOperator, ImportModelOperator
 from .print import (
     DeformOperator,
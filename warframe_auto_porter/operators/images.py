@@ -0,0 +1,48 @@
+import time
+
+import bpy
+
+from ..materials.dedup import deduplicate_images, get_content_hash_index
+from ..materials.images import load_full_resolution
+
+
+class DeduplicateImagesOperator(bpy.types.Operator):
+    bl_idname = "wm.deduplicate_images"
+    bl_label = "Deduplicate Images"
+    bl_description = (
+        "Replace images whose files have identical contents, and the same colorspace and "
+        "alpha mode, with a single image"
+    )
+    bl_options = {"REGISTER", "UNDO"}
+
+    def execute(self, context):
+        props = context.scene.warframe_tools_props
+        hash_index = get_content_hash_index(props.root)
+        if hash_index is None:
+            self.report({"ERROR"}, f"Extracted root folder not found: {props.root}")
+            return {"CANCELLED"}
+
+        start_time = time.time()
+        removed, removed_bytes = deduplicate_images(hash_index)
+        elapsed_time = time.time() - start_time
+        self.report(
+            {"INFO"},
+            f"Removed {removed} duplicate images ({removed_bytes / (1 << 20):.1f} MiB of files) "
+            f"in {elapsed_time:.2f}s",
+        )
+        return {"FINISHED"}
+
+
+class LoadFullResolutionTexturesOperator(bpy.types.Operator):
+    bl_idname = "wm.load_full_resolution_textures"
+    bl_label = "Load Full Resolution Textures"
+    bl_description = (
+        "Replace the downscaled texture proxies with their full resolution files, "
+        "before rendering or baking"
+    )
+    bl_options = {"REGISTER", "UNDO"}
+
+    def execute(self, context):
+        count = load_full_resolution()
+        self.report({"INFO"}, f"Loaded {count} textures at full resolution")
+        return {"FINISHED"}
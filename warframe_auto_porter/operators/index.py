@@ -0,0 +1,149 @@
+import os
+import subprocess
+import time
+
+import bpy
+
+from ..materials.index import get_material_index
+from ..materials.library import clear_blend_contents
+from ..utils.log import logger
+
+_MANIFEST_SCRIPT = os.path.join(
+    os.path.dirname(os.path.dirname(__file__)), "scripts", "build_shader_manifest.py"
+)
+
+
+class BuildMaterialIndexOperator(bpy.types.Operator):
+    bl_idname = "wm.build_material_index"
+    bl_label = "Build Material Index"
+    bl_description = (
+        "Parse every material file in the extracted root once, so Auto Setup reads cached "
+        "parse results and Find Materials can list the materials using a shader or texture"
+    )
+
+    def execute(self, context):
+        props = context.scene.warframe_tools_props
+        material_index = get_material_index(props.root)
+        if material_index is None:
+            self.report({"ERROR"}, f"Extracted root folder not found: {props.root}")
+            return {"CANCELLED"}
+
+        start_time = time.time()
+        wm = context.window_manager
+        wm.progress_begin(0, 100)
+
+        def progress(done, total):
+            wm.progress_update(int(done * 100 / max(total, 1)))
+
+        try:
+            indexed, failed = material_index.build(progress=progress)
+        finally:
+            wm.progress_end()
+
+        elapsed_time = time.time() - start_time
+        minutes, seconds = divmod(elapsed_time, 60)
+        if failed:
+            self.report({"WARNING"}, f"{failed} material files could not be indexed")
+        self.report(
+            {"INFO"},
+            f"Indexed {indexed} material files in {int(minutes)}m {seconds:.2f}s",
+        )
+        return {"FINISHED"}
+
+
+# Reports beyond this many results only go to the log
+_MAX_REPORTED_RESULTS = 20
+
+
+class FindMaterialsOperator(bpy.types.Operator):
+    bl_idname = "wm.find_materials"
+    bl_label = "Find Materials"
+    bl_description = (
+        "List the material files in the material index that use a shader, texture or "
+        "parameter. Build Material Index first"
+    )
+
+    kind: bpy.props.EnumProperty(
+        name="Uses",
+        items=[
+            ("shader", "Shader", "Shader name or *_p.hlsl path"),
+            ("texture", "Texture", "Texture path as written in material files"),
+            ("parameter", "Parameter", "Parameter name"),
+        ],
+        default="shader",
+    )
+    query: bpy.props.StringProperty(
+        name="Name", description="Exact name, or part of one if nothing matches exactly"
+    )
+
+    def execute(self, context):
+        props = context.scene.warframe_tools_props
+        material_index = get_material_index(props.root)
+        if material_index is None:
+            self.report({"ERROR"}, f"Extracted root folder not found: {props.root}")
+            return {"CANCELLED"}
+        if not self.query.strip():
+            self.report({"ERROR"}, "Nothing to search for")
+            return {"CANCELLED"}
+
+        materials = material_index.find(self.kind, self.query.strip())
+        for count, filepath in enumerate(materials):
+            rel = os.path.relpath(filepath, props.root)
+            line = f"{rel} ({material_index.shader_for_material(filepath) or 'no shader'})"
+            logger.info("Material using %s: %s", self.query, line)
+            if count < _MAX_REPORTED_RESULTS:
+                self.report({"INFO"}, line)
+        if len(materials) > _MAX_REPORTED_RESULTS:
+            self.report(
+                {"INFO"},
+                f"{len(materials) - _MAX_REPORTED_RESULTS} more, see the log for all of them",
+            )
+        self.report({"INFO"}, f"{len(materials)} materials use {self.query}")
+        return {"FINISHED"}
+
+    def invoke(self, context, event):
+        return context.window_manager.invoke_props_dialog(self, width=400)
+
+
+class BuildShaderManifestOperator(bpy.types.Operator):
+    bl_idname = "wm.build_shader_manifest"
+    bl_label = "Build Shader Manifest"
+    bl_description = (
+        "Scan the shader library in a background Blender once, so Auto Setup can list "
+        "materials and node groups without opening every shader file"
+    )
+
+    def execute(self, context):
+        props = context.scene.warframe_tools_props
+        library_path = props.shader_library_path
+        if not library_path or not os.path.isdir(library_path):
+            self.report({"ERROR"}, f"Shader library folder not found: {library_path}")
+            return {"CANCELLED"}
+
+        start_time = time.time()
+        cmd = [
+            bpy.app.binary_path,
+            "-b",
+            "--factory-startup",
+            "--python",
+            _MANIFEST_SCRIPT,
+            "--",
+            library_path,
+        ]
+        try:
+            logger.info("Running command: %s", cmd)
+            result = subprocess.run(cmd, capture_output=True, text=True)
+        except Exception as e:
+            self.report({"ERROR"}, f"Error running manifest builder: {e!s}")
+            return {"CANCELLED"}
+        if result.returncode != 0:
+            logger.warning("Manifest builder output:\n%s", result.stdout)
+            logger.warning("Manifest builder errors:\n%s", result.stderr)
+            self.report({"ERROR"}, "Manifest builder failed, see the log for details")
+            return {"CANCELLED"}
+
+        clear_blend_contents()
+        elapsed_time = time.time() - start_time
+        minutes, seconds = divmod(elapsed_time, 60)
+        self.report({"INFO"}, f"Built shader manifest in {int(minutes)}m {seconds:.2f}s")
+        return {"FINISHED"}
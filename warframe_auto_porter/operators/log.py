@@ -0,0 +1,30 @@
+import bpy
+
+from ..utils.log import dump_log
+
+
+class DumpLogOperator(bpy.types.Operator):
+    bl_idname = "wm.dump_porter_log"
+    bl_label = "Dump Log"
+    bl_description = "Write the addon's recent log messages to a file"
+
+    filepath: bpy.props.StringProperty(subtype="FILE_PATH")
+    filter_glob: bpy.props.StringProperty(default="*.log;*.txt", options={"HIDDEN"})
+
+    def execute(self, context):
+        if not self.filepath:
+            self.report({"ERROR"}, "No file selected")
+            return {"CANCELLED"}
+        try:
+            count = dump_log(self.filepath)
+        except OSError as e:
+            self.report({"ERROR"}, f"Could not write log: {e!s}")
+            return {"CANCELLED"}
+        self.report({"INFO"}, f"Wrote {count} log messages to {self.filepath}")
+        return {"FINISHED"}
+
+    def invoke(self, context, event):
+        if not self.filepath:
+            self.filepath = "warframe_auto_porter.log"
+        context.window_manager.fileselect_add(self)
+        return {"RUNNING_MODAL"}
@@ -1,15 +1,26 @@
-import os
-import time
-
 import bpy
 
-from ..materials.matcher import find_shader_material, get_best_material_from_blend
-from ..materials.parser import parse_material_file
-from ..materials.processor import set_material_properties
+from ..materials.bindings import clear_binding_plans
+from ..materials.cache import get_material_cache
+from ..materials.hierarchy import MaterialHierarchy
+from ..materials.images import clear_image_cache
+from ..materials.pipeline import (
+    PhaseTimer,
+    append_blend_materials,
+    bind_material,
+    collect_material_jobs,
+    group_jobs_by_blend,
+    parse_material_files,
+    resolve_material_files,
+)
+from ..materials.templates import MaterialTemplates
+from ..properties.settings import SetupSettings
 from ..utils.extraction import extract_material_with_cli
+from ..utils.fs_index import refresh_fs_indexes
+from ..utils.log import logger
 from ..utils.object_utils import process_object
-from ..utils.path_utils import find_internal_path
-from ..utils.texture_cleanup import cleanup_textures
+from ..utils.socket_utils import write_stats
+from ..utils.viewport import bulk_setup
 
 
 class ImportModelOperator(bpy.types.Operator):
@@ -19,8 +30,9 @@ class ImportModelOperator(bpy.types.Operator):
 
     def execute(self, context):
         props = context.scene.warframe_tools_props
+        settings = SetupSettings.from_props(props)
         bpy.ops.import_scene.gltf(
-            filepath=str(bpy.context.scene.warframe_tools_props.model_file_path),
+            filepath=str(props.model_file_path),
             guess_original_bind_pose=False,
             bone_heuristic="TEMPERANCE",
         )
@@ -29,8 +41,9 @@ class ImportModelOperator(bpy.types.Operator):
             if obj.type != "MESH":
                 continue
             # Credit: KptWeedy
-            if bpy.context.scene.warframe_tools_props.LEVEL_IMPORT:
-                print(obj.data.validate(clean_customdata=True))
+            if settings.level_import:
+                if obj.data.validate(clean_customdata=True):
+                    logger.debug("Fixed invalid geometry of %s", obj.name)
                 if len(obj.material_slots) > 0 and obj.material_slots[
                     0
                 ].material.name.lower().startswith("hidden"):
@@ -41,7 +54,7 @@ class ImportModelOperator(bpy.types.Operator):
                 if len(obj.material_slots) > 0 and obj.material_slots[0].material:
                     material_name = obj.material_slots[0].material.name
                     bpy.data.materials[material_name].use_fake_user = True
-                    print(f"Processing material: {material_name}")
+                    logger.debug("Processing material: %s", material_name)
 
                 if material_name:
                     if material_name not in collections_dict:
@@ -54,7 +67,7 @@ class ImportModelOperator(bpy.types.Operator):
                     for collection in obj.users_collection:
                         collection.objects.unlink(obj)
                     new_collection.objects.link(obj)
-            process_object(obj)
+            process_object(obj, settings)
         collections_dict = {}
 
         self.report({"INFO"}, "Model imported successfully")
@@ -67,176 +80,53 @@ class ExperimentalModeOperator(bpy.types.Operator):
     bl_description = "Import model and auto-setup materials from MaterialPath"
 
     def execute(self, context):
+        with bulk_setup(context):
+            return self.setup(context)
 
-        start_time = time.time()
+    def setup(self, context):
         props = context.scene.warframe_tools_props
-        set_up_mats = []
-        bpy.ops.wm.import_model("EXEC_DEFAULT")
-
-        for obj in context.selected_objects:
-            if obj.type != "MESH":
-                continue
-            if obj.data.materials[0].name.split(".")[0] in set_up_mats:
-                continue
-            material_path = obj.data.materials[0].get("FullPath")
-            if not material_path:
-                set_up_mats.append(obj.data.materials[0].name.split(".")[0])
-                self.report({"WARNING"}, f"Object {obj.name} has no FullPath custom property")
-                continue
-
-            internal_path = find_internal_path(material_path)  # возможно не надо
-            material_file_path = os.path.join(props.root, internal_path) + ".txt"
-
-            if not os.path.exists(material_file_path):
-                if props.USE_EXTRACTOR:
-                    success = extract_material_with_cli(
-                        props.extractor_path, props.cache_path, internal_path, props.root
-                    )
-                    if not success:
-                        self.report({"ERROR"}, f"Failed to extract material: {internal_path}")
-                        set_up_mats.append(obj.data.materials[0].name.split(".")[0])
-                        continue
-                else:
-                    self.report({"WARNING"}, f"Material file not found: {material_file_path}")
-                    set_up_mats.append(obj.data.materials[0].name.split(".")[0])
-                    continue
-
-            try:
-                material_data, shader_data, hierarchy_data = parse_material_file(material_file_path)
-            except Exception as e:
-                self.report({"ERROR"}, f"Failed to parse material file: {e!s}")
-                set_up_mats.append(obj.data.materials[0].name.split(".")[0])
-                continue
-
-            shader_name = None
-            for key in shader_data:
-                if isinstance(key, str) and "_p.hlsl" in key:
-                    shader_name = key.split("_p.hlsl")[0].split("/")[-2]
-                    break
-
-            if not shader_name:
-                self.report({"WARNING"}, f"No shader found in material file: {material_file_path}")
-                set_up_mats.append(obj.data.materials[0].name.split(".")[0])
-                continue
-            print(f"Found shader name: {shader_name}")
-            shader_blend_path, error = find_shader_material(shader_name, props.shader_library_path)
-            if error:
-                self.report({"WARNING"}, error)
-                set_up_mats.append(obj.data.materials[0].name.split(".")[0])
-                continue
-
-            print(f"Found shader: {shader_blend_path}")
-            material_name = get_best_material_from_blend(shader_blend_path, material_data, shader_name)
-            if not material_name:
-                self.report({"ERROR"}, f"No suitable material found in {shader_blend_path}")
-                set_up_mats.append(obj.data.materials[0].name.split(".")[0])
-                continue
-            print(f"Chosen material: {material_name}")
-            original_base_name = None
-            if obj and obj.data and hasattr(obj.data, "materials") and obj.data.materials:
-                if obj.data.materials[0]:
-                    original_base_name = obj.data.materials[0].name.split(".")[0]
-
-            before = set(bpy.data.materials.keys())
-
-            before_images = set(bpy.data.images.keys())
-            bpy.ops.wm.append(
-                directory=os.path.join(shader_blend_path, "Material") + os.sep,
-                filename=material_name,
-                do_reuse_local_id=False,
+        settings = SetupSettings.from_props(props)
+        material_cache = get_material_cache(settings.root)
+        clear_binding_plans()
+        clear_image_cache()
+        refresh_fs_indexes()
+        write_stats.reset()
+
+        def extract_parent(internal_path):
+            if not settings.use_extractor:
+                return False
+            return extract_material_with_cli(
+                settings.extractor_path, settings.cache_path, internal_path, settings.root
             )
-            after = set(bpy.data.materials.keys())
-            new_material_names = after - before
-
-            if not new_material_names:
-                self.report({"ERROR"}, "Failed to append material")
-                set_up_mats.append(obj.data.materials[0].name.split(".")[0])
-                continue
-
-            new_material = bpy.data.materials[list(new_material_names)[0]]
-            self.report({"INFO"}, f"Appended material: {material_name}")
-
-            after_images = set(bpy.data.images.keys())
-            new_image_names = after_images - before_images
-
-            cleanup_textures(self, new_material, new_image_names)  # change
-            gn_node_groups = []
-            try:
-                with bpy.data.libraries.load(
-                    shader_blend_path, link=False
-                ) as (data_from, data_to):
-                    gn_node_groups = [
-                        name
-                        for name in data_from.node_groups
-                        if name.startswith("Gn") and name not in data_to.node_groups
-                    ]
-            except Exception as e:
-                self.report({"WARNING"}, f"Could not read node groups: {e!s}")
-
-            for node_group_name in gn_node_groups:
-                if node_group_name not in bpy.data.node_groups:
-                    try:
-                        bpy.ops.wm.append(
-                            directory=os.path.join(
-                                shader_blend_path, "NodeTree"
-                            )
-                            + os.sep,
-                            filename=node_group_name,
-                            do_reuse_local_id=True,
-                        )
-                        self.report({"INFO"}, f"Appended node group: {node_group_name}")
-                    except Exception as e:
-                        self.report(
-                            {"WARNING"}, f"Failed to append node group {node_group_name}: {e!s}"
-                        )
-
-            if original_base_name:
-                old_materials = [
-                    mat
-                    for mat in bpy.data.materials
-                    if mat.name.startswith(original_base_name + ".")
-                    or mat.name == original_base_name
-                ]
-
-                for old_mat in old_materials:
-                    old_mat.user_remap(new_material)
-
-                for old_mat in old_materials:
-                    if old_mat.users == 0 and old_mat != new_material:
-                        bpy.data.materials.remove(old_mat)
-
-                new_material.name = original_base_name
-            else:
-                if obj and obj.data:
-                    new_name = f"{obj.data.name}_Material"
-                    new_material.name = new_name
-
-                    if not obj.data.materials:
-                        obj.data.materials.append(new_material)
-                    else:
-                        obj.data.materials[0] = new_material
-
-            texture_locations = {}
-
-            model_path = find_internal_path(material_file_path)
-            set_material_properties(
-                obj,
-                new_material,
-                material_data,
-                props.pathToTextures,
-                model_path,
-                texture_locations,
-                shader_data,
-                hierarchy_data,
-            )
-
-            set_up_mats.append(obj.data.materials[0].name.split(".")[0])
-
-            end_time = time.time()
-            elapsed_time = end_time - start_time
-            minutes, seconds = divmod(elapsed_time, 60)
-
-            self.report({"INFO"}, f"Setup completed in {int(minutes)}m {seconds:.2f}s")
-            self.report({"INFO"}, f"Set up material for {obj.name}")
 
+        material_hierarchy = MaterialHierarchy(
+            settings.root, material_cache, extract_parent, settings.resolve_parents
+        )
+        templates = MaterialTemplates(settings.keep_material_templates)
+        timer = PhaseTimer()
+        with timer.phase("Import"):
+            bpy.ops.wm.import_model("EXEC_DEFAULT")
+        with timer.phase("Collect"):
+            jobs = collect_material_jobs(self, context.selected_objects)
+        with timer.phase("Resolve"):
+            jobs = resolve_material_files(self, jobs, settings)
+        with timer.phase("Parse"):
+            jobs = parse_material_files(self, jobs, material_hierarchy)
+        with timer.phase("Group"):
+            blend_jobs = group_jobs_by_blend(self, jobs, props.shader_library_path)
+        try:
+            with timer.phase("Append"):
+                for blend_path, jobs_for_blend in blend_jobs.items():
+                    append_blend_materials(self, blend_path, jobs_for_blend, templates)
+            with timer.phase("Bind"):
+                for jobs_for_blend in blend_jobs.values():
+                    for job in jobs_for_blend:
+                        if job.material is not None:
+                            bind_material(self, job, props, settings)
+        finally:
+            templates.finish()
+
+        material_cache.flush()
+        self.report({"INFO"}, timer.summary())
+        self.report({"INFO"}, write_stats.summary())
         return {"FINISHED"}
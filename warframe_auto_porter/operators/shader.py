@@ -1,12 +1,19 @@
-import os
-
 import bpy
 
+from ..materials.bindings import clear_binding_plans
+from ..materials.cache import get_material_cache
+from ..materials.hierarchy import MaterialHierarchy
+from ..materials.images import clear_image_cache
+from ..materials.library import get_blend_contents
 from ..materials.matcher import get_shader_items
-from ..materials.parser import parse_material_file
 from ..materials.processor import set_material_properties
+from ..materials.templates import MaterialTemplates
+from ..properties.settings import SetupSettings
+from ..utils.fs_index import refresh_fs_indexes
 from ..utils.path_utils import find_internal_path
+from ..utils.socket_utils import write_stats
 from ..utils.texture_cleanup import cleanup_textures
+from ..utils.viewport import bulk_setup
 
 
 class AppendMaterialOperator(bpy.types.Operator):
@@ -23,74 +30,52 @@ class AppendMaterialOperator(bpy.types.Operator):
     )
 
     def execute(self, context):
+        with bulk_setup(context):
+            return self.setup(context)
+
+    def setup(self, context):
         if not self.material_name:
             return {"CANCELLED"}
 
+        shader_path = context.scene.warframe_tools_props.pathToShader
+        objects = list(context.selected_objects)
+        if not objects:
+            return {"FINISHED"}
+
         try:
-            for obj in context.selected_objects:
+            gn_node_groups = []
+            try:
+                gn_node_groups = [
+                    name
+                    for name in get_blend_contents(shader_path).node_groups
+                    if name.startswith("Gn")
+                ]
+            except Exception as e:
+                self.report({"WARNING"}, f"Could not read node groups: {e!s}")
+
+            templates = MaterialTemplates(
+                context.scene.warframe_tools_props.KEEP_MATERIAL_TEMPLATES
+            )
+            try:
+                appended = templates.append(
+                    shader_path, [self.material_name] * len(objects), gn_node_groups
+                )
+            finally:
+                templates.finish()
+            for node_group in appended.node_groups:
+                self.report({"INFO"}, f"Appended node group: {node_group.name}")
+            if appended.materials[0] is None:
+                self.report({"ERROR"}, "Failed to append material")
+                return {"CANCELLED"}
+            self.report({"INFO"}, f"Appended material: {self.material_name}")
+            cleanup_textures(self, appended.materials[0], appended.images)
+
+            for obj, new_material in zip(objects, appended.materials):
                 original_base_name = None
                 if obj and obj.data and hasattr(obj.data, "materials") and obj.data.materials:
                     if obj.data.materials[0]:
                         original_base_name = obj.data.materials[0].name.split(".")[0]
 
-                before = set(bpy.data.materials.keys())
-
-                before_images = set(bpy.data.images.keys())
-                print(
-                    os.path.join(context.scene.warframe_tools_props.pathToShader, "Material")
-                    + os.sep
-                )
-                print(self.material_name)
-                bpy.ops.wm.append(
-                    directory=os.path.join(
-                        context.scene.warframe_tools_props.pathToShader, "Material"
-                    )
-                    + os.sep,
-                    filename=self.material_name,
-                    do_reuse_local_id=False,
-                )
-                after = set(bpy.data.materials.keys())
-                new_material_names = after - before
-
-                if not new_material_names:
-                    self.report({"ERROR"}, "Failed to append material")
-                    return {"CANCELLED"}
-
-                new_material = bpy.data.materials[list(new_material_names)[0]]
-                self.report({"INFO"}, f"Appended material: {self.material_name}")
-
-                after_images = set(bpy.data.images.keys())
-                new_image_names = after_images - before_images
-
-                cleanup_textures(self, new_material, new_image_names)
-                gn_node_groups = []
-                try:
-                    with bpy.data.libraries.load(
-                        context.scene.warframe_tools_props.pathToShader, link=False
-                    ) as (data_from, data_to):
-                        gn_node_groups = [
-                            name for name in data_from.node_groups if name.startswith("Gn")
-                        ]
-                except Exception as e:
-                    self.report({"WARNING"}, f"Could not read node groups: {e!s}")
-
-                for node_group_name in gn_node_groups:
-                    if node_group_name not in bpy.data.node_groups:
-                        try:
-                            bpy.ops.wm.append(
-                                directory=os.path.join(
-                                    context.scene.warframe_tools_props.pathToShader, "NodeTree"
-                                )
-                                + os.sep,
-                                filename=node_group_name,
-                                do_reuse_local_id=True,
-                            )
-                            self.report({"INFO"}, f"Appended node group: {node_group_name}")
-                        except Exception as e:
-                            self.report(
-                                {"WARNING"}, f"Failed to append node group {node_group_name}: {e!s}"
-                            )
-
                 if original_base_name:
                     old_materials = [
                         mat
@@ -139,6 +124,10 @@ class SetupShaderOperator(bpy.types.Operator):
     bl_description = "Configure material with textures and parameters"
 
     def execute(self, context):
+        with bulk_setup(context):
+            return self.setup(context)
+
+    def setup(self, context):
         props = context.scene.warframe_tools_props
         mat = context.object.active_material
         if not mat:
@@ -146,7 +135,18 @@ class SetupShaderOperator(bpy.types.Operator):
             return {"CANCELLED"}
 
         texture_locations = {}
-        material_data, shader_data, hierarchy_data = parse_material_file(props.material_file_path)
+        material_cache = get_material_cache(props.root)
+        clear_binding_plans()
+        clear_image_cache()
+        refresh_fs_indexes()
+        write_stats.reset()
+        material_hierarchy = MaterialHierarchy(
+            props.root, material_cache, resolve_parents=props.RESOLVE_MATERIAL_PARENTS
+        )
+        material_data, shader_data, hierarchy_data = material_hierarchy.resolve(
+            props.material_file_path
+        )
+        material_cache.flush()
         model_path = find_internal_path(props.material_file_path)
 
         set_material_properties(
@@ -158,6 +158,8 @@ class SetupShaderOperator(bpy.types.Operator):
             texture_locations,
             shader_data,
             hierarchy_data,
+            SetupSettings.from_props(props),
         )
+        self.report({"INFO"}, write_stats.summary())
         self.report({"INFO"}, "Shader setup completed")
         return {"FINISHED"}
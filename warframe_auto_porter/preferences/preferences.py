@@ -1,7 +1,8 @@
 import bpy
 from bpy.props import EnumProperty, StringProperty
 
-from ..constants import texture_extension_list
+from ..constants import log_level_list, texture_extension_list
+from ..utils.log import set_log_level
 
 
 class WarframeAutoPorter(bpy.types.AddonPreferences):
@@ -33,6 +34,13 @@ class WarframeAutoPorter(bpy.types.AddonPreferences):
         subtype="DIR_PATH",
         default="",
     )
+    log_level_preference: EnumProperty(
+        name="Log Level",
+        description="How much the addon writes to the console and the log buffer",
+        items=log_level_list,
+        default="INFO",
+        update=lambda self, context: set_log_level(self.log_level_preference),
+    )
 
     def draw(self, context):
         layout = self.layout
@@ -53,3 +61,7 @@ class WarframeAutoPorter(bpy.types.AddonPreferences):
         layout.prop(self, "cache_path_preference")
         layout.label(text="Folder containing .blend shader files")
         layout.prop(self, "shader_library_path_preference")
+        layout.separator()
+        row = layout.row()
+        row.prop(self, "log_level_preference")
+        row.operator("wm.dump_porter_log", text="Dump Log")
@@ -1 +1,2 @@
 from .properties import BakeSourceItem, WarframeAddonProperties
+from .settings import SetupSettings
@@ -6,7 +6,7 @@ from bpy.props import (
     StringProperty,
 )
 
-from ..constants import texture_extension_list
+from ..constants import texture_extension_list, texture_proxy_list
 
 
 def get_root_value(self):
@@ -162,6 +162,19 @@ class WarframeAddonProperties(bpy.types.PropertyGroup):
         get=get_ext_value,
         set=set_ext_value,
     )
+    texture_proxy: EnumProperty(
+        name="Texture Resolution",
+        description="Load downscaled copies of the textures, cached in the extracted root. "
+        "Use Load Full Resolution Textures before rendering or baking",
+        items=texture_proxy_list,
+        default="FULL",
+    )
+    texture_proxy_size: IntProperty(
+        name="Max Size",
+        description="Largest width or height of a texture with the Max Size resolution",
+        default=1024,
+        min=16,
+    )
     bake_base_color: BoolProperty(name="Base Color", default=True)
     bake_emission: BoolProperty(name="Emission", default=False)
     bake_metalness: BoolProperty(name="Metalness", default=False)
@@ -188,6 +201,33 @@ class WarframeAddonProperties(bpy.types.PropertyGroup):
         description="Use extractor to try and set everything up in one go.",
         default=False,
     )
+    USE_TEXTURE_ANALYSIS: BoolProperty(
+        name="Fold Constant Textures",
+        description="Analyse textures once and cache the results in the extracted root. "
+        "Single colour textures become socket values and textures without alpha skip "
+        "channel packed alpha",
+        default=False,
+    )
+    KEEP_MATERIAL_TEMPLATES: BoolProperty(
+        name="Keep Material Templates",
+        description="Keep the hidden template of every appended shader material in the blend "
+        "file, so later runs clone it instead of appending it again",
+        default=False,
+    )
+    RESOLVE_MATERIAL_PARENTS: BoolProperty(
+        name="Resolve Parent Materials",
+        description="Merge the values of the materials a material file names as its parent "
+        "underneath its own. Experimental: the keys that name a parent are not confirmed "
+        "against real material files yet",
+        default=False,
+    )
+    USE_THREADED_DECODE: BoolProperty(
+        name="Decode Textures in Parallel",
+        description="Decode the PNG and TGA textures of each material on all cores before "
+        "setting it up. The images are turned back into file images when the blend is saved "
+        "or opened",
+        default=False,
+    )
     extractor_path: StringProperty(
         name="Extractor CLI Path",
         description=r"Path to the CLI Extractor to use.",
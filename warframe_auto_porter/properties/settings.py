@@ -0,0 +1,78 @@
+from dataclasses import dataclass
+
+from ..constants import texture_extension_list
+
+
+@dataclass(frozen=True, slots=True)
+class SetupSettings:
+    """Read-only copy of the scene settings a setup run depends on.
+
+    Built once per operator run, so per-socket and per-texture loops read plain attributes
+    instead of going through the scene and addon preferences each time.
+    """
+
+    root: str
+    extractor_path: str
+    cache_path: str
+    texture_extension: str
+    use_root_location: bool
+    use_extractor: bool
+    reset_parameters: bool
+    replace_images: bool
+    empty_images_before_setup: bool
+    level_import: bool
+    threaded_decode: bool
+    resolve_parents: bool
+    analyze_textures: bool
+    keep_material_templates: bool
+    texture_proxy: str
+    texture_proxy_size: int
+    # The chosen texture suffix first, then the other supported ones
+    texture_suffixes: tuple
+    # texture_suffixes without DDS, for textures Blender can't read as DDS
+    fallback_suffixes: tuple
+
+    @classmethod
+    def from_props(cls, props):
+        # "*.png" -> ".png"
+        suffix = props.texture_extension.split("*")[1]
+        others = [extension.split("*")[1] for extension, _, _ in texture_extension_list]
+        texture_suffixes = (suffix, *(other for other in others if other != suffix))
+        return cls(
+            root=str(props.root),
+            extractor_path=str(props.extractor_path),
+            cache_path=str(props.cache_path),
+            texture_extension=props.texture_extension,
+            use_root_location=bool(props.USE_ROOT_LOCATION),
+            use_extractor=bool(props.USE_EXTRACTOR),
+            reset_parameters=bool(props.RESET_PARAMETERS),
+            replace_images=bool(props.REPLACE_IMAGES),
+            empty_images_before_setup=bool(props.EMPTY_IMAGES_BEFORE_SETUP),
+            level_import=bool(props.LEVEL_IMPORT),
+            threaded_decode=bool(props.USE_THREADED_DECODE),
+            resolve_parents=bool(props.RESOLVE_MATERIAL_PARENTS),
+            analyze_textures=bool(props.USE_TEXTURE_ANALYSIS),
+            keep_material_templates=bool(props.KEEP_MATERIAL_TEMPLATES),
+            texture_proxy=props.texture_proxy,
+            texture_proxy_size=int(props.texture_proxy_size),
+            texture_suffixes=texture_suffixes,
+            fallback_suffixes=tuple(other for other in texture_suffixes if other != ".dds"),
+        )
+
+    @classmethod
+    def from_context(cls, context):
+        return cls.from_props(context.scene.warframe_tools_props)
+
+    @property
+    def texture_suffix(self):
+        return self.texture_suffixes[0]
+
+    @property
+    def texture_format(self):
+        # "*.png" -> "PNG", as the extractor expects it
+        return self.texture_extension.replace("*.", "").upper()
+
+    @property
+    def fallback_format(self):
+        # ".png" -> "PNG"
+        return self.fallback_suffixes[0][1:].upper()
@@ -0,0 +1,224 @@
+"""Time parse_material_file against the original line-by-line parser.
+
+    python warframe_auto_porter/scripts/benchmark_parser.py [--files N] [--lines N]
+
+Writes two synthetic corpora to a temporary folder and parses each with:
+  - baseline: the parser as it was before the single-pass scanner
+  - scanner:  the single-pass scanner with the per-line memo bypassed
+  - memoized: parse_material_file as shipped, memo reset before each corpus
+
+"repeated" draws lines from a small shared pool, as real material files do. "distinct" gives
+every line of every file its own value, so the memo never hits across files and
+parse_material_file should skip it for most files, staying close to the scanner. Also reports
+how much memory the per-line memo holds when it is full.
+
+Needs no Blender: the parser and constants modules are loaded straight from their files.
+"""
+
+import argparse
+import ast
+import importlib.util
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+import types
+from collections import OrderedDict
+
+ADDON_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_parser():
+    # The addon's __init__ registers Blender classes, so only the two modules are loaded
+    package = types.ModuleType("_porter")
+    package.__path__ = [ADDON_DIR]
+    materials = types.ModuleType("_porter.materials")
+    materials.__path__ = [os.path.join(ADDON_DIR, "materials")]
+    sys.modules["_porter"] = package
+    sys.modules["_porter.materials"] = materials
+    for name, path in (
+        ("_porter.constants", os.path.join(ADDON_DIR, "constants.py")),
+        ("_porter.materials.parser", os.path.join(ADDON_DIR, "materials", "parser.py")),
+    ):
+        spec = importlib.util.spec_from_file_location(name, path)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        spec.loader.exec_module(module)
+    return sys.modules["_porter.materials.parser"], sys.modules["_porter.constants"]
+
+
+def baseline_parse(filepath, special_aliases, texture_ignores):
+    """parse_material_file before the single-pass scanner, kept as the reference"""
+    material_data = {}
+    shader_data = {}
+    hierarchy_data = {}
+    with open(filepath) as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            if any(ignore in line for ignore in texture_ignores):
+                continue
+            if "=" not in line and ":" not in line:
+                continue
+            if ":" in line:
+                key, value = line.split(":", 1)
+            if "=" in line:
+                key, value = line.split("=", 1)
+            key = key.strip()
+            value = value.strip()
+            if "shader" in key.lower():
+                continue
+            if value == "":
+                continue
+            if "_p.hlsl" in value.lower():
+                shader_data[value.lower()] = 1
+                continue
+            try:
+                if value.startswith("[") and value.endswith("]"):
+                    value = ast.literal_eval(value)
+                    if isinstance(value, list):
+                        value = [float(v) if isinstance(v, str) else v for v in value]
+                else:
+                    try:
+                        value = float(value) if "." in value else int(value)
+                    except Exception:
+                        pass
+            except Exception:
+                pass
+            material_data[key] = value
+            if (
+                isinstance(value, str)
+                and not line.startswith("TX:")
+                and "shader" not in line.lower()
+            ):
+                material_data[line] = 1
+                if line.lower().endswith("= none"):
+                    continue
+                if value.lower().startswith("x") and len(value) == 2:
+                    material_data["x"] = int(value[-1])
+                material_data[key] = 1
+                material_data[value] = 1
+    for key in special_aliases:
+        if key in material_data and special_aliases[key] not in material_data:
+            material_data[special_aliases[key]] = 1
+    return OrderedDict(sorted(material_data.items())), shader_data, hierarchy_data
+
+
+def material_lines(rng, file_index, line_count, distinct):
+    # Distinct files get a unique suffix on every value, pooled ones share a few hundred lines
+    def pick(count):
+        return file_index if distinct else rng.randrange(count)
+
+    lines = ["PS=/Lotus/Shaders/DeferredPBR/PBRFillDeferredPixel_p.hlsl"]
+    for i in range(line_count):
+        kind = i % 4
+        if kind == 0:
+            lines.append(f"TX:Map{i}=Lotus/Objects/Level{pick(50)}/Tex{i}_{pick(40)}.png")
+        elif kind == 1:
+            lines.append(f"Scalar{i}={pick(8) / 4}")
+        elif kind == 2:
+            lines.append(f"Param{i}=[{pick(4) / 2}, 1.0, 0.0, {pick(3)}.0]")
+        else:
+            lines.append(f"FLAG_{i} = MODE_{pick(6)}")
+    return lines
+
+
+def write_corpus(directory, files, line_count, distinct, seed=1):
+    rng = random.Random(seed)
+    paths = []
+    for file_index in range(files):
+        path = os.path.join(directory, f"material_{file_index}.txt")
+        with open(path, "w") as f:
+            f.write("\n".join(material_lines(rng, file_index, line_count, distinct)) + "\n")
+        paths.append(path)
+    return paths
+
+
+def best_of(repeats, function, paths):
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for path in paths:
+            function(path)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main(argv):
+    parser_args = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser_args.add_argument("--files", type=int, default=2000)
+    parser_args.add_argument("--lines", type=int, default=80)
+    parser_args.add_argument("--repeats", type=int, default=3)
+    args = parser_args.parse_args(argv)
+
+    parser, constants = load_parser()
+
+    def baseline(path):
+        return baseline_parse(path, constants.special_aliases, constants.texture_ignores)
+
+    def scanner(path):
+        with open(path) as f:
+            text = f.read()
+        compiled = (parser._compile_line(line) for line in parser._LINE_SCANNER.findall(text))
+        return parser.build_material_data(c for c in compiled if c is not parser._SKIP_LINE)
+
+    def memoized(path):
+        return parser.parse_material_file(path)
+
+    with tempfile.TemporaryDirectory() as directory:
+        for corpus, distinct in (("repeated", False), ("distinct", True)):
+            corpus_dir = os.path.join(directory, corpus)
+            os.makedirs(corpus_dir)
+            paths = write_corpus(corpus_dir, args.files, args.lines, distinct)
+            for path in paths[:50]:
+                if memoized(path)[:2] != baseline(path)[:2]:
+                    print(f"Output differs from the baseline for {path}")
+                    return 1
+
+            base_time = best_of(args.repeats, baseline, paths)
+            scan_time = best_of(args.repeats, scanner, paths)
+
+            def memo_run(paths=paths):
+                # Each repeat starts from an empty memo, like a fresh Blender session
+                parser._line_cache.clear()
+                parser._memo_skips = 0
+                for path in paths:
+                    memoized(path)
+
+            memo_time = best_of(args.repeats, lambda _: memo_run(), [None])
+            print(f"{corpus} ({args.files} files x {args.lines} lines)")
+            print(f"  baseline  {base_time:.3f}s")
+            print(f"  scanner   {scan_time:.3f}s  {base_time / scan_time:.2f}x")
+            print(f"  memoized  {memo_time:.3f}s  {base_time / memo_time:.2f}x")
+
+    # Fill part of the memo with distinct lines and scale its footprint to a full one. A zero
+    # hit rate floor keeps every file using the memo.
+    parser._line_cache.clear()
+    parser._memo_skips = 0
+    parser._MEMO_MIN_HIT_RATE = 0.0
+    rng = random.Random(2)
+    texts = [
+        "\n".join(material_lines(rng, i, args.lines, True))
+        for i in range(20000 // args.lines)
+    ]
+    tracemalloc.start()
+    for text in texts:
+        for _ in parser._compile_text(text):
+            pass
+    used = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    per_entry = used / max(len(parser._line_cache), 1)
+    print(
+        f"memo: {per_entry:.0f} bytes per entry, about "
+        f"{per_entry * parser._LINE_CACHE_LIMIT / (1 << 20):.0f} MiB when full "
+        f"({parser._LINE_CACHE_LIMIT} entries)"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
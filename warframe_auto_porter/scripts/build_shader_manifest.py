@@ -0,0 +1,90 @@
+"""Write a manifest of a shader library folder without opening Blender's UI.
+
+    blender -b --factory-startup --python build_shader_manifest.py -- <shader library> [<manifest>]
+
+For each .blend in the folder the manifest lists its materials, node groups and collections.
+Blends whose size and mtime match the existing manifest are not opened again.
+
+Runs inside Blender as a standalone script, so it can't import from the addon package.
+"""
+
+import json
+import os
+import sys
+
+import bpy
+
+# Must match shader_manifest_filename and shader_manifest_version in constants.py
+MANIFEST_FILENAME = "shader_manifest.json"
+MANIFEST_VERSION = 1
+
+
+def scan_blend(blend_path):
+    # Only the names are read, nothing is linked into this session
+    with bpy.data.libraries.load(blend_path, link=True) as (data_from, _):
+        return {
+            "materials": list(data_from.materials),
+            "node_groups": list(data_from.node_groups),
+            "collections": list(data_from.collections),
+        }
+
+
+def load_manifest(manifest_path):
+    try:
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if manifest.get("version") != MANIFEST_VERSION:
+        return {}
+    return manifest.get("blends", {})
+
+
+def build_manifest(library_path, manifest_path):
+    previous = load_manifest(manifest_path)
+    blends = {}
+    for filename in sorted(os.listdir(library_path)):
+        if not filename.endswith(".blend"):
+            continue
+        blend_path = os.path.join(library_path, filename)
+        stat = os.stat(blend_path)
+        entry = previous.get(filename)
+        if (
+            entry is not None
+            and entry.get("size") == stat.st_size
+            and entry.get("mtime_ns") == stat.st_mtime_ns
+        ):
+            # Older builds also stored geometry nodes sockets, which nothing reads
+            entry.pop("sockets", None)
+            blends[filename] = entry
+            continue
+        print(f"Scanning {filename}")
+        try:
+            entry = scan_blend(blend_path)
+        except Exception as e:
+            print(f"Could not read {filename}: {e!s}")
+            continue
+        entry["size"] = stat.st_size
+        entry["mtime_ns"] = stat.st_mtime_ns
+        blends[filename] = entry
+
+    temp_path = manifest_path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump({"version": MANIFEST_VERSION, "blends": blends}, f, indent=1)
+    os.replace(temp_path, manifest_path)
+    return len(blends)
+
+
+def main():
+    argv = sys.argv[sys.argv.index("--") + 1 :] if "--" in sys.argv else []
+    if not argv:
+        print("Usage: blender -b --python build_shader_manifest.py -- <shader library> [<manifest>]")
+        sys.exit(1)
+    library_path = argv[0]
+    manifest_path = argv[1] if len(argv) > 1 else os.path.join(library_path, MANIFEST_FILENAME)
+    count = build_manifest(library_path, manifest_path)
+    print(f"Wrote {count} blends to {manifest_path}")
+
+
+if __name__ == "__main__":
+    main()
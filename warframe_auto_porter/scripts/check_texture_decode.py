@@ -0,0 +1,161 @@
+"""Check the PNG decoder against files written by a real encoder and against every filter.
+
+    python warframe_auto_porter/scripts/check_texture_decode.py [--write-fixtures]
+
+The fixtures were written by Pillow, which picks a filter per row and uses Paeth on most rows
+of these images. Their pixels come from integer formulas, so the expected values are
+recomputed here rather than stored. Pillow never picks Average, so each filter, and a mix of
+all five, is also checked on scanlines filtered by the reference encoder below.
+
+--write-fixtures rewrites the fixtures and needs Pillow. Checking them needs only numpy: the
+decoder module is loaded straight from its file.
+"""
+
+import argparse
+import importlib.util
+import os
+import sys
+import zlib
+
+import numpy as np
+
+ADDON_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def load_decoder():
+    # The addon's __init__ registers Blender classes, so only the decoder module is loaded
+    path = os.path.join(ADDON_DIR, "utils", "texture_decode.py")
+    spec = importlib.util.spec_from_file_location("_porter_texture_decode", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _radial(width, height):
+    y, x = np.mgrid[0:height, 0:width]
+    return ((x - width // 2) ** 2 + (y - height // 2) ** 2) * 60 + x * 7 + y * 13
+
+
+def gray16_pixels():
+    return (_radial(48, 32) % 65536).astype(np.uint16)
+
+
+def rgba8_pixels():
+    v = _radial(48, 32)
+    alpha = np.full_like(v, 255)
+    return np.stack([(v // 7) % 256, (v // 3) % 256, (v // 11) % 256, alpha], -1).astype(np.uint8)
+
+
+FIXTURES = {
+    "gray16_pillow.png": (gray16_pixels, 1),
+    "rgba8_pillow.png": (rgba8_pixels, 4),
+}
+
+
+def write_fixtures():
+    from PIL import Image
+
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    for name, (pixels, _) in FIXTURES.items():
+        Image.fromarray(pixels()).save(os.path.join(FIXTURE_DIR, name), optimize=True)
+
+
+def filter_counts(filepath):
+    """How many rows of a PNG use each of the five filters"""
+    with open(filepath, "rb") as f:
+        data = f.read()
+    pos = 8
+    width = height = bpp = 0
+    idat = []
+    while pos < len(data):
+        length = int.from_bytes(data[pos : pos + 4], "big")
+        kind = data[pos + 4 : pos + 8]
+        body = data[pos + 8 : pos + 8 + length]
+        if kind == b"IHDR":
+            width = int.from_bytes(body[:4], "big")
+            height = int.from_bytes(body[4:8], "big")
+            channels = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}[body[9]]
+            bpp = channels * body[8] // 8
+        elif kind == b"IDAT":
+            idat.append(body)
+        pos += 12 + length
+    raw = np.frombuffer(zlib.decompress(b"".join(idat)), dtype=np.uint8)
+    return np.bincount(raw.reshape(height, width * bpp + 1)[:, 0], minlength=5).tolist()
+
+
+def _paeth(a, b, c):
+    p = a + b - c
+    pa, pb, pc = np.abs(p - a), np.abs(p - b), np.abs(p - c)
+    return np.where((pa <= pb) & (pa <= pc), a, np.where(pb <= pc, b, c))
+
+
+def filter_rows(image, kinds, bpp):
+    """Filter (height, stride) uint8 scanlines the way an encoder does, one filter per row"""
+    height, stride = image.shape
+    out = []
+    previous = np.zeros(stride, dtype=np.int32)
+    for y in range(height):
+        row = image[y].astype(np.int32)
+        left = np.concatenate([np.zeros(bpp, dtype=np.int32), row[:-bpp]])
+        up_left = np.concatenate([np.zeros(bpp, dtype=np.int32), previous[:-bpp]])
+        predicted = (0, left, previous, (left + previous) // 2, _paeth(left, previous, up_left))
+        filtered = (row - predicted[kinds[y]]) % 256
+        out.append(bytes([kinds[y]]) + filtered.astype(np.uint8).tobytes())
+        previous = row
+    return b"".join(out)
+
+
+def check_filters(decoder):
+    rng = np.random.default_rng(3)
+    failures = 0
+    for bpp in (1, 2, 3, 4, 6, 8):
+        for width, height in ((1, 1), (1, 9), (9, 1), (37, 23), (23, 37)):
+            # Smooth gradients with noise, so every predictor gives something other than zero
+            y, x = np.mgrid[0:height, 0 : width * bpp]
+            image = ((x * 3 + y * 5 + rng.integers(0, 40, x.shape)) % 256).astype(np.uint8)
+            mixes = {f"filter {kind}": [kind] * height for kind in range(5)}
+            mixes["runs"] = [(y // 3) % 5 for y in range(height)]
+            mixes["mixed"] = rng.integers(0, 5, height).tolist()
+            for label, kinds in mixes.items():
+                raw = filter_rows(image, kinds, bpp)
+                decoded = decoder._unfilter(raw, height, width * bpp, bpp)
+                if not np.array_equal(decoded, image):
+                    print(f"{label}, {width}x{height}, {bpp} bytes a pixel: wrong pixels")
+                    failures += 1
+    return failures
+
+
+def check_fixtures(decoder):
+    failures = 0
+    for name, (pixels, count) in FIXTURES.items():
+        path = os.path.join(FIXTURE_DIR, name)
+        counts = filter_counts(path)
+        read = decoder._read_samples(path)
+        expected = pixels().reshape(-1, count)
+        if read is None or not np.array_equal(read.samples.reshape(-1, count), expected):
+            print(f"{name}: wrong pixels")
+            failures += 1
+        elif not counts[4]:
+            print(f"{name}: no Paeth rows, rewrite it with --write-fixtures")
+            failures += 1
+        else:
+            print(f"{name}: ok, rows by filter {counts}")
+    return failures
+
+
+def main(argv):
+    parser_args = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser_args.add_argument("--write-fixtures", action="store_true")
+    args = parser_args.parse_args(argv)
+
+    if args.write_fixtures:
+        write_fixtures()
+    decoder = load_decoder()
+    failures = check_fixtures(decoder) + check_filters(decoder)
+    print("all filters ok" if not failures else f"{failures} failures")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""Stand-in for the extractor CLI that writes small fixture textures instead of reading a cache.
+
+    --extract-textures --texture-format DDS --cache-dir <any> --internal-path <path>
+        --output-path <extracted root>
+
+Takes the same arguments as the real extractor, so its path can be set as the Extractor CLI
+Path to try texture extraction, including the DDS mode, without Warframe installed. Writes a
+4x4 texture for the internal path in the requested format (DDS, PNG or TGA). DDS files are
+DXT1 unless STUB_DDS_FORMAT=BC6H is set, which Blender can't read, to exercise the PNG
+fallback. Material extraction is not supported and fails.
+"""
+
+import argparse
+import os
+import struct
+import sys
+import zlib
+
+SIZE = 4
+# Opaque mid grey, one 4x4 DXT1 block: both endpoints equal, all indices 0
+_DXT1_BLOCK = struct.pack("<HHI", 0x8410, 0x8410, 0)
+_DXGI_BC6H_UF16 = 95
+
+
+def dds_bytes(pixel_format):
+    flags = 0x1 | 0x2 | 0x4 | 0x1000 | 0x80000  # caps, height, width, pixelformat, linearsize
+    if pixel_format == "BC6H":
+        fourcc = b"DX10"
+        data = bytes(16)
+    else:
+        fourcc = b"DXT1"
+        data = _DXT1_BLOCK
+    pixel_format_header = struct.pack("<II4sIIIII", 32, 0x4, fourcc, 0, 0, 0, 0, 0)
+    header = struct.pack("<IIIIIII", 124, flags, SIZE, SIZE, len(data), 0, 1)
+    header += bytes(44) + pixel_format_header + struct.pack("<IIIII", 0x1000, 0, 0, 0, 0)
+    dx10 = b""
+    if fourcc == b"DX10":
+        dx10 = struct.pack("<IIIII", _DXGI_BC6H_UF16, 3, 0, 1, 0)
+    return b"DDS " + header + dx10 + data
+
+
+def png_bytes():
+    def chunk(kind, data):
+        crc = zlib.crc32(kind + data)
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", crc)
+
+    rows = b"".join(b"\x00" + b"\x80\x80\x80\xff" * SIZE for _ in range(SIZE))
+    header = struct.pack(">IIBBBBB", SIZE, SIZE, 8, 6, 0, 0, 0)
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", header)
+        + chunk(b"IDAT", zlib.compress(rows))
+        + chunk(b"IEND", b"")
+    )
+
+
+def tga_bytes():
+    header = struct.pack("<BBBHHBHHHHBB", 0, 0, 2, 0, 0, 0, 0, 0, SIZE, SIZE, 32, 8)
+    return header + b"\x80\x80\x80\xff" * (SIZE * SIZE)
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--extract-textures", action="store_true")
+    parser.add_argument("--extract-materials", action="store_true")
+    parser.add_argument("--texture-format", default="PNG")
+    parser.add_argument("--cache-dir")
+    parser.add_argument("--internal-path", required=True)
+    parser.add_argument("--output-path", required=True)
+    args = parser.parse_args(argv)
+
+    if not args.extract_textures:
+        print("The stub extractor only writes textures", file=sys.stderr)
+        return 1
+    texture_format = args.texture_format.upper()
+    if texture_format == "DDS":
+        data = dds_bytes(os.environ.get("STUB_DDS_FORMAT", "DXT1").upper())
+    elif texture_format == "PNG":
+        data = png_bytes()
+    elif texture_format == "TGA":
+        data = tga_bytes()
+    else:
+        print(f"Unsupported texture format: {args.texture_format}", file=sys.stderr)
+        return 1
+
+    internal_path = args.internal_path.replace("\\", "/").lstrip("/")
+    stem = os.path.splitext(internal_path)[0]
+    output = os.path.join(args.output_path, stem + "." + texture_format.lower())
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "wb") as f:
+        f.write(data)
+    print(f"Wrote {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -38,6 +38,7 @@ class SetupPanelOperator(bpy.types.Panel):
             box.prop(props, "USE_PATHS")
             if not props.USE_PATHS:
                 box.prop(props, "pathToShader")
+            box.prop(props, "KEEP_MATERIAL_TEMPLATES")
 
             if props.USE_PATHS:
                 layout.operator("wm.setup_paths", text="Run Setup")
@@ -119,6 +120,15 @@ class SetupPanelOperator(bpy.types.Panel):
             box.prop(props, "USE_EXTRACTOR")
             box.prop(props, "LEVEL_IMPORT")
             box.prop(props, "RESET_PARAMETERS")
+            box.prop(props, "USE_THREADED_DECODE")
+            box.prop(props, "RESOLVE_MATERIAL_PARENTS")
+            box.prop(props, "USE_TEXTURE_ANALYSIS")
+            box.prop(props, "KEEP_MATERIAL_TEMPLATES")
+            box.prop(props, "texture_proxy")
+            if props.texture_proxy == "CAP":
+                box.prop(props, "texture_proxy_size")
+            if props.texture_proxy != "FULL":
+                box.operator("wm.load_full_resolution_textures")
             if not props.USE_PATHS:
                 box.prop(props, "model_file_path")
                 box.prop(prefs, "extractor_path_preference")
@@ -127,6 +137,10 @@ class SetupPanelOperator(bpy.types.Panel):
             box.prop(props, "USE_ROOT_LOCATION")
             if not props.USE_PATHS and props.USE_ROOT_LOCATION:
                 box.prop(prefs, "root_preference")
+            box.operator("wm.build_material_index", text="Build Material Index")
+            box.operator("wm.find_materials", text="Find Materials")
+            box.operator("wm.build_shader_manifest", text="Build Shader Manifest")
+            box.operator("wm.deduplicate_images", text="Deduplicate Images")
 
             if props.USE_PATHS:
                 layout.operator("wm.setup_paths", text="Run Auto Setup")
@@ -149,6 +163,14 @@ class SetupPanelOperator(bpy.types.Panel):
             box.prop(props, "EMPTY_IMAGES_BEFORE_SETUP")
             box.prop(props, "REPLACE_IMAGES")
             box.prop(props, "RESET_PARAMETERS")
+            box.prop(props, "USE_THREADED_DECODE")
+            box.prop(props, "RESOLVE_MATERIAL_PARENTS")
+            box.prop(props, "USE_TEXTURE_ANALYSIS")
+            box.prop(props, "texture_proxy")
+            if props.texture_proxy == "CAP":
+                box.prop(props, "texture_proxy_size")
+            if props.texture_proxy != "FULL":
+                box.operator("wm.load_full_resolution_textures")
             box.prop(props, "texture_extension")
         if props.USE_PATHS:
             layout.operator("wm.setup_paths", text="Run Setup")
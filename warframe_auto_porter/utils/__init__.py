@@ -1,6 +1,17 @@
+from .dds import blender_can_read_dds, read_dds_format
 from .extraction import extract_material_with_cli, extract_texture_with_cli
-from .helpers import contains, containstexture, get_color_space, strtobool
+from .fs_index import FileSystemIndex, get_fs_index, refresh_fs_indexes
+from .helpers import TextureMatcher, contains, containstexture, get_color_space, strtobool
+from .log import configure_logging, dump_log, logger, set_log_level, shutdown_logging
 from .object_utils import process_object
 from .path_utils import find_internal_path, find_internal_texture_path
-from .socket_utils import reset_default, set_default
+from .socket_utils import reset_default, set_default, set_modifier_input, write_stats
 from .texture_cleanup import cleanup_textures
+from .texture_decode import (
+    DecodedTexture,
+    decode_texture,
+    decode_textures,
+    encode_png,
+    read_texture_stats,
+)
+from .viewport import bulk_setup
@@ -0,0 +1,88 @@
+import struct
+
+_DDS_MAGIC = b"DDS "
+_HEADER_SIZE = 4 + 124
+_DX10_HEADER_SIZE = 20
+
+_DDPF_FOURCC = 0x4
+_DDPF_RGB = 0x40
+_DDPF_LUMINANCE = 0x20000
+
+# Block formats Blender reads through OpenImageIO
+_READABLE_FOURCC = {
+    b"DXT1",
+    b"DXT2",
+    b"DXT3",
+    b"DXT4",
+    b"DXT5",
+    b"ATI1",
+    b"ATI2",
+    b"BC4U",
+    b"BC4S",
+    b"BC5U",
+    b"BC5S",
+}
+_READABLE_DXGI = {
+    28,  # R8G8B8A8_UNORM
+    29,  # R8G8B8A8_UNORM_SRGB
+    49,  # R8G8_UNORM
+    61,  # R8_UNORM
+    70,  # BC1_TYPELESS
+    71,  # BC1_UNORM
+    72,  # BC1_UNORM_SRGB
+    73,  # BC2_TYPELESS
+    74,  # BC2_UNORM
+    75,  # BC2_UNORM_SRGB
+    76,  # BC3_TYPELESS
+    77,  # BC3_UNORM
+    78,  # BC3_UNORM_SRGB
+    79,  # BC4_TYPELESS
+    80,  # BC4_UNORM
+    81,  # BC4_SNORM
+    82,  # BC5_TYPELESS
+    83,  # BC5_UNORM
+    84,  # BC5_SNORM
+    87,  # B8G8R8A8_UNORM
+    88,  # B8G8R8X8_UNORM
+    91,  # B8G8R8A8_UNORM_SRGB
+    97,  # BC7_TYPELESS
+    98,  # BC7_UNORM
+    99,  # BC7_UNORM_SRGB
+}
+
+
+def read_dds_format(filepath):
+    """Pixel format of a DDS file: a FourCC such as "DXT5", "DXGI_98" for files with a
+    DX10 header, "RGB" or "LUMINANCE" for uncompressed ones. None if it isn't a DDS file.
+    """
+    try:
+        with open(filepath, "rb") as f:
+            header = f.read(_HEADER_SIZE + _DX10_HEADER_SIZE)
+    except OSError:
+        return None
+    if len(header) < _HEADER_SIZE or header[:4] != _DDS_MAGIC:
+        return None
+    flags, fourcc = struct.unpack("<I4s", header[80:88])
+    if flags & _DDPF_FOURCC:
+        if fourcc == b"DX10":
+            if len(header) < _HEADER_SIZE + _DX10_HEADER_SIZE:
+                return None
+            (dxgi_format,) = struct.unpack("<I", header[_HEADER_SIZE : _HEADER_SIZE + 4])
+            return f"DXGI_{dxgi_format}"
+        return fourcc.decode("ascii", "replace")
+    if flags & _DDPF_RGB:
+        return "RGB"
+    if flags & _DDPF_LUMINANCE:
+        return "LUMINANCE"
+    return None
+
+
+def blender_can_read_dds(filepath):
+    pixel_format = read_dds_format(filepath)
+    if pixel_format is None:
+        return False
+    if pixel_format in ("RGB", "LUMINANCE"):
+        return True
+    if pixel_format.startswith("DXGI_"):
+        return int(pixel_format[5:]) in _READABLE_DXGI
+    return pixel_format.encode("ascii") in _READABLE_FOURCC
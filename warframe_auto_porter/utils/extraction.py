@@ -2,6 +2,7 @@ import subprocess
 from pathlib import Path
 
 from ..constants import extractor_commands
+from .log import logger
 
 
 def extract_texture_with_cli(extractor_path, cache_path, texture_format, internal_path, output_dir):
@@ -10,16 +11,16 @@ def extract_texture_with_cli(extractor_path, cache_path, texture_format, interna
     )
 
     try:
-        print(f"Running command: {cmd}")
+        logger.info("Running command: %s", cmd)
         result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
         if result.returncode == 0:
-            print(f"Successfully extracted texture: {internal_path}")
+            logger.info("Successfully extracted texture: %s", internal_path)
             return True
         else:
-            print(f"Extractor failed with error: {result.stderr}")
+            logger.warning("Extractor failed with error: %s", result.stderr)
             return False
     except Exception as e:
-        print(f"Error running extractor: {e!s}")
+        logger.warning("Error running extractor: %s", e)
         return False
 
 
@@ -29,14 +30,14 @@ def extract_material_with_cli(extractor_path, cache_path, internal_path, output_
     )
 
     try:
-        print(f"Running command: {cmd}")
+        logger.info("Running command: %s", cmd)
         result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
         if result.returncode == 0:
-            print(f"Successfully extracted material: {internal_path}")
+            logger.info("Successfully extracted material: %s", internal_path)
             return True
         else:
-            print(f"Extractor failed with error: {result.stderr}")
+            logger.warning("Extractor failed with error: %s", result.stderr)
             return False
     except Exception as e:
-        print(f"Error running extractor: {e!s}")
+        logger.warning("Error running extractor: %s", e)
         return False
@@ -0,0 +1,172 @@
+import os
+
+_indexes = {}
+
+
+class _Listing:
+    __slots__ = ("mtime_ns", "generation", "files", "dirs", "file_names")
+
+    def __init__(self, mtime_ns, generation):
+        self.mtime_ns = mtime_ns
+        self.generation = generation
+        self.files = {}
+        self.dirs = {}
+        self.file_names = []
+
+
+class FileSystemIndex:
+    """Case-folded listing of the folders under the extracted root, read lazily.
+
+    A folder is listed the first time a path inside it is looked up. After refresh() every
+    folder is checked against its mtime once, the next time it is used, and listed again
+    only if it changed. Paths outside root are answered by the filesystem directly.
+    """
+
+    def __init__(self, root):
+        self.root = os.path.normpath(os.path.abspath(root))
+        self.generation = 0
+        self._listings = {}
+
+    def refresh(self):
+        """Have each folder checked against the disk again on its next use"""
+        self.generation += 1
+
+    def _relative_parts(self, path):
+        path = os.path.normpath(os.path.abspath(path))
+        if path == self.root:
+            return []
+        prefix = self.root if self.root.endswith(os.sep) else self.root + os.sep
+        if not path.startswith(prefix):
+            return None
+        return path[len(prefix) :].split(os.sep)
+
+    def _listing(self, dirpath):
+        listing = self._listings.get(dirpath)
+        if listing is not None and listing.generation == self.generation:
+            return listing
+        try:
+            mtime_ns = os.stat(dirpath).st_mtime_ns
+        except OSError:
+            self._listings.pop(dirpath, None)
+            return None
+        if listing is not None and listing.mtime_ns == mtime_ns:
+            listing.generation = self.generation
+            return listing
+
+        listing = _Listing(mtime_ns, self.generation)
+        try:
+            with os.scandir(dirpath) as entries:
+                for entry in entries:
+                    if entry.is_dir():
+                        listing.dirs.setdefault(entry.name.casefold(), entry.name)
+                    elif entry.is_file():
+                        listing.files.setdefault(entry.name.casefold(), entry.name)
+                        listing.file_names.append(entry.name)
+        except OSError:
+            return None
+        self._listings[dirpath] = listing
+        return listing
+
+    def _walk(self, parts):
+        """Actual paths of root and of each folder in parts, as far as they exist"""
+        current = self.root
+        walked = [current]
+        for part in parts:
+            listing = self._listing(current)
+            if listing is None:
+                break
+            name = listing.dirs.get(part.casefold())
+            if name is None:
+                break
+            current = os.path.join(current, name)
+            walked.append(current)
+        return walked
+
+    def _resolve_parts(self, parts):
+        walked = self._walk(parts)
+        if len(walked) != len(parts) + 1 or self._listing(walked[-1]) is None:
+            return None
+        return walked[-1]
+
+    def resolve_dir(self, path):
+        """Actual path of the folder at path, or None if there is no such folder"""
+        parts = self._relative_parts(path)
+        if parts is None:
+            return path if os.path.isdir(path) else None
+        return self._resolve_parts(parts)
+
+    def list_files(self, dirpath):
+        """Names of the files directly in dirpath, in listing order"""
+        parts = self._relative_parts(dirpath)
+        if parts is None:
+            return [f for f in os.listdir(dirpath) if os.path.isfile(os.path.join(dirpath, f))]
+        actual_dir = self._resolve_parts(parts)
+        if actual_dir is None:
+            return []
+        return list(self._listing(actual_dir).file_names)
+
+    def resolve_file(self, path, extensions=None):
+        """Actual path of the file at path, or None.
+
+        With extensions, the file's own extension is replaced by each of them in turn and
+        the first one present is returned, all from a single folder listing.
+        """
+        parts = self._relative_parts(path)
+        if parts is None or not parts:
+            candidates = [path]
+            if extensions:
+                stem = os.path.splitext(path)[0]
+                candidates = [stem + extension for extension in extensions]
+            return next((c for c in candidates if os.path.isfile(c)), None)
+
+        actual_dir = self._resolve_parts(parts[:-1])
+        if actual_dir is None:
+            return None
+        files = self._listing(actual_dir).files
+        names = [parts[-1]]
+        if extensions:
+            stem = os.path.splitext(parts[-1])[0]
+            names = [stem + extension for extension in extensions]
+        for name in names:
+            actual_name = files.get(name.casefold())
+            if actual_name is not None:
+                return os.path.join(actual_dir, actual_name)
+        return None
+
+    def exists(self, path):
+        return self.resolve_file(path) is not None
+
+    def invalidate(self, path):
+        """Forget the listings along path, after something was written there"""
+        parts = self._relative_parts(path)
+        if parts is None:
+            return
+        current = self.root
+        for part in parts:
+            listing = self._listings.pop(current, None)
+            if listing is None:
+                return
+            name = listing.dirs.get(part.casefold())
+            if name is None:
+                return
+            current = os.path.join(current, name)
+        self._listings.pop(current, None)
+
+
+def get_fs_index(root):
+    """Return the shared index for root, or None if root is not a folder"""
+    if not root:
+        return None
+    key = os.path.normcase(os.path.abspath(root))
+    fs_index = _indexes.get(key)
+    if fs_index is None:
+        if not os.path.isdir(root):
+            return None
+        fs_index = FileSystemIndex(root)
+        _indexes[key] = fs_index
+    return fs_index
+
+
+def refresh_fs_indexes():
+    for fs_index in _indexes.values():
+        fs_index.refresh()
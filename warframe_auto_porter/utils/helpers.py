@@ -1,3 +1,4 @@
+import functools
 import re
 
 from ..constants import COLOR_SPACE_MAP
@@ -33,10 +34,81 @@ def contains(str1, str2):
     return str1.lower() in str2.lower()
 
 
+_WORD = re.compile(r"\w+")
+
+
+@functools.lru_cache(maxsize=4096)
+def _whole_word_pattern(text):
+    return re.compile(r"\b" + re.escape(text) + r"\b")
+
+
 def containstexture(str1, str2):
     if not isinstance(str1, str) or not isinstance(str2, str):
         return True
     if "=" in str1.lower() or "=" in str2.lower():
         return str1.lower() == str2.lower()
-    pattern = re.compile(r"\b" + re.escape(str1.lower()) + r"\b")
-    return bool(pattern.search(str2.lower()))
+    return _whole_word_pattern(str1.lower()).search(str2.lower()) is not None
+
+
+class TextureMatcher:
+    """The texture names of one material, looked up by socket name.
+
+    Gives the same answers as containstexture(texture_name, socket_name) for every name,
+    in the order the names were given. Each name is indexed under its first word: a whole
+    word match of the name has to start at a word of the socket name equal to that word.
+    Results are remembered per socket name.
+    """
+
+    def __init__(self, texture_names):
+        self._names = list(texture_names)
+        self._lowers = [name.lower() if isinstance(name, str) else name for name in self._names]
+        self._always = []
+        self._by_lower = {}
+        self._by_first_word = {}
+        self._unindexed = []
+        self._matches = {}
+        for position, name in enumerate(self._names):
+            if not isinstance(name, str):
+                self._always.append(position)
+                continue
+            name_lower = self._lowers[position]
+            self._by_lower.setdefault(name_lower, []).append(position)
+            if "=" in name_lower:
+                # Only ever equal to a socket name, which then contains "=" as well
+                continue
+            m = _WORD.match(name_lower)
+            if m is None:
+                self._unindexed.append(position)
+            else:
+                self._by_first_word.setdefault(m.group(0), []).append(position)
+
+    def _search(self, positions, socket_lower):
+        return [
+            position
+            for position in positions
+            if _whole_word_pattern(self._lowers[position]).search(socket_lower)
+        ]
+
+    def matches(self, socket_name):
+        """Texture names matching socket_name, in their original order"""
+        result = self._matches.get(socket_name)
+        if result is not None:
+            return result
+        if not isinstance(socket_name, str):
+            result = tuple(self._names)
+            self._matches[socket_name] = result
+            return result
+
+        socket_lower = socket_name.lower()
+        positions = list(self._always)
+        if "=" in socket_lower:
+            positions.extend(self._by_lower.get(socket_lower, ()))
+        else:
+            for word in set(_WORD.findall(socket_lower)):
+                candidates = self._by_first_word.get(word)
+                if candidates:
+                    positions.extend(self._search(candidates, socket_lower))
+            positions.extend(self._search(self._unindexed, socket_lower))
+        result = tuple(self._names[position] for position in sorted(positions))
+        self._matches[socket_name] = result
+        return result
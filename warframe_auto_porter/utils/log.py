@@ -0,0 +1,69 @@
+import logging
+import sys
+from collections import deque
+
+from ..constants import log_buffer_size
+
+logger = logging.getLogger(__package__.rpartition(".")[0])
+
+_buffer_handler = None
+_console_handler = None
+
+
+class RingBufferHandler(logging.Handler):
+    """Keeps the last records of a session in memory so they can be written out later"""
+
+    def __init__(self, capacity):
+        super().__init__()
+        self.records = deque(maxlen=capacity)
+
+    def emit(self, record):
+        # Format now so records don't keep Blender data alive after it is freed
+        record.msg = record.getMessage()
+        record.args = None
+        self.records.append(record)
+
+    def dump(self, filepath):
+        formatter = self.formatter or logging.Formatter()
+        records = list(self.records)
+        with open(filepath, "w", encoding="utf-8") as f:
+            for record in records:
+                f.write(formatter.format(record) + "\n")
+        return len(records)
+
+
+def configure_logging(level="INFO"):
+    """Attach the console and ring buffer handlers once and set the level"""
+    global _buffer_handler, _console_handler
+    if _buffer_handler is None:
+        _buffer_handler = RingBufferHandler(log_buffer_size)
+        _buffer_handler.setFormatter(
+            logging.Formatter("%(asctime)s %(levelname)s %(module)s: %(message)s")
+        )
+        _console_handler = logging.StreamHandler(sys.stdout)
+        _console_handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(_buffer_handler)
+        logger.addHandler(_console_handler)
+        logger.propagate = False
+    logger.setLevel(level)
+
+
+def set_log_level(level):
+    logger.setLevel(level)
+
+
+def dump_log(filepath):
+    """Write the buffered records to filepath, returns how many were written"""
+    if _buffer_handler is None:
+        return 0
+    return _buffer_handler.dump(filepath)
+
+
+def shutdown_logging():
+    global _buffer_handler, _console_handler
+    for handler in (_buffer_handler, _console_handler):
+        if handler is not None:
+            logger.removeHandler(handler)
+            handler.close()
+    _buffer_handler = None
+    _console_handler = None
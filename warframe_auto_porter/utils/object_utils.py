@@ -1,8 +1,10 @@
 import bmesh
 import bpy
 
+from ..properties.settings import SetupSettings
 
-def process_object(obj):
+
+def process_object(obj, settings=None):
     if obj.type != "MESH":
         return
     me = obj.data
@@ -48,7 +50,9 @@ def process_object(obj):
             new_attr.data.update()
             mesh.color_attributes.remove(color_attr)
             new_attr.name = old_name
-    if not bpy.context.scene.warframe_tools_props.LEVEL_IMPORT:
+    if settings is None:
+        settings = SetupSettings.from_context(bpy.context)
+    if not settings.level_import:
         me.flip_normals()
         bm = bmesh.new()
         bm.from_mesh(me)
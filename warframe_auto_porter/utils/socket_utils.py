@@ -1,36 +1,100 @@
+import math
+
 from ..constants import special_reset_rules
 from .helpers import strtobool
 
+# Blender keeps socket values as 32 bit floats, so a value read back rarely equals the
+# Python float that was written
+_REL_TOLERANCE = 1e-5
+_ABS_TOLERANCE = 1e-6
+
+
+class WriteStats:
+    """How many socket writes were made and how many were skipped as already set"""
+
+    __slots__ = ("written", "skipped")
+
+    def __init__(self):
+        self.written = 0
+        self.skipped = 0
+
+    def reset(self):
+        self.written = 0
+        self.skipped = 0
+
+    def summary(self):
+        return f"Socket values: {self.written} written, {self.skipped} already set"
+
+
+write_stats = WriteStats()
+
+
+def values_equal(current, value):
+    """Compare a stored socket value with a new one, with float tolerance"""
+    if isinstance(value, (tuple, list)):
+        try:
+            current = tuple(current)
+        except TypeError:
+            return False
+        return len(current) == len(value) and all(
+            values_equal(c, v) for c, v in zip(current, value)
+        )
+    if isinstance(value, bool) or isinstance(current, bool):
+        return current == value
+    if isinstance(value, float) or isinstance(current, float):
+        try:
+            return math.isclose(current, value, rel_tol=_REL_TOLERANCE, abs_tol=_ABS_TOLERANCE)
+        except TypeError:
+            return False
+    return current == value
+
+
+def _assign_default(input_socket, value):
+    if values_equal(input_socket.default_value, value):
+        write_stats.skipped += 1
+        return
+    input_socket.default_value = value
+    write_stats.written += 1
+
+
+def set_modifier_input(mod, identifier, value):
+    """mod[identifier] = value, unless the modifier already holds that value"""
+    if identifier in mod and values_equal(mod[identifier], value):
+        write_stats.skipped += 1
+        return
+    mod[identifier] = value
+    write_stats.written += 1
+
 
 def set_default(input_socket, value):
     if input_socket.type == "VECTOR":
-        input_socket.default_value = tuple(value[:3])
+        _assign_default(input_socket, tuple(value[:3]))
     elif input_socket.type == "BOOLEAN":
-        input_socket.default_value = bool(strtobool(value))
+        _assign_default(input_socket, bool(strtobool(value)))
     elif input_socket.type == "COLOR":
-        input_socket.default_value = tuple(value[:3])
+        _assign_default(input_socket, tuple(value[:3]))
     elif input_socket.type == "RGBA":
-        input_socket.default_value = tuple(value[:4])
+        _assign_default(input_socket, tuple(value[:4]))
     elif input_socket.type == "VALUE":
-        input_socket.default_value = float(value)
+        _assign_default(input_socket, float(value))
     elif input_socket.type == "INT":
-        input_socket.default_value = int(value)
+        _assign_default(input_socket, int(value))
 
 
 def reset_default(input_socket):
     socket_name = input_socket.name
     if socket_name in special_reset_rules:
-        input_socket.default_value = special_reset_rules[socket_name]
+        _assign_default(input_socket, special_reset_rules[socket_name])
         return
     if input_socket.type == "VECTOR":
-        input_socket.default_value = tuple([0, 0, 0])
+        _assign_default(input_socket, tuple([0, 0, 0]))
     elif input_socket.type == "BOOLEAN":
-        input_socket.default_value = False
+        _assign_default(input_socket, False)
     elif input_socket.type == "COLOR":
-        input_socket.default_value = tuple([0.5, 0.5, 0.5])
+        _assign_default(input_socket, tuple([0.5, 0.5, 0.5]))
     elif input_socket.type == "RGBA":
-        input_socket.default_value = tuple([0.5, 0.5, 0.5, 1])
+        _assign_default(input_socket, tuple([0.5, 0.5, 0.5, 1]))
     elif input_socket.type == "VALUE":
-        input_socket.default_value = float(0)
+        _assign_default(input_socket, float(0))
     elif input_socket.type == "INT":
-        input_socket.default_value = 0
+        _assign_default(input_socket, 0)
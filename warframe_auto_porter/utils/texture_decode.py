@@ -0,0 +1,370 @@
+import os
+import struct
+import zlib
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+_PNG_CHANNELS = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}
+
+# Memory that decodes in flight and decoded pixels waiting for the main thread may use at once
+DEFAULT_MEMORY_BUDGET = 1 << 30
+# Peak of one decode: the file, its decompressed and its unfiltered scanlines (up to 8 bytes
+# a pixel each for 16 bit RGBA), then the float32 RGBA pixels and their row-flipped copy
+_DECODE_BYTES_PER_PIXEL = 8 * 3 + 16 * 2
+
+
+def read_image_size(filepath):
+    """(width, height) from the header of a PNG or TGA file, or None"""
+    try:
+        with open(filepath, "rb") as f:
+            header = f.read(24)
+    except OSError:
+        return None
+    if header[:8] == _PNG_SIGNATURE and len(header) >= 24:
+        return struct.unpack(">II", header[16:24])
+    if filepath.lower().endswith(".tga") and len(header) >= 18:
+        return struct.unpack("<HH", header[12:16])
+    return None
+
+
+# Pixels of a file before they become float RGBA. samples is an (n, count) array of values up
+# to max_value, rows top to bottom unless the file says otherwise, or of indices into an
+# RGBA uint8 palette.
+_Samples = namedtuple(
+    "_Samples",
+    ["width", "height", "samples", "count", "max_value", "palette", "mirrored", "top_down"],
+)
+
+# What decode_texture returns. high_bit_depth is set for 16 bit files, whose pixels need a
+# float image in Blender to keep more than 8 bits.
+DecodedTexture = namedtuple("DecodedTexture", ["width", "height", "pixels", "high_bit_depth"])
+
+
+def _to_rgba(channels, count, alpha_max):
+    """Expand an (n, count) array of gray/gray-alpha/RGB/RGBA values to float RGBA"""
+    channels = channels.astype(np.float32)
+    channels /= np.float32(alpha_max)
+    if count == 4:
+        return channels
+    rgba = np.ones((channels.shape[0], 4), dtype=np.float32)
+    if count in (1, 2):
+        rgba[:, :3] = channels[:, :1]
+        if count == 2:
+            rgba[:, 3] = channels[:, 1]
+    else:
+        rgba[:, :3] = channels
+    return rgba
+
+
+def _paeth(a, b, c):
+    # a + b - c is never computed, its distances to a, b and c come out of da and db
+    da = a - c
+    db = b - c
+    pa = np.abs(db)
+    pb = np.abs(da)
+    pc = np.abs(da + db)
+    return np.where((pa <= pb) & (pa <= pc), a, np.where(pb <= pc, b, c))
+
+
+def _filter_runs(filters):
+    """For each row, the index of the first row after the run of equal filters it is in"""
+    ends = np.flatnonzero(np.diff(filters)) + 1
+    return np.append(ends, len(filters))[np.searchsorted(ends, np.arange(len(filters)), "right")]
+
+
+def _unfilter_diagonals(pixels, filters, height, width, bpp):
+    """Undo any mix of PNG filters by walking the image one anti-diagonal at a time.
+
+    Average and Paeth predict each byte from the reconstructed one to its left, so a row
+    can't be undone in one go. The pixels of an anti-diagonal only need the two diagonals
+    before it, which are kept by row in small buffers. In the flat pixel array a diagonal
+    is a slice with a step of width - 1, so nothing is gathered or scattered.
+    """
+    out = np.empty((height * width, bpp), dtype=np.uint8)
+    kinds = filters.astype(np.intp)
+    run_ends = _filter_runs(kinds)
+    step = max(width - 1, 1)
+    # Row y of a diagonal is at y + 1, so row -1 and rows the diagonal misses read as zero
+    buffers = [np.zeros((height + 1, bpp), dtype=np.int16) for _ in range(3)]
+    for d in range(height + width - 1):
+        first = max(0, d - width + 1)
+        last = min(height - 1, d) + 1
+        current, left, up_left = buffers[d % 3], buffers[(d - 1) % 3], buffers[(d - 2) % 3]
+        a = left[first + 1 : last + 1]
+        b = left[first:last]
+        c = up_left[first:last]
+        if run_ends[first] >= last:
+            kind = kinds[first]
+            if kind == 4:
+                predicted = _paeth(a, b, c)
+            elif kind == 3:
+                predicted = (a + b) >> 1
+            elif kind == 2:
+                predicted = b
+            elif kind == 1:
+                predicted = a
+            else:
+                predicted = 0
+        else:
+            predicted = np.choose(
+                kinds[first:last, None], (0, a, b, (a + b) >> 1, _paeth(a, b, c))
+            )
+        start = first * (width - 1) + d
+        diagonal = slice(start, start + (last - first - 1) * step + 1, step)
+        value = current[first + 1 : last + 1]
+        np.add(pixels[diagonal], predicted, out=value, casting="unsafe")
+        value &= 0xFF
+        out[diagonal] = value
+    return out
+
+
+def _unfilter(raw, height, stride, bpp):
+    """Undo the PNG scanline filters, returns a (height, stride) uint8 array"""
+    rows = np.frombuffer(raw, dtype=np.uint8)[: height * (stride + 1)].reshape(height, stride + 1)
+    filters = rows[:, 0]
+    data = rows[:, 1:]
+    if filters.max() > 4:
+        raise ValueError("Invalid PNG filter type")
+    if filters.max() > 2:
+        width = stride // bpp
+        pixels = data.reshape(height * width, bpp)
+        return _unfilter_diagonals(pixels, filters, height, width, bpp).reshape(height, stride)
+
+    # None, Sub and Up only need the row above, so each row is a few array operations
+    out = np.empty((height, stride), dtype=np.uint8)
+    previous = np.zeros(stride, dtype=np.uint8)
+    for y in range(height):
+        row = data[y]
+        kind = filters[y]
+        if kind == 1:
+            row = np.cumsum(row.reshape(-1, bpp), axis=0, dtype=np.uint8).reshape(-1)
+        elif kind == 2:
+            row = row + previous
+        out[y] = row
+        previous = out[y]
+    return out
+
+
+def _read_png(data):
+    pos = 8
+    header = None
+    palette = None
+    transparency = None
+    idat = []
+    while pos + 8 <= len(data):
+        length, kind = struct.unpack(">I4s", data[pos : pos + 8])
+        chunk = data[pos + 8 : pos + 8 + length]
+        pos += 12 + length
+        if kind == b"IHDR":
+            header = struct.unpack(">IIBBBBB", chunk)
+        elif kind == b"PLTE":
+            palette = np.frombuffer(chunk, dtype=np.uint8).reshape(-1, 3)
+        elif kind == b"tRNS":
+            transparency = np.frombuffer(chunk, dtype=np.uint8)
+        elif kind == b"IDAT":
+            idat.append(chunk)
+        elif kind == b"IEND":
+            break
+    if header is None:
+        return None
+    width, height, bit_depth, color_type, _, _, interlace = header
+    count = _PNG_CHANNELS.get(color_type)
+    if count is None or interlace or bit_depth not in (8, 16):
+        return None
+    if color_type == 3 and (bit_depth != 8 or palette is None):
+        return None
+
+    bytes_per_sample = bit_depth // 8
+    bpp = count * bytes_per_sample
+    raw = zlib.decompress(b"".join(idat))
+    rows = _unfilter(raw, height, width * bpp, bpp)
+
+    if bit_depth == 16:
+        samples = rows.reshape(-1).view(">u2").reshape(-1, count)
+        return _Samples(width, height, samples, count, 65535.0, None, False, True)
+    if color_type == 3:
+        rgba_palette = np.full((len(palette), 4), 255, dtype=np.uint8)
+        rgba_palette[:, :3] = palette
+        if transparency is not None:
+            rgba_palette[: len(transparency), 3] = transparency[: len(palette)]
+        samples = rows.reshape(-1, 1)
+        return _Samples(width, height, samples, 1, 255.0, rgba_palette, False, True)
+    samples = rows.reshape(-1, count)
+    return _Samples(width, height, samples, count, 255.0, None, False, True)
+
+
+def _decode_tga_rle(data, pos, pixel_count, pixel_size):
+    out = bytearray(pixel_count * pixel_size)
+    written = 0
+    end = len(out)
+    while written < end:
+        packet = data[pos]
+        pos += 1
+        run = (packet & 0x7F) + 1
+        size = run * pixel_size
+        if packet & 0x80:
+            out[written : written + size] = data[pos : pos + pixel_size] * run
+            pos += pixel_size
+        else:
+            out[written : written + size] = data[pos : pos + size]
+            pos += size
+        written += size
+    return bytes(out)
+
+
+def _read_tga(data):
+    id_length, colormap_type, image_type = data[0], data[1], data[2]
+    width, height, depth, descriptor = struct.unpack("<HHBB", data[12:18])
+    if colormap_type or image_type not in (2, 3, 10, 11) or depth not in (8, 24, 32):
+        return None
+    pixel_size = depth // 8
+    pos = 18 + id_length
+    pixel_count = width * height
+    if image_type in (10, 11):
+        pixels = _decode_tga_rle(data, pos, pixel_count, pixel_size)
+    else:
+        pixels = data[pos : pos + pixel_count * pixel_size]
+    samples = np.frombuffer(pixels, dtype=np.uint8).reshape(-1, pixel_size)
+    if pixel_size >= 3:
+        # Stored as BGR(A)
+        samples = samples[:, [2, 1, 0, 3][:pixel_size]]
+    # Bit 4 of the descriptor mirrors the rows, bit 5 puts the origin at the top left
+    return _Samples(
+        width, height, samples, pixel_size, 255.0, None, descriptor & 0x10, descriptor & 0x20
+    )
+
+
+def _read_samples(filepath):
+    with open(filepath, "rb") as f:
+        data = f.read()
+    if data[:8] == _PNG_SIGNATURE:
+        return _read_png(data)
+    if filepath.lower().endswith(".tga") and len(data) >= 18:
+        return _read_tga(data)
+    return None
+
+
+def decode_texture(filepath):
+    """Decode a PNG or TGA file to a DecodedTexture, or None if it isn't supported.
+
+    Unsupported are interlaced PNGs, and bit depths and TGA types other than the common
+    ones. Callers leave those files to Blender.
+
+    pixels is a flat float32 RGBA array in Blender's bottom-to-top row order, ready for
+    Image.pixels.foreach_set.
+    """
+    read = _read_samples(filepath)
+    if read is None:
+        return None
+    if read.palette is not None:
+        rgba = _to_rgba(read.palette[read.samples[:, 0]], 4, read.max_value)
+    else:
+        rgba = _to_rgba(read.samples, read.count, read.max_value)
+    rgba = rgba.reshape(read.height, read.width, 4)
+    if read.mirrored:
+        rgba = rgba[:, ::-1]
+    if read.top_down:
+        rgba = rgba[::-1]
+    pixels = np.ascontiguousarray(rgba, dtype=np.float32).reshape(-1)
+    return DecodedTexture(read.width, read.height, pixels, read.max_value > 255)
+
+
+def _expand_channels(values, count, max_value):
+    values = [float(v) / max_value for v in values]
+    if count == 1:
+        return (values[0], values[0], values[0], 1.0)
+    if count == 2:
+        return (values[0], values[0], values[0], values[1])
+    if count == 3:
+        return (*values, 1.0)
+    return tuple(values)
+
+
+def read_texture_stats(filepath):
+    """(width, height, minimum, maximum, mean) of a PNG or TGA file, or None.
+
+    minimum, maximum and mean are RGBA tuples of 0-1 floats, as Blender would read the
+    pixels. They are worked out on the integer samples, without making float pixels. The
+    same files as for decode_texture are unsupported.
+    """
+    read = _read_samples(filepath)
+    if read is None:
+        return None
+    if read.palette is not None:
+        counts = np.bincount(read.samples[:, 0], minlength=len(read.palette))
+        used = read.palette[counts > 0]
+        low, high = used.min(axis=0), used.max(axis=0)
+        mean = counts @ read.palette.astype(np.float64) / read.samples.shape[0]
+        count = 4
+    else:
+        low, high = read.samples.min(axis=0), read.samples.max(axis=0)
+        mean = read.samples.mean(axis=0, dtype=np.float64)
+        count = read.count
+    return (
+        read.width,
+        read.height,
+        _expand_channels(low, count, read.max_value),
+        _expand_channels(high, count, read.max_value),
+        _expand_channels(mean, count, read.max_value),
+    )
+
+
+def _png_chunk(kind, data):
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+
+def encode_png(filepath, width, height, pixels):
+    """Write flat float RGBA pixels, in Blender's row order, as an 8 bit RGBA PNG"""
+    rgba = pixels.reshape(height, width, 4)[::-1] * np.float32(255.0) + np.float32(0.5)
+    rows = np.zeros((height, width * 4 + 1), dtype=np.uint8)
+    rows[:, 1:] = np.clip(rgba, 0, 255).astype(np.uint8).reshape(height, -1)
+    header = struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0)
+    with open(filepath, "wb") as f:
+        f.write(_PNG_SIGNATURE)
+        f.write(_png_chunk(b"IHDR", header))
+        f.write(_png_chunk(b"IDAT", zlib.compress(rows.tobytes(), 6)))
+        f.write(_png_chunk(b"IEND", b""))
+
+
+def _decode_or_none(filepath):
+    # Runs on worker threads, so errors come back as values instead of breaking the pool
+    try:
+        return decode_texture(filepath), None
+    except Exception as e:
+        return None, str(e)
+
+
+def decode_textures(filepaths, max_workers=None, memory_budget=DEFAULT_MEMORY_BUDGET):
+    """Yield (filepath, decoded, error) for each file in order, decoding ahead on threads.
+
+    zlib and numpy release the GIL for the heavy parts, so files decode in parallel.
+    Files are only started while the decodes running and the pixels waiting to be consumed
+    fit in memory_budget, estimated from the image headers at the peak of a decode. The
+    first file waiting is always started, however large it is.
+    """
+    filepaths = list(filepaths)
+    if not filepaths:
+        return
+    if max_workers is None:
+        max_workers = min(len(filepaths), os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = []
+        pending_bytes = 0
+        next_index = 0
+        while pending or next_index < len(filepaths):
+            while next_index < len(filepaths):
+                size = read_image_size(filepaths[next_index])
+                estimate = size[0] * size[1] * _DECODE_BYTES_PER_PIXEL if size else 0
+                if pending and pending_bytes + estimate > memory_budget:
+                    break
+                future = executor.submit(_decode_or_none, filepaths[next_index])
+                pending.append((filepaths[next_index], estimate, future))
+                pending_bytes += estimate
+                next_index += 1
+            filepath, estimate, future = pending.pop(0)
+            decoded, error = future.result()
+            pending_bytes -= estimate
+            yield filepath, decoded, error
@@ -0,0 +1,46 @@
+import contextlib
+
+import bpy
+
+from .log import logger
+
+_SHADED_TYPES = {"MATERIAL", "RENDERED"}
+
+_depth = 0
+
+
+@contextlib.contextmanager
+def bulk_setup(context=None):
+    """Show 3D viewports in Solid mode while many materials are appended and set up.
+
+    Material Preview and Rendered viewports compile a shader for every material change
+    they get to draw. For the duration of the block they are switched to Solid, and put
+    back afterwards, so the shaders are compiled once, for the finished materials.
+    Nested blocks leave the viewports to the outermost one.
+    """
+    global _depth
+    if context is None:
+        context = bpy.context
+    saved = []
+    if _depth == 0 and context.window_manager is not None:
+        for window in context.window_manager.windows:
+            for area in window.screen.areas:
+                if area.type != "VIEW_3D":
+                    continue
+                for space in area.spaces:
+                    if space.type == "VIEW_3D" and space.shading.type in _SHADED_TYPES:
+                        saved.append((space, space.shading.type))
+                        space.shading.type = "SOLID"
+        if saved:
+            logger.debug("Switched %d viewports to Solid shading for the setup", len(saved))
+    _depth += 1
+    try:
+        yield
+    finally:
+        _depth -= 1
+        for space, shading_type in saved:
+            try:
+                space.shading.type = shading_type
+            except ReferenceError:
+                # The area was closed during the run
+                pass